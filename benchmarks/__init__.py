@@ -0,0 +1 @@
+"""Benchmark harness: stub SPARQL endpoint and load-test driver."""
@@ -0,0 +1,305 @@
+"""Load test of the full server against the stub SPARQL endpoint.
+
+Starts :mod:`benchmarks.stub` in this process and the MCP server, built by
+``create_server()``, in a subprocess on the streamable-HTTP transport. Then
+runs a weighted mix of calls to all tools from ``--concurrency`` MCP
+sessions and reports latency percentiles, throughput and the server's memory
+use::
+
+    python -m benchmarks.run --requests 2000 --concurrency 16 --latency 0.005
+
+``--json`` writes the report for later comparison; with ``--baseline`` the
+run fails when p95 latency or throughput regress by more than
+``--tolerance`` against a previous report. Server settings are read from
+the environment as usual, e.g. ``SPARQL_CACHE_SIZE=0`` to measure uncached
+queries.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import uvicorn
+from fastmcp import Client
+
+from .stub import DEFAULT_FIXTURES, StubEndpoint, create_app, load_fixtures
+
+_LP = "http://sn.example.org/lehrplan/"
+_STATES = ["SN", "BY", "RP", "Sachsen", "Bayern"]
+_SUBJECTS = ["Biologie", "Mathematik", "Deutsch", "Physik"]
+_TERMS = ["Photosynthese", "Bruchrechnung", "Gedicht", "Energie", "Zelle Atmung"]
+
+Args = dict[str, Any]
+
+#: Tool call mix: (weight, tool, argument factory).
+WORKLOAD: list[tuple[int, str, Callable[[random.Random], Args]]] = [
+    (25, "get_children", lambda r: {"node_uri": f"{_LP}{r.randrange(12)}/{r.randint(1, 4)}"}),
+    (15, "find_lehrplaene", lambda r: {
+        "bundesland": r.choice(_STATES), "schulfach": r.choice(_SUBJECTS)
+    }),
+    (15, "search", lambda r: {"query": r.choice(_TERMS), "bundesland": r.choice(_STATES)}),
+    (10, "get_lehrplan_tree", lambda r: {
+        "lehrplan_uri": f"{_LP}{r.randrange(12)}", "depth": r.randint(1, 4)
+    }),
+    (8, "get_children_batch", lambda r: {
+        "node_uris": [f"{_LP}{r.randrange(12)}/{i}" for i in range(1, 9)]
+    }),
+    (8, "list_schulfaecher", lambda r: {"bundesland": r.choice(_STATES)}),
+    (7, "list_schularten", lambda r: {"bundesland": r.choice(_STATES)}),
+    (6, "list_bundeslaender", lambda r: {}),
+    (6, "sparql_query", lambda r: {
+        "query": f"SELECT ?s ?p ?o WHERE {{ ?s ?p ?o }} LIMIT {r.choice([10, 100])}"
+    }),
+]
+
+
+@dataclass
+class ToolStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Return the *p*-th percentile (nearest rank) of *values*."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: list[float], errors: int) -> dict[str, float]:
+    return {
+        "calls": len(latencies),
+        "errors": errors,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_memory(pid: int) -> dict[str, int]:
+    """Current and peak resident memory of *pid* in KiB (Linux only)."""
+    memory: dict[str, int] = {}
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                memory["rss_kib" if key == "VmRSS" else "peak_rss_kib"] = int(value.split()[0])
+    except OSError:
+        pass
+    return memory
+
+
+async def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+    raise RuntimeError("Server did not start in time")
+
+
+def _start_server(stub_port: int, port: int) -> subprocess.Popen:
+    env = {
+        "GRAPH_ONTOLOGY": "https://w3id.org/lehrplan/ontology/2026-01-19/",
+        "GRAPH_SCHULART": "http://schulart-2026-01-23/",
+        "GRAPH_SCHULFACH": "https://w3id.org/schulfach/2026-01-19/",
+        "GRAPH_STATE_SN": "http://sn-2026-01-29/",
+        "GRAPH_STATE_BY": "http://by-2026-01-27/",
+        "GRAPH_STATE_RP": "http://rlp-2026-01-30/",
+        "NAME_INDEX_REFRESH": "0",
+        "GRAPH_PROBE_INTERVAL": "0",
+        **os.environ,
+        "SPARQL_ENDPOINT": f"http://127.0.0.1:{stub_port}/sparql",
+        "PORT": str(port),
+    }
+    # Run outside the project directory so a local .env is not picked up.
+    return subprocess.Popen(
+        [sys.executable, "-m", "py_mem_mcp.server"],
+        env=env,
+        cwd=tempfile.gettempdir(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def _worker(
+    url: str,
+    rng: random.Random,
+    remaining: list[int],
+    stats: dict[str, ToolStats],
+) -> None:
+    weights = [w for w, _, _ in WORKLOAD]
+    async with Client(url) as client:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            _, tool, make_args = rng.choices(WORKLOAD, weights)[0]
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, make_args(rng), raise_on_error=False)
+                failed = result.is_error
+            except Exception:
+                failed = True
+            entry = stats.setdefault(tool, ToolStats())
+            entry.latencies.append(time.perf_counter() - started)
+            entry.errors += failed
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the benchmark described by *args* and return the report."""
+    stub = StubEndpoint(load_fixtures(args.fixtures), args.latency, args.jitter, args.scale)
+    stub_port, port = _free_port(), _free_port()
+    stub_server = uvicorn.Server(
+        uvicorn.Config(create_app(stub), host="127.0.0.1", port=stub_port, log_level="warning")
+    )
+    stub_task = asyncio.create_task(stub_server.serve())
+    process = _start_server(stub_port, port)
+    try:
+        await _wait_for_port(port, process)
+        url = f"http://127.0.0.1:{port}/mcp"
+        rng = random.Random(args.seed)
+
+        warmup: dict[str, ToolStats] = {}
+        await _worker(url, rng, [args.warmup], warmup)
+        memory_before = _server_memory(process.pid)
+
+        stats: dict[str, ToolStats] = {}
+        remaining = [args.requests]
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(url, random.Random(rng.random()), remaining, stats)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        memory_after = _server_memory(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        stub_server.should_exit = True
+        await stub_task
+
+    latencies = [t for entry in stats.values() for t in entry.latencies]
+    errors = sum(entry.errors for entry in stats.values())
+    return {
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "scale": args.scale,
+        },
+        "elapsed_s": elapsed,
+        "requests_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "sparql_requests": stub.requests,
+        "unmatched_queries": stub.unmatched,
+        "overall": summarize(latencies, errors),
+        "tools": {
+            tool: summarize(entry.latencies, entry.errors) for tool, entry in sorted(stats.items())
+        },
+        "memory_before": memory_before,
+        "memory_after": memory_after,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    rows = [("tool", "calls", "errors", "p50 ms", "p95 ms", "p99 ms")]
+    for name, entry in [*report["tools"].items(), ("all", report["overall"])]:
+        rows.append((
+            name,
+            str(entry["calls"]),
+            str(entry["errors"]),
+            f"{entry['p50_ms']:.1f}",
+            f"{entry['p95_ms']:.1f}",
+            f"{entry['p99_ms']:.1f}",
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths)))
+        for row in rows
+    ]
+    lines.append("")
+    lines.append(
+        f"{report['requests_per_s']:.1f} requests/s over {report['elapsed_s']:.1f} s, "
+        f"{report['sparql_requests']} SPARQL requests ({report['unmatched_queries']} unmatched)"
+    )
+    memory = report["memory_after"]
+    if memory:
+        lines.append(
+            f"server RSS {memory['rss_kib'] / 1024:.1f} MiB, "
+            f"peak {memory['peak_rss_kib'] / 1024:.1f} MiB"
+        )
+    return "\n".join(lines)
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return the regressions of *report* against *baseline* beyond *tolerance*."""
+    problems = []
+    for tool, entry in report["tools"].items():
+        base = baseline["tools"].get(tool)
+        if base and entry["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{tool}: p95 {entry['p95_ms']:.1f} ms (baseline {base['p95_ms']:.1f} ms)")
+    if report["requests_per_s"] < baseline["requests_per_s"] * (1 - tolerance):
+        problems.append(
+            f"throughput {report['requests_per_s']:.1f}/s "
+            f"(baseline {baseline['requests_per_s']:.1f}/s)"
+        )
+    return problems
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the MCP server against a stub endpoint.")
+    parser.add_argument("--requests", type=int, default=1000, help="Measured tool calls.")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured calls first.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel MCP sessions.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Stub seconds per query.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random stub seconds.")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat each stub result row.")
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", metavar="PATH", help="Write the report as JSON.")
+    parser.add_argument("--baseline", metavar="PATH", help="Fail on regressions against this report.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression.")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(format_report(report))
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if report["overall"]["errors"]:
+        print(f"\n{report['overall']['errors']} tool calls failed.", file=sys.stderr)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            print("\nRegressions:\n  " + "\n  ".join(problems), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
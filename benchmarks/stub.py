@@ -0,0 +1,218 @@
+"""Local stub SPARQL endpoint that replays response fixtures.
+
+Each fixture has a ``match`` regular expression that is searched in the
+incoming query and a recorded SPARQL JSON ``response``. The first matching
+fixture answers; named groups of the match are substituted into ``{name}``
+placeholders of the response values, so one fixture can answer for any node
+of the hierarchy. Responses are served as JSON, TSV or CSV depending on the
+``Accept`` header, after a configurable latency, and ``--scale`` repeats
+every result row to simulate larger payloads::
+
+    python -m benchmarks.stub --port 8890 --latency 0.01 --scale 10
+
+With ``--record URL``, queries are forwarded to a real endpoint instead and
+the answers are appended to the fixture file as exact-match fixtures.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import random
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+DEFAULT_FIXTURES = Path(__file__).with_name("fixtures.json")
+
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r", "\t": "\\t"})
+
+
+@dataclass
+class Fixture:
+    """One recorded response and the queries it answers."""
+
+    name: str
+    match: re.Pattern
+    response: dict[str, Any]
+
+
+def load_fixtures(path: str | Path = DEFAULT_FIXTURES) -> list[Fixture]:
+    """Read the fixtures in *path*, in match order."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [
+        Fixture(item.get("name", item["match"]), re.compile(item["match"]), item["response"])
+        for item in data["fixtures"]
+    ]
+
+
+def _substitute(response: dict[str, Any], groups: dict[str, str]) -> dict[str, Any]:
+    if not groups:
+        return response
+    bindings = [
+        {var: {**term, "value": term["value"].format(**groups)} for var, term in row.items()}
+        for row in response["results"]["bindings"]
+    ]
+    return {"head": response["head"], "results": {"bindings": bindings}}
+
+
+def _tsv_term(term: dict[str, str]) -> str:
+    if term["type"] == "uri":
+        return f"<{term['value']}>"
+    if term["type"] == "bnode":
+        return f"_:{term['value']}"
+    text = f'"{term["value"].translate(_TSV_ESCAPES)}"'
+    if "xml:lang" in term:
+        return f"{text}@{term['xml:lang']}"
+    if "datatype" in term:
+        return f"{text}^^<{term['datatype']}>"
+    return text
+
+
+def serialize(response: dict[str, Any], accept: str) -> tuple[bytes, str]:
+    """Serialize a SPARQL JSON *response* in the format asked for by *accept*."""
+    json_body = json.dumps(response).encode(), "application/sparql-results+json"
+    if "boolean" in response:
+        return json_body
+    if "text/tab-separated-values" in accept:
+        media_type = "text/tab-separated-values"
+    elif "text/csv" in accept:
+        media_type = "text/csv"
+    else:
+        return json_body
+    variables = response["head"]["vars"]
+    bindings = response["results"]["bindings"]
+    if media_type == "text/tab-separated-values":
+        lines = ["\t".join(f"?{v}" for v in variables)]
+        lines += [
+            "\t".join(_tsv_term(row[v]) if v in row else "" for v in variables)
+            for row in bindings
+        ]
+        return ("\n".join(lines) + "\n").encode(), "text/tab-separated-values"
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\r\n")
+    writer.writerow(variables)
+    writer.writerows([row[v]["value"] if v in row else "" for v in variables] for row in bindings)
+    return out.getvalue().encode(), "text/csv"
+
+
+class StubEndpoint:
+    """Answer SPARQL requests from *fixtures* after a simulated latency."""
+
+    def __init__(
+        self,
+        fixtures: list[Fixture],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        scale: int = 1,
+    ) -> None:
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.scale = scale
+        self.requests = 0
+        self.unmatched = 0
+
+    def answer(self, query: str) -> dict[str, Any]:
+        """Return the SPARQL JSON response for *query*."""
+        for fixture in self.fixtures:
+            match = fixture.match.search(query)
+            if match is not None:
+                response = _substitute(fixture.response, match.groupdict())
+                break
+        else:
+            self.unmatched += 1
+            return {"head": {"vars": []}, "results": {"bindings": []}}
+        if self.scale > 1 and "results" in response:
+            bindings = response["results"]["bindings"] * self.scale
+            response = {"head": response["head"], "results": {"bindings": bindings}}
+        return response
+
+    async def __call__(self, request: Request) -> Response:
+        self.requests += 1
+        query = await _read_query(request)
+        response = self.answer(query)
+        delay = self.latency + random.uniform(0.0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        body, media_type = serialize(response, request.headers.get("accept", ""))
+        return Response(body, media_type=media_type)
+
+
+async def _read_query(request: Request) -> str:
+    if request.method == "GET":
+        return request.query_params.get("query", "")
+    if request.headers.get("content-type", "").startswith("application/sparql-query"):
+        return (await request.body()).decode()
+    return str((await request.form()).get("query", ""))
+
+
+class Recorder:
+    """Forward queries to *upstream* and append the answers to *path*."""
+
+    def __init__(self, upstream: str, path: str | Path) -> None:
+        self.upstream = upstream
+        self.path = Path(path)
+        self._client = httpx.AsyncClient(timeout=120.0)
+
+    async def __call__(self, request: Request) -> Response:
+        query = await _read_query(request)
+        upstream = await self._client.post(
+            self.upstream,
+            content=query.encode(),
+            headers={
+                "Content-Type": "application/sparql-query",
+                "Accept": "application/sparql-results+json",
+            },
+        )
+        if not upstream.is_success:
+            return Response(upstream.content, status_code=upstream.status_code)
+        recorded = upstream.json()
+        data = (
+            json.loads(self.path.read_text(encoding="utf-8"))
+            if self.path.exists()
+            else {"fixtures": []}
+        )
+        data["fixtures"].append(
+            {"name": "recorded", "match": f"^{re.escape(query)}$", "response": recorded}
+        )
+        self.path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        body, media_type = serialize(recorded, request.headers.get("accept", ""))
+        return Response(body, media_type=media_type)
+
+
+def create_app(handler: StubEndpoint | Recorder) -> Starlette:
+    """Build the ASGI app serving *handler* at ``/sparql``."""
+    # A bound method, so Starlette wraps it as a request/response endpoint.
+    return Starlette(routes=[Route("/sparql", handler.__call__, methods=["GET", "POST"])])
+
+
+def main(argv: list[str] | None = None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stub SPARQL endpoint for benchmarks.")
+    parser.add_argument("--port", type=int, default=8890)
+    parser.add_argument("--fixtures", default=str(DEFAULT_FIXTURES))
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds.")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat each result row N times.")
+    parser.add_argument("--record", metavar="URL", help="Record answers from this endpoint.")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        handler: StubEndpoint | Recorder = Recorder(args.record, args.fixtures)
+    else:
+        handler = StubEndpoint(load_fixtures(args.fixtures), args.latency, args.jitter, args.scale)
+    uvicorn.run(create_app(handler), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
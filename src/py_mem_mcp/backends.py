@@ -0,0 +1,225 @@
+"""Pluggable query backends for :class:`~py_mem_mcp.sparql.SparqlClient`.
+
+By default the client sends queries to remote SPARQL endpoints over HTTP.
+A :class:`SparqlBackend` answers them in-process instead; the client keeps
+caching, scheduling, metrics and the slow-query log in front of it.
+
+:class:`OxigraphBackend` is an embedded, persistent on-disk store (the
+optional ``pyoxigraph`` package, ``poetry install --extras embedded``),
+loaded once from N-Triples/Turtle dumps of the graphs in the
+:class:`~py_mem_mcp.graphs.GraphRegistry`. Queries written for Virtuoso are
+adapted by :func:`adapt_query`: the prefixes Virtuoso predefines are
+declared, and ``bif:contains`` full-text patterns become word-prefix
+``REGEX`` filters. Solutions are read only up to the row cap a caller
+asks for, and every embedded query has a deadline.
+"""
+
+import asyncio
+import importlib.util
+import re
+import threading
+from pathlib import Path
+from typing import Protocol
+
+from .graphs import GraphRegistry
+from .results import SparqlBinding, SparqlResults
+
+#: Prefixes Virtuoso predefines that the tool queries rely on.
+STANDARD_PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+}
+
+#: File extensions of RDF dumps, in lookup order.
+DUMP_EXTENSIONS = (".nt", ".ttl", ".nt.gz", ".ttl.gz")
+
+_XSD_STRING = STANDARD_PREFIXES["xsd"] + "string"
+_CONTAINS = re.compile(r'(\?\w+)\s+bif:contains\s+"((?:[^"\\]|\\.)*)"\s*\.?')
+_CONTAINS_WORD = re.compile(r"'(\w+)\*?'")
+_FROM = re.compile(r"\bFROM\s+(?:NAMED\s+)?<", re.IGNORECASE)
+
+
+class SparqlBackend(Protocol):
+    """Answers SPARQL SELECT queries without an HTTP round trip."""
+
+    async def select(self, sparql: str, max_rows: int | None = None) -> SparqlResults:
+        """Run *sparql* and return its results.
+
+        With *max_rows*, at most ``max_rows + 1`` rows are returned, so the
+        caller can tell whether the results were cut off.
+
+        Raises:
+            RuntimeError: If the query fails or times out.
+        """
+        ...
+
+
+def _contains_filter(match: re.Match) -> str:
+    var, expression = match.group(1), match.group(2)
+    words = _CONTAINS_WORD.findall(expression) or re.findall(r"\w+", expression)
+    conditions = " && ".join(f'REGEX(STR({var}), "\\\\b{w}", "i")' for w in words)
+    return f"FILTER({conditions or 'false'})"
+
+
+def adapt_query(sparql: str) -> str:
+    """Rewrite a query written for Virtuoso for a standard SPARQL 1.1 store."""
+    sparql = _CONTAINS.sub(_contains_filter, sparql)
+    missing = [
+        f"PREFIX {name}: <{iri}>"
+        for name, iri in STANDARD_PREFIXES.items()
+        if not re.search(rf"\bPREFIX\s+{name}:", sparql, re.IGNORECASE)
+    ]
+    return "\n".join([*missing, sparql])
+
+
+def dump_names(graphs: GraphRegistry) -> dict[str, str]:
+    """Map the dump file stem expected for each graph to its graph IRI.
+
+    The infrastructure graphs are ``ontology``, ``schulart`` and
+    ``schulfach``; state graphs are ``state_<code>``, e.g. ``state_sn``.
+    """
+    ontology, schulart, schulfach = graphs.infra_graphs
+    names = {"ontology": ontology, "schulart": schulart, "schulfach": schulfach}
+    names.update({f"state_{code.lower()}": iri for code, iri in graphs.state_graphs.items()})
+    return names
+
+
+def find_dumps(directory: str | Path, graphs: GraphRegistry) -> list[tuple[str, Path]]:
+    """Return ``(graph IRI, dump file)`` pairs for the graphs dumped in *directory*.
+
+    Raises:
+        FileNotFoundError: If no dump is found for a graph.
+    """
+    directory = Path(directory)
+    found = []
+    for stem, graph in dump_names(graphs).items():
+        for extension in DUMP_EXTENSIONS:
+            path = directory / f"{stem}{extension}"
+            if path.exists():
+                found.append((graph, path))
+                break
+        else:
+            raise FileNotFoundError(
+                f"No dump for graph {graph} in {directory} "
+                f"(expected {stem} with one of {', '.join(DUMP_EXTENSIONS)})."
+            )
+    return found
+
+
+class OxigraphBackend:
+    """Embedded persistent store at *path*, backed by pyoxigraph.
+
+    Queries run in a worker thread and fail after *timeout* seconds; the
+    thread then stops reading solutions at the next one.
+
+    Raises:
+        EnvironmentError: If pyoxigraph is not installed.
+    """
+
+    def __init__(self, path: str | Path, timeout: float = 30.0) -> None:
+        if importlib.util.find_spec("pyoxigraph") is None:
+            raise EnvironmentError(
+                "The embedded store needs the optional pyoxigraph package "
+                "(poetry install --extras embedded)."
+            )
+        import pyoxigraph
+
+        self._ox = pyoxigraph
+        self.path = str(path)
+        self.timeout = timeout
+        self.store = pyoxigraph.Store(self.path)
+
+    def load(self, path: str | Path, graph: str) -> None:
+        """Bulk-load the N-Triples or Turtle dump at *path* into *graph*."""
+        ox = self._ox
+        name = Path(path).name.removesuffix(".gz")
+        format = ox.RdfFormat.from_extension(name.rsplit(".", 1)[-1])
+        if name != Path(path).name:
+            import gzip
+
+            with gzip.open(path, "rb") as data:
+                self.store.bulk_load(data, format, to_graph=ox.NamedNode(graph))
+        else:
+            self.store.bulk_load(path=str(path), format=format, to_graph=ox.NamedNode(graph))
+
+    def load_dumps(self, directory: str | Path, graphs: GraphRegistry) -> list[str]:
+        """Replace every registry graph with its dump from *directory*.
+
+        Returns:
+            The graph IRIs that were loaded.
+        """
+        dumps = find_dumps(directory, graphs)
+        for graph, path in dumps:
+            self.store.clear_graph(self._ox.NamedNode(graph))
+            self.load(path, graph)
+        self.store.optimize()
+        return [graph for graph, _ in dumps]
+
+    def named_graphs(self) -> list[str]:
+        return sorted(graph.value for graph in self.store.named_graphs())
+
+    def _term(self, term) -> SparqlBinding:
+        ox = self._ox
+        if isinstance(term, ox.NamedNode):
+            return SparqlBinding(type="uri", value=term.value)
+        if isinstance(term, ox.BlankNode):
+            return SparqlBinding(type="bnode", value=term.value)
+        if term.language:
+            return SparqlBinding(type="literal", value=term.value, lang=term.language)
+        datatype = term.datatype.value
+        return SparqlBinding(
+            type="literal",
+            value=term.value,
+            datatype=None if datatype == _XSD_STRING else datatype,
+        )
+
+    def _select(
+        self,
+        sparql: str,
+        max_rows: int | None = None,
+        stop: threading.Event | None = None,
+    ) -> SparqlResults:
+        try:
+            solutions = self.store.query(
+                adapt_query(sparql),
+                # Like Virtuoso, query all graphs when the query names none.
+                use_default_graph_as_union=not _FROM.search(sparql),
+            )
+        except (SyntaxError, ValueError, OSError) as exc:
+            raise RuntimeError(f"SPARQL query failed: {exc}") from exc
+        if not isinstance(solutions, self._ox.QuerySolutions):
+            raise RuntimeError("The embedded store only answers SELECT queries.")
+        variables = [v.value for v in solutions.variables]
+        results = SparqlResults(vars=variables)
+        # One row past the cap tells the caller that rows were left out.
+        limit = None if max_rows is None else max_rows + 1
+        for solution in solutions:
+            if stop is not None and stop.is_set():
+                raise RuntimeError("SPARQL query was abandoned.")
+            row = {}
+            for var in variables:
+                term = solution[var]
+                if term is not None:
+                    row[var] = self._term(term)
+            results.append(row)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    async def select(self, sparql: str, max_rows: int | None = None) -> SparqlResults:
+        """Run *sparql* in a worker thread, so the event loop is not blocked."""
+        stop = threading.Event()
+        try:
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._select, sparql, max_rows, stop), self.timeout
+            )
+        except TimeoutError:
+            raise RuntimeError(
+                f"SPARQL query timed out after {self.timeout:g} seconds."
+            ) from None
+        finally:
+            # A thread cannot be cancelled; make it stop at the next solution.
+            stop.set()
@@ -0,0 +1,150 @@
+"""Load balancing of SPARQL requests across read replicas.
+
+Each request goes to the replica with the fewest recent consecutive failures
+and, among those, the lowest expected cost, estimated as the EWMA of its
+observed latency multiplied by its outstanding requests + 1. A failure count
+expires ``eject_seconds`` after the last failure, so a replica that failed
+once or twice without being ejected gets traffic again.
+Replicas that fail repeatedly are ejected for a while and re-probed in the
+background; when every replica is ejected, the one due back first is used so
+that requests still have somewhere to go.
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from .config import env_float, env_int
+
+
+@dataclass
+class EndpointState:
+    """Health and load statistics of a single SPARQL endpoint."""
+
+    url: str
+    ewma: float | None = None
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    last_failure: float = 0.0
+    ejected_until: float = 0.0
+
+    def score(self) -> float:
+        # Unmeasured endpoints score 0 so that each gets tried early.
+        return (self.ewma or 0.0) * (self.outstanding + 1)
+
+
+class EndpointPool:
+    """Set of equivalent SPARQL endpoints with latency-aware selection.
+
+    Args:
+        urls: Endpoint URLs; at least one is required.
+        alpha: EWMA smoothing factor for latency samples.
+        eject_after: Consecutive failures after which an endpoint is ejected.
+        eject_seconds: How long an ejected endpoint is skipped.
+        probe_interval: Seconds between background probes of ejected endpoints.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        alpha: float = 0.3,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        probe_interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not urls:
+            raise ValueError("At least one SPARQL endpoint is required.")
+        self.states = [EndpointState(url) for url in urls]
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.probe_interval = probe_interval
+        self._clock = clock
+
+    @classmethod
+    def from_env(cls, urls: Sequence[str]) -> "EndpointPool":
+        """Build a pool for *urls* with ``SPARQL_EJECT_*`` / ``SPARQL_PROBE_INTERVAL`` settings."""
+        return cls(
+            urls,
+            eject_after=env_int("SPARQL_EJECT_AFTER", 3),
+            eject_seconds=env_float("SPARQL_EJECT_SECONDS", 30.0),
+            probe_interval=env_float("SPARQL_PROBE_INTERVAL", 10.0),
+        )
+
+    @property
+    def urls(self) -> list[str]:
+        return [state.url for state in self.states]
+
+    def is_ejected(self, state: EndpointState) -> bool:
+        return state.ejected_until > self._clock()
+
+    def recent_failures(self, state: EndpointState) -> int:
+        """Return the consecutive failures of *state*, forgetting expired ones."""
+        if (
+            state.consecutive_failures
+            and self._clock() - state.last_failure >= self.eject_seconds
+        ):
+            state.consecutive_failures = 0
+        return state.consecutive_failures
+
+    def choose(self) -> EndpointState:
+        """Return the endpoint with the lowest expected cost."""
+        if len(self.states) == 1:
+            return self.states[0]
+        healthy = [s for s in self.states if not self.is_ejected(s)]
+        if not healthy:
+            return min(self.states, key=lambda s: s.ejected_until)
+        # Endpoints that just failed lose to those that did not, even before
+        # they are ejected, so a retry lands on a different replica.
+        return min(
+            healthy, key=lambda s: (self.recent_failures(s), s.score(), s.outstanding)
+        )
+
+    @contextmanager
+    def lease(self, state: EndpointState) -> Iterator[EndpointState]:
+        """Count a request as outstanding on *state* for the block."""
+        state.outstanding += 1
+        try:
+            yield state
+        finally:
+            state.outstanding -= 1
+
+    def record_success(self, state: EndpointState, seconds: float) -> None:
+        """Fold a successful request's latency into the endpoint's EWMA."""
+        state.consecutive_failures = 0
+        state.ejected_until = 0.0
+        if state.ewma is None:
+            state.ewma = seconds
+        else:
+            state.ewma = self.alpha * seconds + (1 - self.alpha) * state.ewma
+
+    def record_failure(self, state: EndpointState) -> None:
+        """Count a failed request; ejects the endpoint after too many in a row."""
+        state.consecutive_failures = self.recent_failures(state) + 1
+        state.last_failure = self._clock()
+        if len(self.states) > 1 and state.consecutive_failures >= self.eject_after:
+            state.ejected_until = self._clock() + self.eject_seconds
+
+    async def probe_ejected(self, probe: Callable[[str], Awaitable[bool]]) -> None:
+        """Probe every ejected endpoint once and reinstate those that answer."""
+        for state in self.states:
+            if not self.is_ejected(state):
+                continue
+            try:
+                ok = await probe(state.url)
+            except Exception:
+                ok = False
+            if ok:
+                state.consecutive_failures = 0
+                state.ejected_until = 0.0
+                # Forget the latency measured while it was failing.
+                state.ewma = None
+
+    async def run_probes(self, probe: Callable[[str], Awaitable[bool]]) -> None:
+        """Re-probe ejected endpoints every ``probe_interval`` seconds, forever."""
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            await self.probe_ejected(probe)
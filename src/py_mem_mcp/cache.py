@@ -0,0 +1,182 @@
+"""In-process result cache for SPARQL queries.
+
+Results are cached under a key built from the normalised query text and the
+set of ``FROM`` graphs, with LRU eviction bounded by entry count and a TTL.
+Concurrent misses on the same key are coalesced so that only one request
+reaches the endpoint ("single flight").
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .config import env_float, env_int
+
+CacheKey = tuple[str, frozenset[str], str]
+
+# String literals and IRIs are kept verbatim; any other whitespace run
+# collapses to a single space.
+_TOKEN_RE = re.compile(
+    r'("""(?:[^"\\]|\\.|"(?!""))*"""'
+    r"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r"|<[^<>\s]*>)"
+    r"|\s+"
+)
+_FROM_RE = re.compile(r"\bFROM\s+<([^<>\s]*)>\s*", re.IGNORECASE)
+
+
+def cache_key(sparql: str, variant: str = "") -> CacheKey:
+    """Return the cache key for a SPARQL query string.
+
+    ``FROM <g>`` clauses are pulled out into an unordered graph set, so the
+    same query over the same graphs in a different order shares one entry.
+    *variant* distinguishes otherwise identical requests, e.g. the result
+    wire format.
+    """
+    graphs = frozenset(_FROM_RE.findall(sparql))
+    body = _FROM_RE.sub(" ", sparql)
+    normalized = _TOKEN_RE.sub(lambda m: m.group(1) or " ", body).strip()
+    return normalized, graphs, variant
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a :class:`ResultCache`."""
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ResultCache:
+    """Size- and TTL-bounded LRU cache with single-flight loading.
+
+    A ``max_entries`` of ``0`` disables storage but keeps request coalescing.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Any, asyncio.Future] = {}
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Read cache bounds from ``SPARQL_CACHE_SIZE`` and ``SPARQL_CACHE_TTL``."""
+        return cls(
+            max_entries=env_int("SPARQL_CACHE_SIZE", 1024),
+            ttl=env_float("SPARQL_CACHE_TTL", 300.0),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> Any | None:
+        """Return the cached value for *key*, or ``None`` if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def lookup(self, key: Any) -> Any | None:
+        """Like :meth:`get`, but counted as a hit or a miss in :attr:`stats`."""
+        value = self.get(key)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        """Store *value* under *key*, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate_graphs(self, graphs: set[str]) -> int:
+        """Drop entries whose query reads any of *graphs*; return how many.
+
+        Entries keyed by :func:`cache_key` without ``FROM`` clauses read the
+        endpoint's default dataset and are dropped as well.
+        """
+        stale = [
+            key for key in self._entries
+            if isinstance(key, tuple) and len(key) == 3
+            and (not key[1] or not key[1].isdisjoint(graphs))
+        ]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached entries (in-flight loads are unaffected)."""
+        self._entries.clear()
+
+    async def get_or_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for *key*, loading it with *loader* on a miss.
+
+        If another caller is already loading *key*, wait for its result
+        instead of starting a second load. Failed loads are not cached.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                self.stats.hits += 1
+                return value
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Retry only if the leading load was cancelled, not this caller.
+                task = asyncio.current_task()
+                if not pending.cancelled() or (task and task.cancelling()):
+                    raise
+
+        self.stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved when nobody else is waiting.
+            future.exception()
+            raise
+        else:
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,132 @@
+"""Per-graph change detection for locally cached ontology data.
+
+Local copies of the ontology (the name index, the search index, cached
+query results) used to be rebuilt wholesale on a timer, because nothing
+could tell which graph had changed. :class:`GraphWatcher` probes a cheap
+fingerprint of every graph in :attr:`GraphRegistry.all_graphs` — its triple
+count — with a single grouped query, and notifies its listeners with just
+the graphs whose fingerprint moved, so that only their data is re-pulled.
+"""
+
+import asyncio
+import inspect
+import logging
+from collections.abc import Awaitable, Callable
+
+from .graphs import GraphRegistry
+from .scheduler import Priority
+from .sparql import SparqlClient
+from .templates import QueryTemplate
+
+logger = logging.getLogger(__name__)
+
+ChangeListener = Callable[[set[str]], Awaitable[None] | None]
+
+
+class RefreshError(RuntimeError):
+    """Raised by a listener that refreshed only some of the changed graphs.
+
+    Args:
+        message: What failed.
+        graphs: The graphs whose refresh failed and should be retried.
+    """
+
+    def __init__(self, message: str, graphs: set[str]) -> None:
+        super().__init__(message)
+        self.graphs = graphs
+
+
+_FINGERPRINTS = QueryTemplate("""
+SELECT ?g (COUNT(*) AS ?n)
+WHERE {
+  VALUES ?g { {{graphs:iris}} }
+  GRAPH ?g { ?s ?p ?o . }
+}
+GROUP BY ?g""")
+
+
+def fingerprint_query(graphs: list[str]) -> str:
+    """Build the query returning the triple count of each of *graphs*."""
+    return _FINGERPRINTS.render(graphs=graphs)
+
+
+class GraphWatcher:
+    """Detects changed graphs by comparing per-graph fingerprints."""
+
+    def __init__(self, sparql_client: SparqlClient, graph_registry: GraphRegistry) -> None:
+        self.sparql = sparql_client
+        self.graphs = graph_registry
+        self.fingerprints: dict[str, str] = {}
+        self.pending: set[str] = set()
+        self._listeners: list[ChangeListener] = []
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Call *listener* with the set of changed graphs after each probe.
+
+        Listeners run in subscription order, so caches that others reload
+        through should subscribe first.
+        """
+        self._listeners.append(listener)
+
+    async def probe(self) -> dict[str, str]:
+        """Return the current fingerprint of every registered graph.
+
+        An empty graph has no row in the grouped result and maps to ``"0"``.
+        """
+        graphs = self.graphs.all_graphs
+        results = await self.sparql.query(
+            fingerprint_query(graphs), priority=Priority.HEAVY, cached=False
+        )
+        counts = dict(zip(results.values("g"), results.values("n")))
+        return {g: counts.get(g, "0") for g in graphs}
+
+    async def check(self) -> set[str]:
+        """Probe once and return the graphs that changed since the last probe.
+
+        The first probe only records the baseline and reports no changes.
+        Graphs whose last refresh failed are reported again until a
+        :meth:`notify` succeeds for them.
+        """
+        current = await self.probe()
+        if not self.fingerprints:
+            self.fingerprints = current
+            return set()
+        changed = {g for g, fp in current.items() if self.fingerprints.get(g) != fp}
+        changed |= self.fingerprints.keys() - current.keys()
+        self.fingerprints = current
+        return changed | self.pending
+
+    async def notify(self, changed: set[str]) -> None:
+        """Pass *changed* to every listener; a failing listener is logged.
+
+        The graphs a listener failed for stay in :attr:`pending` and are
+        reported by the next :meth:`check`. A listener raising
+        :class:`RefreshError` fails only its ``graphs``, any other
+        exception fails all of *changed*.
+        """
+        failed: set[str] = set()
+        for listener in self._listeners:
+            try:
+                outcome = listener(changed)
+                if inspect.isawaitable(outcome):
+                    await outcome
+            except RefreshError as exc:
+                logger.warning("Refresh after change of %s failed: %s", sorted(exc.graphs), exc)
+                failed |= exc.graphs & changed
+            except Exception as exc:
+                logger.warning("Refresh after change of %s failed: %s", sorted(changed), exc)
+                failed |= changed
+        self.pending = (self.pending - changed) | failed
+
+    async def run(self, interval: float) -> None:
+        """Probe every *interval* seconds and refresh what changed, forever."""
+        while True:
+            try:
+                changed = await self.check()
+            except RuntimeError as exc:
+                logger.warning("Graph fingerprint probe failed: %s", exc)
+            else:
+                if changed:
+                    logger.info("Graphs changed: %s", ", ".join(sorted(changed)))
+                    await self.notify(changed)
+            await asyncio.sleep(interval)
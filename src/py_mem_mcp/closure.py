@@ -0,0 +1,153 @@
+"""Precomputed ancestor closure of the "hat Teil" hierarchy.
+
+Subject-filtered ``search`` used the transitive path
+``?lp lp:LP_0000008+ ?s`` to find the Lehrplan above every label match,
+which the endpoint evaluates per candidate. :class:`ClosureTable` stores,
+for every node, the Lehrpläne it belongs to together with each Lehrplan's
+Schulfach and Bundesland, as integer arrays in a memory-mapped snapshot:
+
+* ``node_*``: the sorted node URIs, so a URI maps to its id by binary search;
+* ``node_lp_offsets`` / ``node_lps``: CSR lists of Lehrplan ids per node;
+* ``lp_*``: URI and label of each Lehrplan plus the ids of its Schulfach and
+  Bundesland in the sorted ``term_*`` table (``-1`` when absent).
+
+Filtering a label match by subject is then a lookup instead of a path query.
+"""
+
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .snapshot import SnapshotFile, StringTable, write_snapshot
+
+
+@dataclass(frozen=True, slots=True)
+class LehrplanInfo:
+    """A Lehrplan root with its label, Schulfach and Bundesland URIs."""
+
+    uri: str
+    label: str = ""
+    schulfach: str | None = None
+    bundesland: str | None = None
+
+
+class ClosureTable:
+    """Node → Lehrplan ancestor table backed by a snapshot file."""
+
+    KIND = "closure"
+
+    def __init__(self, file: SnapshotFile) -> None:
+        if file.meta.get("kind") != self.KIND:
+            raise ValueError(f"{file.path} is not a closure snapshot.")
+        self.file = file
+        self.meta = file.meta
+        self.nodes = StringTable(file.section("node_offsets"), file.section("node_blob"))
+        self._lp_offsets = file.section("node_lp_offsets")
+        self._lps = file.section("node_lps")
+        self.lp_uris = StringTable(file.section("lp_uri_offsets"), file.section("lp_uri_blob"))
+        self.lp_labels = StringTable(
+            file.section("lp_label_offsets"), file.section("lp_label_blob")
+        )
+        self._lp_schulfach = file.section("lp_schulfach")
+        self._lp_bundesland = file.section("lp_bundesland")
+        self.terms = StringTable(file.section("term_offsets"), file.section("term_blob"))
+
+    @classmethod
+    def open(cls, path: str | Path) -> "ClosureTable":
+        return cls(SnapshotFile(path))
+
+    def reload(self) -> None:
+        """Re-map the snapshot file in place after it was rewritten."""
+        self.__init__(SnapshotFile(self.file.path))
+
+    @staticmethod
+    def write(
+        path: str | Path,
+        edges: Iterable[tuple[str, str]],
+        lehrplaene: Iterable[LehrplanInfo],
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        """Compute the closure of *edges* below each Lehrplan and write it.
+
+        Like ``lp:LP_0000008+``, a Lehrplan is an ancestor of its proper
+        descendants only.
+        """
+        children: dict[str, list[str]] = {}
+        for parent, child in set(edges):
+            children.setdefault(parent, []).append(child)
+        lps = sorted({info.uri: info for info in lehrplaene}.values(), key=lambda i: i.uri)
+
+        ancestors: dict[str, list[int]] = {}
+        for lp_id, info in enumerate(lps):
+            seen: set[str] = set()
+            stack = list(children.get(info.uri, ()))
+            while stack:
+                node = stack.pop()
+                if node in seen:
+                    continue
+                seen.add(node)
+                ancestors.setdefault(node, []).append(lp_id)
+                stack.extend(children.get(node, ()))
+
+        nodes = sorted(ancestors)
+        node_lp_offsets = array("q", [0])
+        node_lps = array("i")
+        for node in nodes:
+            node_lps.extend(ancestors[node])
+            node_lp_offsets.append(len(node_lps))
+
+        terms = sorted({t for i in lps for t in (i.schulfach, i.bundesland) if t})
+        term_ids = {t: n for n, t in enumerate(terms)}
+        sections: dict[str, array | bytes] = {}
+        for name, strings in (
+            ("node", nodes),
+            ("lp_uri", [i.uri for i in lps]),
+            ("lp_label", [i.label for i in lps]),
+            ("term", terms),
+        ):
+            sections[f"{name}_offsets"], sections[f"{name}_blob"] = StringTable.build(strings)
+        sections["node_lp_offsets"] = node_lp_offsets
+        sections["node_lps"] = node_lps
+        sections["lp_schulfach"] = array("i", (term_ids.get(i.schulfach, -1) for i in lps))
+        sections["lp_bundesland"] = array("i", (term_ids.get(i.bundesland, -1) for i in lps))
+        write_snapshot(
+            path,
+            sections,
+            {**(meta or {}), "kind": ClosureTable.KIND,
+             "nodes": len(nodes), "lehrplaene": len(lps)},
+        )
+
+    def _term_id(self, uri: str | None) -> int | None:
+        if uri is None:
+            return None
+        term_id = self.terms.find(uri)
+        return -2 if term_id is None else term_id
+
+    def lehrplaene(
+        self,
+        node_uri: str,
+        schulfach: str | None = None,
+        bundesland: str | None = None,
+    ) -> list[tuple[str, str]]:
+        """Return ``(uri, label)`` of the Lehrpläne above *node_uri*, sorted.
+
+        Optionally only those with the given Schulfach and/or Bundesland URI.
+        Lehrpläne without a Bundesland (no ``lp:LP_0000029``) pass the
+        Bundesland filter: the state graphs searched already scope them.
+        """
+        node_id = self.nodes.find(node_uri)
+        if node_id is None:
+            return []
+        schulfach_id = self._term_id(schulfach)
+        bundesland_id = self._term_id(bundesland)
+        found = []
+        for lp_id in self._lps[self._lp_offsets[node_id]:self._lp_offsets[node_id + 1]]:
+            if schulfach_id is not None and self._lp_schulfach[lp_id] != schulfach_id:
+                continue
+            lp_bundesland = self._lp_bundesland[lp_id]
+            if bundesland_id is not None and lp_bundesland not in (bundesland_id, -1):
+                continue
+            found.append((self.lp_uris[lp_id], self.lp_labels[lp_id]))
+        return sorted(found)
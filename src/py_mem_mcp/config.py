@@ -33,3 +33,58 @@ def require_env(name: str) -> str:
             "See .env.example for reference."
         )
     return value
+
+
+def env_int(name: str, default: int) -> int:
+    """Return an optional integer environment variable, or *default* if unset.
+
+    Raises:
+        EnvironmentError: If the variable is set but not a valid integer.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise EnvironmentError(
+            f'Invalid value for {name}: "{value}". Must be an integer.'
+        ) from None
+
+
+def env_float(name: str, default: float) -> float:
+    """Return an optional float environment variable, or *default* if unset.
+
+    Raises:
+        EnvironmentError: If the variable is set but not a valid number.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise EnvironmentError(
+            f'Invalid value for {name}: "{value}". Must be a number.'
+        ) from None
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Return an optional boolean environment variable, or *default* if unset.
+
+    Accepts ``1/true/yes/on`` and ``0/false/no/off`` (case-insensitive).
+
+    Raises:
+        EnvironmentError: If the variable is set to anything else.
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "yes", "on"):
+        return True
+    if lowered in ("0", "false", "no", "off"):
+        return False
+    raise EnvironmentError(
+        f'Invalid value for {name}: "{value}". Must be true or false.'
+    )
@@ -0,0 +1,111 @@
+"""Decoding of SPARQL JSON result documents into :class:`SparqlResults`.
+
+Three backends are supported and picked automatically at import time, fastest
+first:
+
+* ``msgspec`` decodes the document in one typed pass straight into slotted
+  term structs, without building intermediate dicts;
+* ``orjson`` parses into plain dicts considerably faster than the stdlib;
+* ``json`` from the standard library is always available as the fallback.
+
+Install the ``fast`` extra to get msgspec. Whichever backend is used, a
+truncated or malformed document raises :class:`RuntimeError`, like any
+other failed SPARQL request.
+"""
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+from .results import SparqlResults
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on installed extras
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed extras
+    orjson = None
+
+
+def _malformed(exc: Exception) -> RuntimeError:
+    return RuntimeError(f"Malformed SPARQL JSON results: {exc!r}")
+
+
+def _decode_json(body: bytes) -> SparqlResults:
+    try:
+        return _from_document(json.loads(body))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise _malformed(exc) from None
+
+
+def _decode_orjson(body: bytes) -> SparqlResults:
+    try:
+        return _from_document(orjson.loads(body))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise _malformed(exc) from None
+
+
+def _from_document(data: dict[str, Any]) -> SparqlResults:
+    results = SparqlResults(vars=data["head"]["vars"])
+    append = results.append_json
+    for raw in data["results"]["bindings"]:
+        append(raw)
+    return results
+
+
+if msgspec is not None:
+
+    class _Term(msgspec.Struct, frozen=True):
+        type: str
+        value: str
+        lang: str | None = msgspec.field(default=None, name="xml:lang")
+        datatype: str | None = None
+
+    class _Head(msgspec.Struct):
+        vars: list[str] = []
+
+    class _Body(msgspec.Struct):
+        bindings: list[dict[str, _Term]] = []
+
+    class _Document(msgspec.Struct):
+        head: _Head
+        results: _Body
+
+    _msgspec_decoder = msgspec.json.Decoder(_Document)
+
+    def _decode_msgspec(body: bytes) -> SparqlResults:
+        try:
+            document = _msgspec_decoder.decode(body)
+        except msgspec.DecodeError as exc:
+            # Also covers ValidationError, its subclass.
+            raise _malformed(exc) from None
+        results = SparqlResults(vars=document.head.vars)
+        append = results.append_terms
+        for row in document.results.bindings:
+            append(row)
+        return results
+
+
+DECODERS: dict[str, Callable[[bytes], SparqlResults]] = {"json": _decode_json}
+if orjson is not None:
+    DECODERS["orjson"] = _decode_orjson
+if msgspec is not None:
+    DECODERS["msgspec"] = _decode_msgspec
+
+#: Name of the backend used by :func:`decode_results`.
+DECODER_BACKEND = next(
+    name for name in ("msgspec", "orjson", "json") if name in DECODERS
+)
+
+#: Fastest available ``loads`` for single JSON fragments (used when streaming).
+loads: Callable[[bytes | bytearray], Any] = orjson.loads if orjson is not None else json.loads
+
+_decode = DECODERS[DECODER_BACKEND]
+
+
+def decode_results(body: bytes) -> SparqlResults:
+    """Decode a SPARQL JSON results document with the selected backend."""
+    return _decode(body)
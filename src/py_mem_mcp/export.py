@@ -0,0 +1,249 @@
+"""Command-line exporter for local snapshots of the MEM ontology.
+
+Pulls bulk data from the SPARQL endpoint once and writes it to a snapshot
+file that the server memory-maps at startup::
+
+    py-mem-mcp-export hierarchy --output hierarchy.snap
+    py-mem-mcp-export labels --output labels.snap
+    py-mem-mcp-export closure --output closure.snap
+
+``load`` instead fills the embedded store used with ``SPARQL_BACKEND=embedded``
+from RDF dumps of the registry graphs (see :mod:`py_mem_mcp.backends`)::
+
+    py-mem-mcp-export load --store /data/store --dumps /data/dumps
+
+Reads the same environment variables (``.env``) as the server, which also
+uses :func:`refresh_hierarchy` and :func:`refresh_closure` to rewrite its
+snapshots when a graph they were exported from changes.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timezone
+
+from .backends import OxigraphBackend
+from .closure import ClosureTable, LehrplanInfo
+from .config import init_env_vars, require_env
+from .graphs import GraphRegistry
+from .scheduler import Priority
+from .snapshot import HierarchySnapshot
+from .sparql import SparqlClient
+from .templates import QueryTemplate
+from .text_index import fetch_label_docs, read_label_snapshot, write_label_snapshot
+
+logger = logging.getLogger(__name__)
+
+_EDGES_QUERY = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT ?parent ?child
+{{graphs:from}}
+WHERE {
+  ?parent lp:LP_0000008 ?child .
+}""")
+
+_LABELS_QUERY = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?node ?label
+{{graphs:from}}
+WHERE {
+  { ?node lp:LP_0000008 ?other . } UNION { ?other lp:LP_0000008 ?node . }
+  ?node rdfs:label ?label .
+}""")
+
+_LEHRPLAENE_QUERY = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT ?lp ?label ?schulfach ?bundesland
+{{graphs:from}}
+WHERE {
+  ?lp lp:LP_0000537 ?schulfach .
+  ?lp rdfs:label ?label .
+  OPTIONAL { ?lp lp:LP_0000029 ?bundesland . }
+}""")
+
+
+async def _edges(sparql: SparqlClient, graphs: list[str]) -> list[tuple[str, str]]:
+    edges: list[tuple[str, str]] = []
+    async with sparql.stream(
+        _EDGES_QUERY.render(graphs=graphs), priority=Priority.HEAVY
+    ) as rows:
+        async for row in rows:
+            edges.append((row["parent"].value, row["child"].value))
+    return edges
+
+
+async def export_hierarchy(sparql: SparqlClient, graphs: GraphRegistry, path: str) -> dict:
+    """Write the "hat Teil" hierarchy with node labels to a snapshot at *path*.
+
+    Both queries are streamed, so the export never holds a decoded response
+    body in memory. German labels are preferred when a node has several.
+
+    Returns:
+        The metadata stored in the snapshot.
+    """
+    edges = await _edges(sparql, graphs.all_graphs)
+
+    labels: dict[str, str] = {}
+    async with sparql.stream(
+        _LABELS_QUERY.render(graphs=graphs.all_graphs), priority=Priority.HEAVY
+    ) as rows:
+        async for row in rows:
+            node, label = row["node"].value, row["label"]
+            if node not in labels or label.lang == "de":
+                labels[node] = label.value
+
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "graphs": graphs.all_graphs,
+    }
+    HierarchySnapshot.write(path, edges, labels, meta)
+    return HierarchySnapshot.open(path).meta
+
+
+async def export_labels(sparql: SparqlClient, graphs: GraphRegistry, path: str) -> int:
+    """Write every ``rdfs:label`` of all graphs to a label snapshot at *path*.
+
+    Returns:
+        The number of exported labels.
+    """
+    docs = []
+    for graph in graphs.all_graphs:
+        docs.extend(await fetch_label_docs(sparql, graphs, graph))
+    meta = {"created": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    write_label_snapshot(path, docs, meta)
+    return len(read_label_snapshot(path))
+
+
+async def export_closure(sparql: SparqlClient, graphs: GraphRegistry, path: str) -> dict:
+    """Write the Lehrplan ancestor closure of every hierarchy node to *path*.
+
+    Each Lehrplan keeps one label (German preferred), Schulfach and Bundesland.
+
+    Returns:
+        The metadata stored in the snapshot.
+    """
+    edges = await _edges(sparql, graphs.all_graphs)
+
+    lehrplaene: dict[str, LehrplanInfo] = {}
+    async with sparql.stream(
+        _LEHRPLAENE_QUERY.render(graphs=graphs.all_graphs), priority=Priority.HEAVY
+    ) as rows:
+        async for row in rows:
+            uri, label = row["lp"].value, row["label"]
+            if uri not in lehrplaene or label.lang == "de":
+                lehrplaene[uri] = LehrplanInfo(
+                    uri,
+                    label.value,
+                    row["schulfach"].value,
+                    row["bundesland"].value if "bundesland" in row else None,
+                )
+
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "graphs": graphs.all_graphs,
+    }
+    ClosureTable.write(path, edges, lehrplaene.values(), meta)
+    return ClosureTable.open(path).meta
+
+
+async def refresh_hierarchy(
+    sparql: SparqlClient,
+    graphs: GraphRegistry,
+    snapshot: HierarchySnapshot,
+    changed: set[str],
+) -> None:
+    """Re-export *snapshot* and reload it in place if *changed* affects it.
+
+    Raises:
+        RuntimeError, OSError: If the re-export fails; *snapshot* keeps
+            serving the previous file.
+    """
+    if changed.isdisjoint(snapshot.meta.get("graphs", graphs.all_graphs)):
+        return
+    path = snapshot.file.path
+    logger.info("Re-exporting hierarchy snapshot %s", path)
+    await export_hierarchy(sparql, graphs, str(path))
+    snapshot.reload()
+
+
+async def refresh_closure(
+    sparql: SparqlClient,
+    graphs: GraphRegistry,
+    closure: ClosureTable,
+    changed: set[str],
+) -> None:
+    """Re-export *closure* and reload it in place if *changed* affects it.
+
+    Raises:
+        RuntimeError, OSError: If the re-export fails; *closure* keeps
+            serving the previous file.
+    """
+    if changed.isdisjoint(closure.meta.get("graphs", graphs.all_graphs)):
+        return
+    path = closure.file.path
+    logger.info("Re-exporting closure snapshot %s", path)
+    await export_closure(sparql, graphs, str(path))
+    closure.reload()
+
+
+def load_store(graphs: GraphRegistry, store: str, dumps: str) -> list[str]:
+    """Load the dumps of all registry graphs in *dumps* into the store at *store*.
+
+    Returns:
+        The graph IRIs that were loaded.
+    """
+    return OxigraphBackend(store).load_dumps(dumps, graphs)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    graphs = GraphRegistry()
+    if args.command == "load":
+        loaded = await asyncio.to_thread(load_store, graphs, args.store, args.dumps)
+        print(f"Loaded {len(loaded)} graphs into {args.store}.")
+        return
+    async with SparqlClient(require_env("SPARQL_ENDPOINT").split(",")[0].strip()) as sparql:
+        if args.command == "hierarchy":
+            meta = await export_hierarchy(sparql, graphs, args.output)
+            print(f"Wrote {args.output}: {meta['nodes']} nodes, {meta['edges']} edges.")
+        elif args.command == "closure":
+            meta = await export_closure(sparql, graphs, args.output)
+            print(
+                f"Wrote {args.output}: {meta['nodes']} nodes, {meta['lehrplaene']} Lehrpläne."
+            )
+        else:
+            count = await export_labels(sparql, graphs, args.output)
+            print(f"Wrote {args.output}: {count} labels.")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point for the snapshot exporter."""
+    parser = argparse.ArgumentParser(
+        prog="py-mem-mcp-export", description="Export local snapshots of the MEM ontology."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    hierarchy = commands.add_parser("hierarchy", help='Export the "hat Teil" hierarchy.')
+    hierarchy.add_argument("--output", "-o", required=True, help="Snapshot file to write.")
+    labels = commands.add_parser("labels", help="Export all labels for the local search index.")
+    labels.add_argument("--output", "-o", required=True, help="Snapshot file to write.")
+    closure = commands.add_parser(
+        "closure", help="Export the Lehrplan ancestor closure for subject-filtered search."
+    )
+    closure.add_argument("--output", "-o", required=True, help="Snapshot file to write.")
+    load = commands.add_parser("load", help="Load RDF dumps into the embedded store.")
+    load.add_argument("--store", required=True, help="Directory of the embedded store.")
+    load.add_argument(
+        "--dumps", required=True, help="Directory with ontology.ttl, state_sn.nt, ... dumps."
+    )
+    args = parser.parse_args(argv)
+
+    init_env_vars()
+    try:
+        asyncio.run(_run(args))
+    except (EnvironmentError, RuntimeError) as exc:
+        print(f"Export failed: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Per-state-graph fan-out for queries over all graphs.
+
+A query with every infrastructure and state graph in one ``FROM`` list makes
+the endpoint evaluate a single large merged-dataset query. :class:`FanOut`
+instead runs the query once per state partition (the infrastructure graphs
+plus one state graph), concurrently under a bound, and merges the ordered
+partial results with a k-way merge. Rows found in several partitions, e.g.
+matches from the shared infrastructure graphs, are returned once, and a
+global ``LIMIT`` is kept: each partition returns its own first *limit* rows,
+which always contain the first *limit* rows overall.
+
+An ``OPTIONAL`` part can match in a graph of another partition only: that
+partition still returns the row, with the optional variables unbound.
+:func:`merge_results` drops such rows when another partition binds them.
+"""
+
+import asyncio
+import heapq
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+from .config import env_int
+from .graphs import GraphRegistry
+from .results import SparqlBinding, SparqlResults
+from .sparql import ResultFormat, SparqlClient
+
+
+def _sort_key(order_by: Sequence[str]) -> Callable[[Mapping[str, SparqlBinding]], tuple]:
+    return lambda row: tuple(row[v].value if v in row else "" for v in order_by)
+
+
+def _drop_unmatched(
+    rows: Iterable[Mapping[str, SparqlBinding]],
+    key_vars: Sequence[str],
+    optional: Sequence[str],
+) -> Iterator[Mapping[str, SparqlBinding]]:
+    """Drop rows leaving *optional* unbound that another row of their group binds.
+
+    An unbound row sorts before the bound rows of its group, so it is held
+    back until the next row shows whether the group has any.
+    """
+    held = None
+    for row in rows:
+        bound = any(v in row for v in optional)
+        if held is not None:
+            if all(row.get(v) == held.get(v) for v in key_vars):
+                if not bound:
+                    continue
+                held = None
+            else:
+                yield held
+                held = None
+        if bound:
+            yield row
+        else:
+            held = row
+    if held is not None:
+        yield held
+
+
+def merge_results(
+    parts: Sequence[SparqlResults],
+    order_by: Sequence[str],
+    limit: int | None = None,
+    optional: Sequence[str] = (),
+) -> SparqlResults:
+    """K-way merge of results that are each sorted by *order_by*.
+
+    Duplicate rows are dropped and at most *limit* rows are kept.
+
+    Args:
+        parts: Per-partition results.
+        order_by: Variables the parts are sorted by.
+        limit: Maximum number of merged rows.
+        optional: Variables bound by an ``OPTIONAL`` that may match in
+            another partition. A row leaving them unbound is dropped if a
+            row with the same other values binds them. They must come last
+            in *order_by*.
+    """
+    vars_ = next((part.vars for part in parts if part.vars), [])
+    merged = SparqlResults(vars=vars_)
+    seen: set[tuple] = set()
+    rows = heapq.merge(*(part.bindings for part in parts), key=_sort_key(order_by))
+    if optional:
+        key_vars = [v for v in vars_ if v not in optional]
+        rows = _drop_unmatched(rows, key_vars, optional)
+    for row in rows:
+        if limit is not None and len(seen) >= limit:
+            break
+        identity = tuple(row.get(v) for v in vars_)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        merged.append(row)
+    return merged
+
+
+class FanOut:
+    """Runs an all-graphs query as concurrent per-state queries."""
+
+    def __init__(
+        self,
+        sparql_client: SparqlClient,
+        graph_registry: GraphRegistry,
+        concurrency: int = 4,
+    ) -> None:
+        self.sparql = sparql_client
+        self.graphs = graph_registry
+        self.concurrency = concurrency
+
+    @classmethod
+    def from_env(
+        cls, sparql_client: SparqlClient, graph_registry: GraphRegistry
+    ) -> "FanOut | None":
+        """Enable fan-out when ``SPARQL_FANOUT_CONCURRENCY`` is above zero."""
+        concurrency = env_int("SPARQL_FANOUT_CONCURRENCY", 0)
+        if concurrency <= 0:
+            return None
+        return cls(sparql_client, graph_registry, concurrency)
+
+    def partitions(self) -> list[list[str]]:
+        """Graph sets of the per-state queries; all graphs if no state is registered."""
+        codes = list(self.graphs.state_graphs)
+        if not codes:
+            return [self.graphs.all_graphs]
+        return [self.graphs.graphs_for_bundesland(code) for code in codes]
+
+    async def query(
+        self,
+        build_query: Callable[[list[str]], str],
+        order_by: Sequence[str],
+        limit: int | None = None,
+        format: ResultFormat | None = None,
+        optional: Sequence[str] = (),
+    ) -> SparqlResults:
+        """Run ``build_query(graphs)`` per partition and merge the results.
+
+        Args:
+            build_query: Renders the query for one list of ``FROM`` graphs. It
+                must order its rows by *order_by* and apply *limit* itself.
+            order_by: Variables the partial results are sorted by.
+            limit: Global row limit of the merged result.
+            format: Wire format; the client's tabular format by default.
+            optional: Variables of a cross-partition ``OPTIONAL``; see
+                :func:`merge_results`.
+        """
+        format = format or self.sparql.tabular_format
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(graphs: list[str]) -> SparqlResults:
+            async with semaphore:
+                return await self.sparql.query(build_query(graphs), format=format)
+
+        parts = await asyncio.gather(*(run(graphs) for graphs in self.partitions()))
+        return merge_results(parts, order_by, limit, optional)
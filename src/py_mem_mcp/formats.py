@@ -0,0 +1,184 @@
+"""SPARQL result wire formats and their parsers.
+
+Besides the JSON results format, endpoints can return SELECT results as
+tab-separated (TSV) or comma-separated (CSV) text. Both are far more compact
+than JSON, where every cell is wrapped in a ``{type, value, ...}`` object, and
+parse much faster. TSV keeps full term syntax (IRIs, language tags,
+datatypes); CSV only carries plain values and reports every term as a
+``literal``. Tools that only render values can therefore request TSV or CSV.
+
+Virtuoso's TSV deviates from the SPARQL 1.1 format: header names are quoted
+(``"parent"`` rather than ``?parent``) and IRIs are written as quoted strings
+without angle brackets. :func:`parse_tsv` recognises this dialect by its
+quoted header and reads quoted absolute IRIs as ``uri`` terms.
+"""
+
+import csv
+import io
+import re
+from collections.abc import Callable
+from enum import Enum
+
+from .decoding import decode_results
+from .results import SparqlResults
+
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+
+_INTEGER_RE = re.compile(r"[+-]?\d+\Z")
+_DECIMAL_RE = re.compile(r"[+-]?\d*\.\d+\Z")
+_DOUBLE_RE = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+\Z")
+_ESCAPE_RE = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+_QUOTED_IRI_RE = re.compile(r'"((?:[A-Za-z][\w+.-]*://|urn:)[^\s"<>\\]+)"\Z')
+_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f"}
+
+
+class ResultFormat(str, Enum):
+    """Wire format requested from the SPARQL endpoint."""
+
+    JSON = "json"
+    TSV = "tsv"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        """The ``Accept`` media type for this format."""
+        return _MEDIA_TYPES[self]
+
+
+_MEDIA_TYPES = {
+    ResultFormat.JSON: "application/sparql-results+json",
+    ResultFormat.TSV: "text/tab-separated-values",
+    ResultFormat.CSV: "text/csv",
+}
+
+
+def _unescape(match: re.Match) -> str:
+    if match.group(1) or match.group(2):
+        return chr(int(match.group(1) or match.group(2), 16))
+    char = match.group(3)
+    return _ESCAPES.get(char, char)
+
+
+def _parse_tsv_term(field: str) -> tuple[str, str, str | None, str | None]:
+    """Parse one TSV cell in SPARQL term syntax into (type, value, lang, datatype)."""
+    first = field[0]
+    if first == "<" and field[-1] == ">":
+        return "uri", field[1:-1], None, None
+    if first == '"' or first == "'":
+        end = field.rfind(first)
+        if end > 0:
+            value = field[1:end]
+            if "\\" in value:
+                value = _ESCAPE_RE.sub(_unescape, value)
+            suffix = field[end + 1:]
+            if suffix.startswith("@"):
+                return "literal", value, suffix[1:], None
+            if suffix.startswith("^^<") and suffix.endswith(">"):
+                return "literal", value, None, suffix[3:-1]
+            return "literal", value, None, None
+    if field.startswith("_:"):
+        return "bnode", field[2:], None, None
+    if _INTEGER_RE.match(field):
+        return "literal", field, None, _XSD + "integer"
+    if _DECIMAL_RE.match(field):
+        return "literal", field, None, _XSD + "decimal"
+    if _DOUBLE_RE.match(field):
+        return "literal", field, None, _XSD + "double"
+    if field in ("true", "false"):
+        return "literal", field, None, _XSD + "boolean"
+    # Lenient: some endpoints emit bare strings.
+    return "literal", field, None, None
+
+
+def _parse_virtuoso_term(field: str) -> tuple[str, str, str | None, str | None]:
+    """Parse one cell of Virtuoso's TSV, in which IRIs are quoted strings."""
+    match = _QUOTED_IRI_RE.match(field)
+    if match is not None:
+        return "uri", match.group(1), None, None
+    return _parse_tsv_term(field)
+
+
+def parse_tsv(body: bytes) -> SparqlResults:
+    """Parse a SPARQL TSV results document into ``SparqlResults``.
+
+    Both the SPARQL 1.1 format and Virtuoso's variant with quoted header
+    names and quoted IRIs are accepted.
+
+    Raises:
+        RuntimeError: If a row does not have one field per variable.
+    """
+    lines = body.decode("utf-8").split("\n")
+    header = lines[0].rstrip("\r")
+    names = header.split("\t") if header else []
+    virtuoso = any(len(name) > 1 and name[0] == name[-1] == '"' for name in names)
+    vars_ = [name.strip('"').lstrip("?$") for name in names]
+    parse_term = _parse_virtuoso_term if virtuoso else _parse_tsv_term
+    results = SparqlResults(vars=vars_)
+    columns = [results.columns[v] for v in vars_]
+    intern = results.terms.intern
+    # Identical cells (a parent URI on every child row) are parsed only once.
+    seen: dict[str, int] = {}
+    width = len(vars_)
+
+    for line in lines[1:]:
+        if line.endswith("\r"):
+            line = line[:-1]
+        if not line:
+            continue
+        fields = line.split("\t")
+        if len(fields) != width:
+            raise RuntimeError(
+                f"Malformed SPARQL TSV results: expected {width} fields, got {len(fields)}"
+            )
+        for column, field in zip(columns, fields):
+            if not field:
+                column.append(-1)
+                continue
+            term_id = seen.get(field)
+            if term_id is None:
+                term_id = seen[field] = intern(*parse_term(field))
+            column.append(term_id)
+        results.row_count += 1
+    return results
+
+
+def parse_csv(body: bytes) -> SparqlResults:
+    """Parse a SPARQL CSV results document into ``SparqlResults``.
+
+    CSV carries no term types; every non-empty cell becomes a ``literal`` and
+    empty cells are treated as unbound.
+    """
+    reader = csv.reader(io.StringIO(body.decode("utf-8"), newline=""))
+    header = next(reader, [])
+    results = SparqlResults(vars=header)
+    columns = [results.columns[v] for v in header]
+    intern = results.terms.intern
+    seen: dict[str, int] = {}
+
+    for fields in reader:
+        if not fields:
+            continue
+        for column, field in zip(columns, fields):
+            if not field:
+                column.append(-1)
+                continue
+            term_id = seen.get(field)
+            if term_id is None:
+                term_id = seen[field] = intern("literal", field)
+            column.append(term_id)
+        for column in columns[len(fields):]:
+            column.append(-1)
+        results.row_count += 1
+    return results
+
+
+_PARSERS: dict[ResultFormat, Callable[[bytes], SparqlResults]] = {
+    ResultFormat.JSON: decode_results,
+    ResultFormat.TSV: parse_tsv,
+    ResultFormat.CSV: parse_csv,
+}
+
+
+def parse_results(body: bytes, format: ResultFormat) -> SparqlResults:
+    """Parse a results document in the given wire *format*."""
+    return _PARSERS[format](body)
@@ -3,6 +3,7 @@
 import os
 
 from .config import require_env
+from .templates import from_block
 
 
 class GraphRegistry:
@@ -43,5 +44,5 @@ class GraphRegistry:
 
     @staticmethod
     def from_clauses(graphs: list[str]) -> str:
-        """Build SPARQL ``FROM`` clauses for the given list of graph URIs."""
-        return "\n".join(f"FROM <{g}>" for g in graphs)
+        """Build SPARQL ``FROM`` clauses for the given list of graph URIs (cached)."""
+        return from_block(graphs)
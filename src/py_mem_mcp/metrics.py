@@ -0,0 +1,235 @@
+"""Prometheus-style metrics for tool calls and SPARQL requests.
+
+:class:`Metrics` holds the counters, gauges and histograms of one server and
+renders them in the Prometheus text exposition format, served at
+``METRICS_PATH`` next to the streamable-HTTP transport. Tool calls are
+measured by :class:`~py_mem_mcp.middleware.MetricsMiddleware`; SPARQL round
+trips, response sizes and row counts by the
+:class:`~py_mem_mcp.sparql.SparqlClient`, labelled with the calling tool.
+The queue depth and wait times of a watched
+:class:`~py_mem_mcp.scheduler.RequestScheduler` are read at each render.
+
+The collectors are small in-process implementations, so no client library
+is needed; all updates happen on the event loop thread.
+"""
+
+import bisect
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+
+from .config import env_bool
+from .scheduler import RequestScheduler
+
+#: Latency buckets in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+#: Response size buckets in bytes.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+#: Result row count buckets.
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+
+#: Label value for work that is not attributed to a tool (startup, probes).
+NO_TOOL = "none"
+#: Label value for calls of tools the server does not have.
+UNKNOWN_TOOL = "unknown"
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    """Base class: a named family of samples keyed by label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, values: Labels, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Yield the sample lines of every label set."""
+
+    def render(self) -> Iterator[str]:
+        """Yield the ``HELP``/``TYPE`` header and all sample lines."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{self._labels(labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """A value per label set that can go up and down."""
+
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    @contextmanager
+    def track(self, *labels: str) -> Iterator[None]:
+        """Count the enclosed block as in progress."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def count(self, *labels: str) -> int:
+        return sum(self._counts.get(labels, ()))
+
+    def _samples(self) -> Iterator[str]:
+        bounds = (*self.buckets, float("inf"))
+        for labels, counts in sorted(self._counts.items()):
+            total = 0
+            for bound, count in zip(bounds, counts):
+                total += count
+                le = self._labels(labels, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{le} {total}"
+            yield f"{self.name}_sum{self._labels(labels)} {_number(self._sums[labels])}"
+            yield f"{self.name}_count{self._labels(labels)} {total}"
+
+
+class Metrics:
+    """All metrics of one server instance."""
+
+    def __init__(self, path: str = "/metrics") -> None:
+        self.path = path
+        self.tool_calls = Counter("mcp_tool_calls_total", "MCP tool calls.", ["tool"])
+        self.tool_errors = Counter(
+            "mcp_tool_errors_total", "MCP tool calls that raised an error.", ["tool"]
+        )
+        self.tool_latency = Histogram(
+            "mcp_tool_duration_seconds", "MCP tool call latency.", ["tool"]
+        )
+        self.tool_in_flight = Gauge(
+            "mcp_tool_calls_in_flight", "MCP tool calls in progress.", ["tool"]
+        )
+        self.sparql_latency = Histogram(
+            "sparql_request_duration_seconds",
+            "SPARQL HTTP round-trip time per attempt.",
+            ["tool"],
+        )
+        self.sparql_errors = Counter(
+            "sparql_request_errors_total",
+            "SPARQL requests that failed or returned an error status.",
+            ["tool"],
+        )
+        self.sparql_bytes = Histogram(
+            "sparql_response_bytes", "SPARQL response body size.", ["tool"], SIZE_BUCKETS
+        )
+        self.sparql_rows = Histogram(
+            "sparql_result_rows", "Rows per SPARQL result.", ["tool"], ROW_BUCKETS
+        )
+        self.sparql_in_flight = Gauge(
+            "sparql_requests_in_flight", "SPARQL HTTP requests in progress."
+        )
+        self._scheduler: RequestScheduler | None = None
+
+    @classmethod
+    def from_env(cls) -> "Metrics | None":
+        """Read ``METRICS_ENABLED`` and ``METRICS_PATH``; None when disabled."""
+        if not env_bool("METRICS_ENABLED", True):
+            return None
+        return cls(path=os.environ.get("METRICS_PATH", "/metrics"))
+
+    def watch_scheduler(self, scheduler: RequestScheduler) -> None:
+        """Export the queue depth and wait times of *scheduler*."""
+        self._scheduler = scheduler
+        self.scheduler_queue_depth = Gauge(
+            "sparql_scheduler_queue_depth",
+            "SPARQL requests waiting for a scheduler slot.",
+            ["priority"],
+        )
+        self.scheduler_mean_wait = Gauge(
+            "sparql_scheduler_wait_seconds_mean",
+            "Mean time queued SPARQL requests waited for a slot.",
+        )
+        self.scheduler_max_wait = Gauge(
+            "sparql_scheduler_wait_seconds_max",
+            "Longest time a SPARQL request waited for a slot.",
+        )
+
+    def _collect(self) -> None:
+        """Read the current values of watched components into their gauges."""
+        if self._scheduler is None:
+            return
+        stats = self._scheduler.stats()
+        for priority, depth in stats.queue_depth.items():
+            self.scheduler_queue_depth.set(depth, priority)
+        self.scheduler_mean_wait.set(stats.mean_wait_seconds)
+        self.scheduler_max_wait.set(stats.max_wait_seconds)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        self._collect()
+        lines: list[str] = []
+        for metric in vars(self).values():
+            if isinstance(metric, _Metric):
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+"""FastMCP middleware shared by all tools.
+
+:class:`ToolContextMiddleware` records the name of the tool being executed in
+the :data:`current_tool` context variable, so that lower layers such as the
+SPARQL client can attribute their work to a tool without every call site
+having to pass the name down. :class:`MetricsMiddleware` counts and times
+tool calls, and :class:`TracingMiddleware` opens the root span of each call.
+"""
+
+import time
+from contextvars import ContextVar
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from . import tracing
+from .metrics import UNKNOWN_TOOL, Metrics
+
+#: Name of the MCP tool currently being executed, if any.
+current_tool: ContextVar[str | None] = ContextVar("current_tool", default=None)
+
+
+class ToolContextMiddleware(Middleware):
+    """Set :data:`current_tool` for the duration of each tool call."""
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        token = current_tool.set(context.message.name)
+        try:
+            return await call_next(context)
+        finally:
+            current_tool.reset(token)
+
+
+class MetricsMiddleware(Middleware):
+    """Record call counts, errors, latency and in-flight calls per tool.
+
+    Calls of names the server has no tool for are labelled ``unknown``, so
+    clients cannot create label values at will.
+    """
+
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self._known: set[str] = set()
+
+    async def _tool_label(self, context: MiddlewareContext[mt.CallToolRequestParams]) -> str:
+        name = context.message.name
+        if name in self._known:
+            return name
+        server = context.fastmcp_context.fastmcp if context.fastmcp_context else None
+        if server is not None and await server.get_tool(name) is not None:
+            self._known.add(name)
+            return name
+        return UNKNOWN_TOOL
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        metrics = self.metrics
+        tool = await self._tool_label(context)
+        metrics.tool_calls.inc(tool)
+        started = time.perf_counter()
+        try:
+            with metrics.tool_in_flight.track(tool):
+                return await call_next(context)
+        except Exception:
+            metrics.tool_errors.inc(tool)
+            raise
+        finally:
+            metrics.tool_latency.observe(time.perf_counter() - started, tool)
+
+
+class TracingMiddleware(Middleware):
+    """Wrap each tool call in a ``tool <name>`` span (see :mod:`py_mem_mcp.tracing`)."""
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        with tracing.span(f"tool {name}", **{"mcp.tool.name": name}):
+            return await call_next(context)
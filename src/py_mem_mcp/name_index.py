@@ -0,0 +1,121 @@
+"""Prewarmed Schulfach/Schulart name→URI index.
+
+Filtered ``find_lehrplaene`` and ``search`` calls resolve subject and school
+type names to URIs. Instead of a SPARQL round trip with a ``LCASE(STR())``
+scan per lookup, :class:`NameIndex` loads every (Bundesland, label) → URI pair
+for each configured state once at startup and refreshes it periodically.
+Lookups are dictionary hits; the SPARQL resolvers remain the fallback on a
+miss.
+"""
+
+import asyncio
+import logging
+
+from .bundesland import BUNDESLAND_URI
+from .graphs import GraphRegistry
+from .sparql import SparqlClient
+from .templates import QueryTemplate
+
+logger = logging.getLogger(__name__)
+
+#: Predicates linking a Lehrplan to its Schulfach and Schulart.
+SCHULFACH = "lp:LP_0000537"
+SCHULART = "lp:LP_0000812"
+
+_NAMES = """
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?uri ?l
+{{graphs:from}}
+WHERE {
+  ?s %s ?uri .
+  ?uri rdfs:label ?l .
+  ?s lp:LP_0000029 {{bundesland:iri}} .
+}"""
+_NAMES_BY_PREDICATE = {
+    SCHULFACH: QueryTemplate(_NAMES % SCHULFACH),
+    SCHULART: QueryTemplate(_NAMES % SCHULART),
+}
+
+
+def normalize_label(label: str) -> str:
+    """Normalise a label for lookup the way the SPARQL resolvers compare it."""
+    return label.strip().lower()
+
+
+class NameIndex:
+    """In-memory index of Schulfach and Schulart labels per Bundesland."""
+
+    def __init__(self, sparql_client: SparqlClient, graph_registry: GraphRegistry) -> None:
+        self.sparql = sparql_client
+        self.graphs = graph_registry
+        # predicate -> Bundesland URI -> normalised label -> URI
+        self._entries: dict[str, dict[str, dict[str, str]]] = {
+            SCHULFACH: {},
+            SCHULART: {},
+        }
+
+    def lookup(self, predicate: str, bundesland_uri: str, name: str) -> str | None:
+        """Return the URI for *name* in the given Bundesland, or None on a miss."""
+        labels = self._entries[predicate].get(bundesland_uri)
+        if labels is None:
+            return None
+        return labels.get(normalize_label(name))
+
+    def lookup_schulfach(self, bundesland_uri: str, name: str) -> str | None:
+        return self.lookup(SCHULFACH, bundesland_uri, name)
+
+    def lookup_schulart(self, bundesland_uri: str, name: str) -> str | None:
+        return self.lookup(SCHULART, bundesland_uri, name)
+
+    async def _fetch(self, predicate: str, code: str, bundesland_uri: str) -> dict[str, str]:
+        query = _NAMES_BY_PREDICATE[predicate].render(
+            graphs=self.graphs.graphs_for_bundesland(code), bundesland=bundesland_uri
+        )
+        results = await self.sparql.query(query, format=self.sparql.tabular_format)
+        labels: dict[str, str] = {}
+        for uri, label in zip(results.values("uri"), results.values("l")):
+            labels.setdefault(normalize_label(label), uri)
+        return labels
+
+    async def load_state(self, code: str) -> None:
+        """(Re)load the index entries of one Bundesland by its code."""
+        bundesland_uri = BUNDESLAND_URI.get(code)
+        if bundesland_uri is None:
+            return
+        schulfach, schulart = await asyncio.gather(
+            self._fetch(SCHULFACH, code, bundesland_uri),
+            self._fetch(SCHULART, code, bundesland_uri),
+        )
+        self._entries[SCHULFACH][bundesland_uri] = schulfach
+        self._entries[SCHULART][bundesland_uri] = schulart
+
+    async def load(self) -> None:
+        """Load the index for every state with a registered graph.
+
+        A state that fails to load is logged and left to the SPARQL fallback.
+        """
+        codes = list(self.graphs.state_graphs)
+        outcomes = await asyncio.gather(
+            *(self.load_state(code) for code in codes), return_exceptions=True
+        )
+        for code, outcome in zip(codes, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Could not load name index for %s: %s", code, outcome)
+
+    async def refresh(self, changed: set[str]) -> None:
+        """Reload only the states affected by the *changed* graphs.
+
+        A changed state graph reloads that state; a changed infrastructure
+        graph (labels of subjects and school types) reloads every state.
+        """
+        if not changed.isdisjoint(self.graphs.infra_graphs):
+            await self.load()
+            return
+        codes = [code for code, graph in self.graphs.state_graphs.items() if graph in changed]
+        await asyncio.gather(*(self.load_state(code) for code in codes))
+
+    async def run_refresh(self, interval: float) -> None:
+        """Reload the whole index every *interval* seconds, forever."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.load()
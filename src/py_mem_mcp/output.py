@@ -0,0 +1,236 @@
+"""Budget-aware rendering of SPARQL results as tool output.
+
+Rows are rendered one at a time, so streamed results never have to be
+collected first, and rendering stops once the next row would exceed a byte
+budget: reading the stream stops too, and the output ends with a notice
+saying how many rows were shown. Room for that notice is reserved in the
+budget up front, so the whole output stays within it. Two renderings are
+available:
+
+- :class:`TableWriter`, the pipe-delimited text table of
+  :meth:`~py_mem_mcp.sparql.SparqlClient.format_results`;
+- :class:`JsonWriter`, compact JSON with one array per row, in which IRIs
+  are shortened to CURIEs such as ``lp:LP_0000008`` and the prefixes used
+  are listed once.
+
+Budgets count UTF-8 bytes of the rows and header; roughly four bytes make
+one LLM token.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterable, Mapping, Sequence
+
+from .results import SparqlBinding
+
+#: Prefixes for CURIEs in JSON output.
+PREFIXES: dict[str, str] = {
+    "lp": "https://w3id.org/lehrplan/ontology/",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+    "owl": "http://www.w3.org/2002/07/owl#",
+    "skos": "http://www.w3.org/2004/02/skos/core#",
+}
+
+#: Characters that may not appear in the local part of a CURIE here.
+_NOT_LOCAL = frozenset("/#?:")
+
+Row = Mapping[str, SparqlBinding]
+
+
+def curie(uri: str, prefixes: Mapping[str, str] = PREFIXES) -> tuple[str, str] | None:
+    """Return ``(prefix, CURIE)`` for *uri*, or None if no prefix fits."""
+    for name, namespace in prefixes.items():
+        if uri.startswith(namespace):
+            local = uri[len(namespace):]
+            if local and not _NOT_LOCAL.intersection(local):
+                return name, f"{name}:{local}"
+    return None
+
+
+class _Writer(ABC):
+    """Collect rendered rows until the byte budget is used up.
+
+    Args:
+        vars: The result variables, in column order.
+        max_bytes: Byte budget of the whole output, notices included.
+        limit_note: Notice for :meth:`finish` ``(limited=True)``, when the
+            caller cut the rows short itself (e.g. at a row limit).
+        reserve: Bytes of the budget kept for text the caller appends.
+    """
+
+    def __init__(
+        self,
+        vars: Sequence[str],
+        max_bytes: int | None = None,
+        limit_note: str | None = None,
+        reserve: int = 0,
+    ) -> None:
+        self.vars = list(vars)
+        self.max_bytes = max_bytes
+        self.limit_note = limit_note
+        self.reserve = reserve
+        self.rows = 0
+        self.truncated = False
+        self._parts: list[str] = []
+        self._size = 0
+
+    @abstractmethod
+    def _render(self, row: Row) -> str:
+        """Render one row as it appears in the output."""
+
+    def _budget_note(self, rows: int) -> str:
+        return f"Output truncated after {rows} rows to stay within {self.max_bytes} bytes"
+
+    @abstractmethod
+    def _notice(self, note: str) -> str:
+        """Render *note* as it is appended to the output."""
+
+    def _reserve(self) -> int:
+        """Return the bytes to keep free for the caller and the longest notice."""
+        if self.max_bytes is None:
+            return 0
+        # There can be no more rows than budget bytes.
+        notes = [self._budget_note(self.max_bytes)]
+        if self.limit_note is not None:
+            notes.append(self.limit_note)
+        return self.reserve + max(len(self._notice(note).encode()) for note in notes)
+
+    def _closing_notice(self, limited: bool) -> str:
+        """Return the notice that ends the output, if rows were left out."""
+        if self.truncated:
+            return self._notice(self._budget_note(self.rows))
+        if limited and self.limit_note is not None:
+            return self._notice(self.limit_note)
+        return ""
+
+    def add(self, row: Row) -> bool:
+        """Add *row*; return False, and add nothing, once the budget is exceeded."""
+        part = self._render(row)
+        size = len(part.encode()) + 1
+        if self.max_bytes is not None and self._size + size > self.max_bytes:
+            self.truncated = True
+            return False
+        self._parts.append(part)
+        self._size += size
+        self.rows += 1
+        self._accepted()
+        return True
+
+    def _accepted(self) -> None:
+        """Hook run after the last rendered row was kept."""
+
+    async def consume(self, rows: AsyncIterable[Row]) -> None:
+        """Add streamed *rows* until they end or the budget is exceeded."""
+        async for row in rows:
+            if not self.add(row):
+                break
+
+
+class TableWriter(_Writer):
+    """Render rows as a pipe-delimited table with a header row.
+
+    Args:
+        advice: What the budget notice suggests to get the rest of the rows.
+    """
+
+    def __init__(
+        self,
+        vars: Sequence[str],
+        max_bytes: int | None = None,
+        limit_note: str | None = None,
+        reserve: int = 0,
+        advice: str = "Add a LIMIT, select fewer variables or narrow the query.",
+    ) -> None:
+        super().__init__(vars, max_bytes, limit_note, reserve)
+        self.advice = advice
+        self._size = len(self._header().encode()) + 5 + self._reserve()
+
+    def _header(self) -> str:
+        return " | ".join(self.vars)
+
+    def _render(self, row: Row) -> str:
+        return " | ".join(row[v].value if v in row else "" for v in self.vars)
+
+    def _budget_note(self, rows: int) -> str:
+        return f"{super()._budget_note(rows)}; further rows were not shown. {self.advice}"
+
+    def _notice(self, note: str) -> str:
+        return f"\n\n({note})"
+
+    def finish(self, limited: bool = False) -> str:
+        """Return the table, with a notice if rows were left out.
+
+        Args:
+            limited: The caller cut the rows short; adds ``limit_note``.
+        """
+        if not self.rows and not self.truncated:
+            return "No results."
+        text = "\n".join([self._header(), "---", *self._parts])
+        return text + self._closing_notice(limited)
+
+
+class JsonWriter(_Writer):
+    """Render rows as compact JSON with IRIs shortened to CURIEs.
+
+    The output is ``{"prefixes": {...}, "vars": [...], "rows": [[...], ...]}``
+    plus ``"truncated": true`` and a ``"note"`` when rows were left out.
+    Unbound values are ``null``.
+    """
+
+    def __init__(
+        self,
+        vars: Sequence[str],
+        max_bytes: int | None = None,
+        limit_note: str | None = None,
+        reserve: int = 0,
+        prefixes: Mapping[str, str] = PREFIXES,
+    ) -> None:
+        super().__init__(vars, max_bytes, limit_note, reserve)
+        self.prefixes = prefixes
+        self._used: dict[str, str] = {}
+        self._row_prefixes: set[str] = set()
+        # Reserve room for the head as if every prefix were used.
+        head = json.dumps({"prefixes": dict(prefixes), "vars": self.vars}, ensure_ascii=False)
+        self._size = len(head.encode()) + len(',"rows":[]}') + self._reserve()
+
+    def _value(self, binding: SparqlBinding) -> str:
+        if binding.type == "uri":
+            short = curie(binding.value, self.prefixes)
+            if short is not None:
+                self._row_prefixes.add(short[0])
+                return short[1]
+        return binding.value
+
+    def _render(self, row: Row) -> str:
+        self._row_prefixes.clear()
+        values = [self._value(row[v]) if v in row else None for v in self.vars]
+        return json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+
+    def _accepted(self) -> None:
+        for name in self._row_prefixes:
+            self._used[name] = self.prefixes[name]
+
+    def _budget_note(self, rows: int) -> str:
+        return f"{super()._budget_note(rows)}. Add a LIMIT or narrow the query."
+
+    def _notice(self, note: str) -> str:
+        tail = json.dumps(
+            {"truncated": True, "note": note}, ensure_ascii=False, separators=(",", ":")
+        )
+        return "," + tail[1:-1]
+
+    def finish(self, limited: bool = False) -> str:
+        """Return the JSON document.
+
+        Args:
+            limited: The caller cut the rows short; adds ``limit_note``.
+        """
+        head = json.dumps(
+            {"prefixes": dict(sorted(self._used.items())), "vars": self.vars},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        rows = ",".join(self._parts)
+        return f'{head[:-1]},"rows":[{rows}]{self._closing_notice(limited)}}}'
@@ -0,0 +1,100 @@
+"""Keyset pagination with opaque continuation cursors.
+
+``OFFSET`` paging makes the endpoint produce and skip every earlier row, so
+each page costs more than the one before. Keyset pagination remembers the
+sort key of the last row shown instead, and the next page filters on
+``key > last`` with the same ``ORDER BY``, so every page costs the same.
+
+A cursor is the URL-safe base64 encoding of that key, tagged with a hash of
+the tool arguments it was issued for; it is meaningless to clients and is
+rejected when passed with different arguments.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .results import SparqlBinding, SparqlResults
+from .templates import literal
+
+#: Default and maximum number of rows per page.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def cursor_scope(tool: str, **arguments: Any) -> str:
+    """Return the tag binding a cursor to one tool call's arguments."""
+    payload = json.dumps([tool, arguments], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2s(payload.encode(), digest_size=6).hexdigest()
+
+
+def encode_cursor(scope: str, key: Sequence[Any]) -> str:
+    """Encode the sort *key* of the last row shown as an opaque cursor."""
+    payload = json.dumps({"s": scope, "k": list(key)}, ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, scope: str) -> list[Any]:
+    """Return the sort key stored in *cursor*.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for other arguments.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key, cursor_scope_ = payload["k"], payload["s"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor. Use the cursor from the previous page.") from None
+    if cursor_scope_ != scope or not isinstance(key, list):
+        raise ValueError(
+            "This cursor belongs to a different query. "
+            "Repeat the call with the same arguments as the previous page."
+        )
+    return key
+
+
+def keyset_filter(expressions: Sequence[str], key: Sequence[str]) -> str:
+    """Build a ``FILTER`` keeping rows whose sort key comes after *key*.
+
+    *expressions* are the string-valued ``ORDER BY`` expressions; the filter
+    is their lexicographic comparison with the previous page's last key.
+    """
+    clauses = []
+    for i, expression in enumerate(expressions):
+        equal = [f"{expressions[j]} = {literal(key[j])}" for j in range(i)]
+        clauses.append(" && ".join([*equal, f"{expression} > {literal(key[i])}"]))
+    return "FILTER(" + " || ".join(f"({clause})" for clause in clauses) + ")"
+
+
+def row_key(row: Mapping[str, SparqlBinding], key_vars: Sequence[str]) -> list[str]:
+    """Return the sort key of *row*, ``""`` for unbound variables."""
+    return [row[v].value if v in row else "" for v in key_vars]
+
+
+@dataclass
+class Page:
+    """One page of results and the cursor of the next page, if any."""
+
+    results: SparqlResults
+    next_key: list[Any] | None = None
+
+
+def take_page(results: SparqlResults, page_size: int, key_vars: Sequence[str]) -> Page:
+    """Cut a result fetched with ``LIMIT page_size + 1`` down to one page."""
+    if len(results) <= page_size:
+        return Page(results)
+    page = results.head(page_size)
+    return Page(page, row_key(page.bindings[page_size - 1], key_vars))
+
+
+def page_footer(page: Page, scope: str) -> str:
+    """Return the continuation note appended to a page with more rows."""
+    if page.next_key is None:
+        return ""
+    cursor = encode_cursor(scope, page.next_key)
+    return f'\n\n(More results available. Call again with cursor="{cursor}" for the next page.)'
@@ -0,0 +1,193 @@
+"""Failure handling for SPARQL requests: retries, hedging and circuit breaking.
+
+* :class:`RetryPolicy` retries read-only queries on transient failures with
+  exponential backoff and full jitter.
+* :class:`HedgePolicy` sends a second, identical request when the first one
+  is slower than a percentile of recently observed latencies and uses
+  whichever answers first.
+* :class:`CircuitBreaker` fails fast while the endpoint is unhealthy and lets
+  a single probe through after a cool-down.
+"""
+
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+from .config import env_bool, env_float, env_int
+
+#: HTTP status codes that indicate a transient endpoint problem.
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+_PROLOGUE_RE = re.compile(
+    r"\s*(?:#[^\n]*\n|PREFIX\s+[\w.-]*:\s*<[^>]*>|BASE\s+<[^>]*>)", re.IGNORECASE
+)
+_READ_FORMS = ("SELECT", "ASK", "CONSTRUCT", "DESCRIBE")
+
+
+def is_read_only(sparql: str) -> bool:
+    """Return True if *sparql* is a query form (SELECT/ASK/CONSTRUCT/DESCRIBE)."""
+    pos = 0
+    while match := _PROLOGUE_RE.match(sparql, pos):
+        pos = match.end()
+    return sparql[pos:].lstrip().upper().startswith(_READ_FORMS)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a request is refused because the circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for idempotent SPARQL requests.
+
+    A read timeout means the endpoint accepted the query and is still
+    working on it, so it is only retried with ``retry_read_timeouts``.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.2
+    max_backoff: float = 2.0
+    retry_read_timeouts: bool = False
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Read ``SPARQL_RETRIES`` and the ``SPARQL_RETRY_*`` settings."""
+        return cls(
+            attempts=1 + max(0, env_int("SPARQL_RETRIES", cls.attempts - 1)),
+            backoff=env_float("SPARQL_RETRY_BACKOFF", cls.backoff),
+            max_backoff=env_float("SPARQL_RETRY_MAX_BACKOFF", cls.max_backoff),
+            retry_read_timeouts=env_bool(
+                "SPARQL_RETRY_READ_TIMEOUTS", cls.retry_read_timeouts
+            ),
+        )
+
+    def retries(self, exc: httpx.TransportError) -> bool:
+        """Return whether a request that failed with *exc* may be retried."""
+        return self.retry_read_timeouts or not isinstance(exc, httpx.ReadTimeout)
+
+    def delay(self, attempt: int) -> float:
+        """Return the jittered delay before retry number *attempt* (0-based)."""
+        return random.uniform(0.0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+@dataclass
+class HedgePolicy:
+    """Settings and latency window for hedged requests.
+
+    A hedge is sent once the first request has been outstanding longer than
+    the ``percentile`` of the last ``window`` successful latencies. Hedging is
+    off while fewer than ``min_samples`` latencies have been observed.
+    """
+
+    percentile: float = 95.0
+    min_samples: int = 20
+    window: int = 200
+    _samples: deque[float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._samples = deque(maxlen=self.window)
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy | None":
+        """Read ``SPARQL_HEDGE_PERCENTILE``; returns None when it is unset or 0."""
+        percentile = env_float("SPARQL_HEDGE_PERCENTILE", 0.0)
+        if percentile <= 0:
+            return None
+        if percentile >= 100:
+            raise EnvironmentError(
+                f"Invalid value for SPARQL_HEDGE_PERCENTILE: {percentile}. "
+                "Must be between 0 and 100."
+            )
+        return cls(
+            percentile=percentile,
+            min_samples=env_int("SPARQL_HEDGE_MIN_SAMPLES", cls.min_samples),
+        )
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a successful request."""
+        self._samples.append(seconds)
+
+    def hedge_after(self) -> float | None:
+        """Return the delay after which to hedge, or None if not enough data."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    requests fail immediately. Once ``reset_timeout`` seconds have passed, one
+    probe request is let through (half-open): success closes the circuit,
+    failure opens it again. A probe that never reports back (e.g. because it
+    was cancelled) is replaced after another ``reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Read ``SPARQL_BREAKER_THRESHOLD`` and ``SPARQL_BREAKER_RESET``."""
+        return cls(
+            failure_threshold=env_int("SPARQL_BREAKER_THRESHOLD", 5),
+            reset_timeout=env_float("SPARQL_BREAKER_RESET", 30.0),
+        )
+
+    def check(self) -> None:
+        """Admit a request or raise :class:`CircuitOpenError`."""
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if remaining > 0:
+                raise CircuitOpenError(
+                    "SPARQL endpoint unavailable (circuit open, "
+                    f"retrying in {remaining:.0f}s)."
+                )
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+        now = self._clock()
+        if (
+            self._probe_started is not None
+            and now - self._probe_started < self.reset_timeout
+        ):
+            raise CircuitOpenError("SPARQL endpoint unavailable (probe in progress).")
+        self._probe_started = now
+
+    def record_success(self) -> None:
+        """Record a successful request; closes the circuit."""
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed request; may open the circuit."""
+        self._failures += 1
+        self._probe_started = None
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = self._clock()
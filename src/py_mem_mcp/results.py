@@ -0,0 +1,226 @@
+"""Result types for SPARQL SELECT queries.
+
+:class:`SparqlResults` stores results column by column: every variable maps
+to an integer array of term ids, and each distinct RDF term is stored once in
+a per-result :class:`TermTable`. URIs and labels that repeat across many rows
+(parents in a Lehrplan tree, for example) therefore cost one small integer per
+row. Row-wise access through :attr:`SparqlResults.bindings` is kept as a lazy
+view that builds nothing until a row is looked at.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+_UNBOUND = -1
+
+
+@dataclass(frozen=True, slots=True)
+class SparqlBinding:
+    """A single binding value returned by a SPARQL query."""
+
+    type: str
+    value: str
+    lang: str | None = None
+    datatype: str | None = None
+
+
+class TermTable:
+    """Interned pool of RDF terms shared by all columns of a result."""
+
+    __slots__ = ("terms", "_ids")
+
+    def __init__(self) -> None:
+        self.terms: list[SparqlBinding] = []
+        self._ids: dict[tuple[str, str, str | None, str | None], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __getitem__(self, term_id: int) -> SparqlBinding:
+        return self.terms[term_id]
+
+    def intern(
+        self,
+        type: str,
+        value: str,
+        lang: str | None = None,
+        datatype: str | None = None,
+    ) -> int:
+        """Return the id of the given term, adding it to the table if new."""
+        key = (type, value, lang, datatype)
+        term_id = self._ids.get(key)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._ids[key] = term_id
+            self.terms.append(SparqlBinding(type, value, lang, datatype))
+        return term_id
+
+    def intern_binding(self, binding: SparqlBinding) -> int:
+        """Return the id of *binding*, adding it to the table if new."""
+        key = (binding.type, binding.value, binding.lang, binding.datatype)
+        term_id = self._ids.get(key)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._ids[key] = term_id
+            self.terms.append(binding)
+        return term_id
+
+
+class _RowView(Mapping[str, SparqlBinding]):
+    """Read-only ``{var: SparqlBinding}`` view of one row of a result."""
+
+    __slots__ = ("_results", "_index")
+
+    def __init__(self, results: "SparqlResults", index: int) -> None:
+        self._results = results
+        self._index = index
+
+    def __getitem__(self, var: str) -> SparqlBinding:
+        column = self._results.columns.get(var)
+        if column is None:
+            raise KeyError(var)
+        term_id = column[self._index]
+        if term_id == _UNBOUND:
+            raise KeyError(var)
+        return self._results.terms[term_id]
+
+    def __contains__(self, var: object) -> bool:
+        column = self._results.columns.get(var)  # type: ignore[arg-type]
+        return column is not None and column[self._index] != _UNBOUND
+
+    def __iter__(self) -> Iterator[str]:
+        index = self._index
+        for var, column in self._results.columns.items():
+            if column[index] != _UNBOUND:
+                yield var
+
+    def __len__(self) -> int:
+        index = self._index
+        return sum(
+            1 for column in self._results.columns.values() if column[index] != _UNBOUND
+        )
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class _RowsView(Sequence[Mapping[str, SparqlBinding]]):
+    """Lazy sequence of row views over a columnar result."""
+
+    __slots__ = ("_results",)
+
+    def __init__(self, results: "SparqlResults") -> None:
+        self._results = results
+
+    def __len__(self) -> int:
+        return self._results.row_count
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [_RowView(self._results, i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return _RowView(self._results, index)
+
+    def __iter__(self) -> Iterator[Mapping[str, SparqlBinding]]:
+        results = self._results
+        for i in range(results.row_count):
+            yield _RowView(results, i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class SparqlResults:
+    """Structured results from a SPARQL SELECT query.
+
+    Stored column-wise with interned terms; ``bindings`` offers the familiar
+    list-of-dicts access as a lazy view.
+    """
+
+    __slots__ = ("vars", "terms", "columns", "row_count")
+
+    def __init__(
+        self,
+        vars: list[str],
+        bindings: Iterable[Mapping[str, SparqlBinding]] | None = None,
+    ) -> None:
+        self.vars = list(vars)
+        self.terms = TermTable()
+        self.columns: dict[str, array] = {v: array("i") for v in self.vars}
+        self.row_count = 0
+        for row in bindings or ():
+            self.append(row)
+
+    @property
+    def bindings(self) -> _RowsView:
+        """Row-wise view: a sequence of ``{var: SparqlBinding}`` mappings."""
+        return _RowsView(self)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __repr__(self) -> str:
+        return f"SparqlResults(vars={self.vars!r}, rows={self.row_count})"
+
+    def _column(self, var: str) -> array:
+        column = self.columns.get(var)
+        if column is None:
+            # Variable not announced in the head: backfill earlier rows as unbound.
+            column = self.columns[var] = array("i", [_UNBOUND]) * self.row_count
+        return column
+
+    def _finish_row(self) -> None:
+        self.row_count += 1
+        for column in self.columns.values():
+            if len(column) < self.row_count:
+                column.append(_UNBOUND)
+
+    def append(self, row: Mapping[str, SparqlBinding]) -> None:
+        """Append one row of ``SparqlBinding`` values."""
+        for var, binding in row.items():
+            self._column(var).append(self.terms.intern_binding(binding))
+        self._finish_row()
+
+    def append_json(self, raw: Mapping[str, Mapping[str, Any]]) -> None:
+        """Append one row in SPARQL JSON results form (``{var: {type, value, ...}}``)."""
+        intern = self.terms.intern
+        for var, val in raw.items():
+            self._column(var).append(
+                intern(val["type"], val["value"], val.get("xml:lang"), val.get("datatype"))
+            )
+        self._finish_row()
+
+    def append_terms(self, row: Mapping[str, Any]) -> None:
+        """Append one row of term objects with ``type``/``value``/``lang``/``datatype``."""
+        intern = self.terms.intern
+        for var, term in row.items():
+            self._column(var).append(
+                intern(term.type, term.value, term.lang, term.datatype)
+            )
+        self._finish_row()
+
+    def head(self, n: int) -> "SparqlResults":
+        """Return the first *n* rows as a new result sharing this term table."""
+        first = SparqlResults(vars=self.vars)
+        first.terms = self.terms
+        first.columns = {var: column[:n] for var, column in self.columns.items()}
+        first.row_count = min(n, self.row_count)
+        return first
+
+    def values(self, var: str) -> list[str]:
+        """Return the plain string values of *var*, ``""`` where unbound."""
+        column = self.columns.get(var)
+        if column is None:
+            return [""] * self.row_count
+        terms = self.terms.terms
+        return [terms[t].value if t != _UNBOUND else "" for t in column]
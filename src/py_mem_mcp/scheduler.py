@@ -0,0 +1,171 @@
+"""Concurrency limiting and prioritisation of outgoing SPARQL requests.
+
+All requests share a global concurrency cap. Requests are classified into
+priority classes by the tool that issued them: cheap navigation tools are
+``INTERACTIVE`` and are dispatched first, while expensive ad-hoc and deep tree
+queries are ``HEAVY`` and additionally bounded by their own, smaller cap, so
+they can never occupy every slot.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from .config import env_int
+
+
+class Priority(IntEnum):
+    """Priority class of a SPARQL request; lower values are served first."""
+
+    INTERACTIVE = 0
+    STANDARD = 1
+    HEAVY = 2
+
+
+TOOL_PRIORITIES: dict[str, Priority] = {
+    "get_children": Priority.INTERACTIVE,
+    "list_bundeslaender": Priority.INTERACTIVE,
+    "list_schulfaecher": Priority.INTERACTIVE,
+    "list_schularten": Priority.INTERACTIVE,
+    "get_children_batch": Priority.STANDARD,
+    "find_lehrplaene": Priority.STANDARD,
+    "search": Priority.STANDARD,
+    "get_lehrplan_tree": Priority.HEAVY,
+    "sparql_query": Priority.HEAVY,
+}
+
+
+def priority_for(tool: str | None) -> Priority:
+    """Return the priority class for requests issued by *tool*."""
+    if tool is None:
+        return Priority.STANDARD
+    return TOOL_PRIORITIES.get(tool, Priority.STANDARD)
+
+
+@dataclass
+class SchedulerStats:
+    """Point-in-time view of a :class:`RequestScheduler`."""
+
+    in_flight: int
+    heavy_in_flight: int
+    queue_depth: dict[str, int] = field(default_factory=dict)
+    waits: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def mean_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.waits if self.waits else 0.0
+
+
+class RequestScheduler:
+    """Priority-aware semaphore for outgoing SPARQL requests.
+
+    Args:
+        max_concurrency: Global cap on requests in flight.
+        max_heavy: Cap on ``HEAVY`` requests in flight (within the global cap).
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_heavy: int = 4) -> None:
+        if max_concurrency < 1 or max_heavy < 1:
+            raise ValueError("Scheduler limits must be at least 1.")
+        self.max_concurrency = max_concurrency
+        self.max_heavy = min(max_heavy, max_concurrency)
+        self._in_flight = 0
+        self._heavy_in_flight = 0
+        self._waiters: dict[Priority, deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @classmethod
+    def from_env(cls) -> "RequestScheduler":
+        """Read limits from ``SPARQL_MAX_CONCURRENCY`` and ``SPARQL_MAX_HEAVY``."""
+        return cls(
+            max_concurrency=env_int("SPARQL_MAX_CONCURRENCY", 16),
+            max_heavy=env_int("SPARQL_MAX_HEAVY", 4),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return sum(len(q) for q in self._waiters.values())
+
+    def stats(self) -> SchedulerStats:
+        """Return current in-flight counts, queue depths and wait times."""
+        return SchedulerStats(
+            in_flight=self._in_flight,
+            heavy_in_flight=self._heavy_in_flight,
+            queue_depth={p.name.lower(): len(q) for p, q in self._waiters.items()},
+            waits=self._waits,
+            total_wait_seconds=self._total_wait,
+            max_wait_seconds=self._max_wait,
+        )
+
+    def _can_run(self, priority: Priority) -> bool:
+        if self._in_flight >= self.max_concurrency:
+            return False
+        return priority != Priority.HEAVY or self._heavy_in_flight < self.max_heavy
+
+    def _grant(self, priority: Priority) -> None:
+        self._in_flight += 1
+        if priority == Priority.HEAVY:
+            self._heavy_in_flight += 1
+
+    def _release(self, priority: Priority) -> None:
+        self._in_flight -= 1
+        if priority == Priority.HEAVY:
+            self._heavy_in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters, highest priority class first."""
+        for priority in Priority:
+            queue = self._waiters[priority]
+            while queue and self._can_run(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self._grant(priority)
+                waiter.set_result(None)
+
+    def _has_waiters_before(self, priority: Priority) -> bool:
+        return any(self._waiters[p] for p in Priority if p <= priority)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.STANDARD) -> AsyncIterator[None]:
+        """Hold one request slot of the given priority class for the block."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self._can_run(priority) and not self._has_waiters_before(priority):
+            self._grant(priority)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].append(waiter)
+        started = time.perf_counter()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the cancellation arrived.
+                self._release(priority)
+            else:
+                try:
+                    self._waiters[priority].remove(waiter)
+                except ValueError:
+                    pass
+            raise
+        waited = time.perf_counter() - started
+        self._waits += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
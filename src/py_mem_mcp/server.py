@@ -4,39 +4,244 @@ Assembles all components and starts the FastMCP server using the
 streamable-HTTP transport on the configured port.
 """
 
+import asyncio
 import os
 import sys
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from contextlib import asynccontextmanager
 
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
+from .backends import OxigraphBackend
+from .balancer import EndpointPool
 from .bundesland import BundeslandRegistry
+from .cache import ResultCache
+from .changes import GraphWatcher
+from .closure import ClosureTable
+from .export import refresh_closure, refresh_hierarchy
+from .fanout import FanOut
 from .graphs import GraphRegistry
-from .sparql import SparqlClient
+from .metrics import Metrics
+from .middleware import MetricsMiddleware, ToolContextMiddleware, TracingMiddleware
+from .name_index import NameIndex
+from .resilience import CircuitBreaker, HedgePolicy, RetryPolicy
+from .scheduler import RequestScheduler
+from .slowlog import SlowQueryLog
+from .snapshot import HierarchySnapshot
+from .sparql import HttpPoolConfig, ResultFormat, SparqlClient
+from .text_index import TextIndex
+from .tracing import Tracer, install
 from .tools.lehrplan import LehrplanTools
 from .tools.listing import ListingTools
 from .tools.query import QueryTools
 from .tools.search import SearchTools
-from .config import init_env_vars, require_env
+from .config import env_float, env_int, init_env_vars, require_env
+
+
+def _make_lifespan(
+    sparql_client: SparqlClient,
+    startup: Sequence[Callable[[], Awaitable[None]]] = (),
+    background: Sequence[Callable[[], Awaitable[None]]] = (),
+):
+    """Build a server lifespan that owns the SPARQL client's connection pool.
+
+    Once the pool is open, the *startup* steps run in order and the
+    *background* jobs are started as tasks that are cancelled on shutdown.
+    """
+
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        async with sparql_client:
+            for step in startup:
+                await step()
+            tasks = [asyncio.create_task(job()) for job in background]
+            try:
+                yield
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    return lifespan
+
+
+def _tabular_format() -> ResultFormat:
+    """Read the wire format for value-only tool queries from ``SPARQL_TABULAR_FORMAT``."""
+    value = os.environ.get("SPARQL_TABULAR_FORMAT", "json").strip().lower()
+    try:
+        return ResultFormat(value)
+    except ValueError:
+        raise EnvironmentError(
+            f'Invalid value for SPARQL_TABULAR_FORMAT: "{value}". '
+            "Must be one of: json, tsv, csv."
+        ) from None
+
+
+def _search_backend() -> str:
+    """Read the ``search`` tool backend from ``SEARCH_BACKEND``."""
+    value = os.environ.get("SEARCH_BACKEND", "sparql").strip().lower()
+    if value not in ("sparql", "local"):
+        raise EnvironmentError(
+            f'Invalid value for SEARCH_BACKEND: "{value}". Must be one of: sparql, local.'
+        )
+    return value
+
+
+def _embedded_backend() -> OxigraphBackend | None:
+    """Open the embedded store at ``EMBEDDED_STORE`` when ``SPARQL_BACKEND=embedded``."""
+    value = os.environ.get("SPARQL_BACKEND", "remote").strip().lower()
+    if value not in ("remote", "embedded"):
+        raise EnvironmentError(
+            f'Invalid value for SPARQL_BACKEND: "{value}". Must be one of: remote, embedded.'
+        )
+    if value == "remote":
+        return None
+    return OxigraphBackend(
+        require_env("EMBEDDED_STORE"), timeout=env_float("SPARQL_TIMEOUT", 30.0)
+    )
+
+
+def _register_metrics(mcp: FastMCP, metrics: Metrics) -> None:
+    """Serve *metrics* in the Prometheus text format at ``metrics.path``."""
+
+    @mcp.custom_route(metrics.path, methods=["GET"], include_in_schema=False)
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
 
 
 def create_server() -> FastMCP:
     """Assemble and return a fully configured FastMCP server.
 
     Initialises the graph registry, SPARQL client, and Bundesland registry,
-    then registers all MCP tools.
+    then registers all MCP tools. ``SPARQL_ENDPOINT`` may list several
+    comma-separated replicas; with ``SPARQL_BACKEND=embedded`` queries are
+    answered by the local store at ``EMBEDDED_STORE`` instead. The SPARQL
+    client's pooled HTTP connections are opened and closed with the server
+    lifespan. Unless disabled with ``METRICS_ENABLED=false``, metrics are
+    served at ``METRICS_PATH``. With ``TRACE_FILE`` set, tracing spans are
+    appended to that file.
     """
     graph_registry = GraphRegistry()
-    sparql_endpoint = require_env("SPARQL_ENDPOINT")
+    backend = _embedded_backend()
+    if backend is None:
+        sparql_endpoints = [
+            url.strip() for url in require_env("SPARQL_ENDPOINT").split(",") if url.strip()
+        ]
+    else:
+        sparql_endpoints = [f"embedded:{backend.path}"]
 
-    sparql_client = SparqlClient(sparql_endpoint)
+    result_cache = ResultCache.from_env()
+    metrics = Metrics.from_env()
+    sparql_client = SparqlClient(
+        EndpointPool.from_env(sparql_endpoints),
+        pool=HttpPoolConfig.from_env(),
+        cache=result_cache,
+        tabular_format=_tabular_format(),
+        scheduler=RequestScheduler.from_env(),
+        retry=RetryPolicy.from_env(),
+        hedging=HedgePolicy.from_env(),
+        breaker=CircuitBreaker.from_env(),
+        metrics=metrics,
+        slow_log=SlowQueryLog.from_env(),
+        backend=backend,
+    )
     bundesland_registry = BundeslandRegistry()
 
-    mcp = FastMCP("mem-ontology-server")
+    startup: list[Callable[[], Awaitable[None]]] = []
+    background: list[Callable[[], Awaitable[None]]] = []
+
+    # Prewarmed Schulfach/Schulart name index; NAME_INDEX_REFRESH=0 disables it.
+    name_index: NameIndex | None = None
+    name_index_refresh = env_int("NAME_INDEX_REFRESH", 3600)
+    if name_index_refresh > 0:
+        name_index = NameIndex(sparql_client, graph_registry)
+        startup.append(name_index.load)
+        background.append(lambda: name_index.run_refresh(name_index_refresh))
+
+    # Local ranked full-text index for ``search``, from SEARCH_INDEX or SPARQL.
+    text_index: TextIndex | None = None
+    if _search_backend() == "local":
+        text_index = TextIndex(
+            sparql_client, graph_registry, os.environ.get("SEARCH_INDEX") or None
+        )
+        startup.append(text_index.load)
+
+    # Memory-mapped hierarchy snapshot written by ``py-mem-mcp-export hierarchy``.
+    snapshot_path = os.environ.get("HIERARCHY_SNAPSHOT")
+    snapshot = HierarchySnapshot.open(snapshot_path) if snapshot_path else None
+    # Lehrplan ancestor closure written by ``py-mem-mcp-export closure``.
+    closure_path = os.environ.get("CLOSURE_SNAPSHOT")
+    closure = ClosureTable.open(closure_path) if closure_path else None
+
+    # Per-graph change probe; only data of changed graphs is re-pulled.
+    graph_probe_interval = env_int("GRAPH_PROBE_INTERVAL", 300)
+    if graph_probe_interval > 0:
+        watcher = GraphWatcher(sparql_client, graph_registry)
+        watcher.subscribe(result_cache.invalidate_graphs)
+        if name_index is not None:
+            watcher.subscribe(name_index.refresh)
+        if text_index is not None:
+            watcher.subscribe(text_index.refresh)
+        # Snapshots are rewritten from the endpoint and re-mapped in place.
+        if snapshot is not None:
+            watcher.subscribe(
+                lambda changed: refresh_hierarchy(sparql_client, graph_registry, snapshot, changed)
+            )
+        if closure is not None:
+            watcher.subscribe(
+                lambda changed: refresh_closure(sparql_client, graph_registry, closure, changed)
+            )
+        background.append(lambda: watcher.run(graph_probe_interval))
+
+    middleware = [ToolContextMiddleware()]
+    if metrics is not None:
+        middleware.append(MetricsMiddleware(metrics))
+    tracer = Tracer.from_env()
+    install(tracer)
+    if tracer is not None:
+        middleware.append(TracingMiddleware())
+        background.append(tracer.run_flush)
+    mcp = FastMCP(
+        "mem-ontology-server",
+        lifespan=_make_lifespan(sparql_client, startup, background),
+        middleware=middleware,
+    )
+    if metrics is not None:
+        if sparql_client.scheduler is not None:
+            metrics.watch_scheduler(sparql_client.scheduler)
+        _register_metrics(mcp, metrics)
 
-    QueryTools(sparql_client, graph_registry).register(mcp)
-    ListingTools(sparql_client, graph_registry, bundesland_registry).register(mcp)
-    LehrplanTools(sparql_client, graph_registry, bundesland_registry).register(mcp)
-    SearchTools(sparql_client, graph_registry, bundesland_registry).register(mcp)
+    QueryTools(
+        sparql_client,
+        graph_registry,
+        max_rows=env_int("SPARQL_QUERY_MAX_ROWS", 10000),
+        max_bytes=env_int("SPARQL_QUERY_MAX_BYTES", 100_000),
+    ).register(mcp)
+    # Opt-in per-state fan-out of all-graph queries (SPARQL_FANOUT_CONCURRENCY).
+    fanout = FanOut.from_env(sparql_client, graph_registry)
+    ListingTools(sparql_client, graph_registry, bundesland_registry, fanout).register(mcp)
+    LehrplanTools(
+        sparql_client,
+        graph_registry,
+        bundesland_registry,
+        name_index,
+        node_budget=env_int("TREE_NODE_BUDGET", 5000),
+        snapshot=snapshot,
+        max_bytes=env_int("TREE_MAX_BYTES", 100_000),
+    ).register(mcp)
+    SearchTools(
+        sparql_client,
+        graph_registry,
+        bundesland_registry,
+        name_index,
+        text_index,
+        fanout,
+        closure,
+    ).register(mcp)
 
     return mcp
 
@@ -0,0 +1,97 @@
+"""Slow-query log for SPARQL requests.
+
+Queries whose endpoint time reaches a threshold are written to a rotating
+JSONL file with the full query text, the issuing tool, the graph set, the
+duration and the row count (or the error). With ``explain`` enabled, the
+:class:`~py_mem_mcp.sparql.SparqlClient` also fetches the endpoint's query
+plan for each slow query and stores it in the same record.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from .config import env_bool, env_float, env_int
+
+_FROM = re.compile(r"\bFROM\s+(?:NAMED\s+)?<([^>]*)>", re.IGNORECASE)
+
+#: Plans longer than this are truncated in the log.
+MAX_PLAN_CHARS = 65536
+
+
+def query_graphs(sparql: str) -> list[str]:
+    """Return the graphs named in the ``FROM``/``FROM NAMED`` clauses of *sparql*."""
+    return list(dict.fromkeys(_FROM.findall(sparql)))
+
+
+class SlowQueryLog:
+    """Write slow SPARQL queries to *path* as JSON lines.
+
+    The file is rotated after ``max_bytes`` with ``backups`` old files kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = 2.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        explain: bool = False,
+    ) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.explain = explain
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        # A private logger, so records never reach the application's handlers.
+        self._logger = logging.Logger("py_mem_mcp.slow_queries")
+        self._logger.addHandler(self._handler)
+
+    @classmethod
+    def from_env(cls) -> "SlowQueryLog | None":
+        """Read ``SLOW_QUERY_LOG`` and its options; returns None when it is unset."""
+        path = os.environ.get("SLOW_QUERY_LOG")
+        if not path:
+            return None
+        return cls(
+            path,
+            threshold=env_float("SLOW_QUERY_THRESHOLD", 2.0),
+            max_bytes=env_int("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backups=env_int("SLOW_QUERY_LOG_BACKUPS", 5),
+            explain=env_bool("SLOW_QUERY_EXPLAIN", False),
+        )
+
+    def is_slow(self, duration: float) -> bool:
+        return duration >= self.threshold
+
+    def record(
+        self,
+        sparql: str,
+        duration: float,
+        tool: str | None = None,
+        rows: int | None = None,
+        error: str | None = None,
+        plan: str | None = None,
+    ) -> None:
+        """Append one slow query record."""
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "tool": tool,
+            "duration": round(duration, 4),
+            "rows": rows,
+            "graphs": query_graphs(sparql),
+            "query": sparql,
+        }
+        if error is not None:
+            entry["error"] = error
+        if plan is not None:
+            entry["plan"] = plan[:MAX_PLAN_CHARS]
+        self._logger.warning(json.dumps(entry, ensure_ascii=False))
+
+    def close(self) -> None:
+        self._handler.close()
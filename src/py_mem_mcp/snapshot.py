@@ -0,0 +1,270 @@
+"""Compact on-disk snapshots of ontology data, memory-mapped at startup.
+
+A snapshot file holds named, 8-byte aligned arrays behind a small JSON
+header::
+
+    b"MEMSNAP1" | u32 header length | JSON header | arrays ...
+
+The file is opened with ``mmap`` read-only, so several worker processes
+serving from the same snapshot share its pages through the OS page cache.
+:class:`StringTable` stores strings as an offsets array plus one UTF-8 blob;
+when the strings are sorted, :meth:`StringTable.find` maps a string back to
+its index by binary search without building a dictionary.
+
+:class:`HierarchySnapshot` uses this to keep the "hat Teil"
+(``lp:LP_0000008``) hierarchy as a CSR adjacency list over integer node ids.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from .results import SparqlBinding, SparqlResults
+
+_MAGIC = b"MEMSNAP1"
+_ALIGN = 8
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def write_snapshot(
+    path: str | Path,
+    sections: Mapping[str, array | bytes],
+    meta: Mapping[str, Any] | None = None,
+) -> None:
+    """Atomically write named arrays/blobs to a snapshot file at *path*."""
+    layout: dict[str, list] = {}
+    offset = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        length = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        layout[name] = [offset, length, typecode]
+        offset = _aligned(offset + length)
+    header = json.dumps(
+        {"byteorder": sys.byteorder, "meta": dict(meta or {}), "sections": layout}
+    ).encode()
+
+    # A unique temporary file per writer, so concurrent exports never
+    # interleave; the last os.replace wins with a complete file.
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            data_start = _aligned(f.tell())
+            for name, data in sections.items():
+                f.seek(data_start + layout[name][0])
+                f.write(data.tobytes() if isinstance(data, array) else data)
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fchmod(f.fileno(), 0o644)
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+class SnapshotFile:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    Raises:
+        ValueError: If the file is not a snapshot or was written on a machine
+            with a different byte order.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"Not a snapshot file: {self.path}")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(_MAGIC))
+        header_start = len(_MAGIC) + 4
+        header = json.loads(self._mmap[header_start:header_start + header_len])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Snapshot {self.path} was written with a different byte order.")
+        self.meta: dict[str, Any] = header["meta"]
+        self._sections: dict[str, list] = header["sections"]
+        self._data_start = _aligned(header_start + header_len)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str) -> memoryview:
+        """Return section *name* as a memoryview typed like the written array."""
+        offset, length, typecode = self._sections[name]
+        start = self._data_start + offset
+        view = memoryview(self._mmap)[start:start + length]
+        return view if typecode == "B" else view.cast(typecode)
+
+
+class StringTable:
+    """Indexed strings stored as an offsets array and a UTF-8 blob."""
+
+    def __init__(self, offsets: Sequence[int], blob: memoryview | bytes) -> None:
+        self._offsets = offsets
+        self._blob = blob
+
+    @staticmethod
+    def build(strings: Iterable[str]) -> tuple[array, bytes]:
+        """Encode *strings* into ``(offsets, blob)`` arrays for writing."""
+        offsets = array("q", [0])
+        parts: list[bytes] = []
+        position = 0
+        for s in strings:
+            encoded = s.encode()
+            parts.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+        return offsets, b"".join(parts)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def _bytes(self, index: int) -> bytes:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < len(self):
+            raise IndexError("string index out of range")
+        return self._bytes(index).decode()
+
+    def find(self, value: str) -> int | None:
+        """Return the index of *value* in a sorted table, or None if absent."""
+        target = value.encode()
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._bytes(lo) == target:
+            return lo
+        return None
+
+
+class HierarchySnapshot:
+    """CSR adjacency snapshot of the "hat Teil" hierarchy with labels.
+
+    Node ids are the positions of the node URIs in sorted order, so children
+    listed by id are also ordered by URI, matching ``ORDER BY ?child``.
+    Each node keeps a single label (German preferred), ``""`` if it has none.
+    """
+
+    KIND = "hierarchy"
+
+    def __init__(self, file: SnapshotFile) -> None:
+        if file.meta.get("kind") != self.KIND:
+            raise ValueError(f"{file.path} is not a hierarchy snapshot.")
+        self.file = file
+        self.meta = file.meta
+        self.uris = StringTable(file.section("uri_offsets"), file.section("uri_blob"))
+        self.labels = StringTable(file.section("label_offsets"), file.section("label_blob"))
+        self._child_offsets = file.section("child_offsets")
+        self._children = file.section("children")
+
+    @classmethod
+    def open(cls, path: str | Path) -> "HierarchySnapshot":
+        return cls(SnapshotFile(path))
+
+    def reload(self) -> None:
+        """Re-map the snapshot file in place after it was rewritten."""
+        self.__init__(SnapshotFile(self.file.path))
+
+    @staticmethod
+    def write(
+        path: str | Path,
+        edges: Iterable[tuple[str, str]],
+        labels: Mapping[str, str],
+        meta: Mapping[str, Any] | None = None,
+    ) -> None:
+        """Build a snapshot from ``(parent, child)`` edges and node labels."""
+        edge_set = set(edges)
+        nodes = sorted({uri for edge in edge_set for uri in edge})
+        ids = {uri: i for i, uri in enumerate(nodes)}
+        adjacency: list[list[int]] = [[] for _ in nodes]
+        for parent, child in edge_set:
+            adjacency[ids[parent]].append(ids[child])
+
+        child_offsets = array("q", [0])
+        children = array("i")
+        for kids in adjacency:
+            children.extend(sorted(kids))
+            child_offsets.append(len(children))
+
+        uri_offsets, uri_blob = StringTable.build(nodes)
+        label_offsets, label_blob = StringTable.build(labels.get(uri, "") for uri in nodes)
+        write_snapshot(
+            path,
+            {
+                "uri_offsets": uri_offsets,
+                "uri_blob": uri_blob,
+                "label_offsets": label_offsets,
+                "label_blob": label_blob,
+                "child_offsets": child_offsets,
+                "children": children,
+            },
+            {**(meta or {}), "kind": HierarchySnapshot.KIND,
+             "nodes": len(nodes), "edges": len(children)},
+        )
+
+    def __len__(self) -> int:
+        return len(self.uris)
+
+    def node_id(self, uri: str) -> int | None:
+        """Return the integer id of *uri*, or None if it is not in the snapshot."""
+        return self.uris.find(uri)
+
+    def child_ids(self, node_id: int) -> memoryview:
+        return self._children[self._child_offsets[node_id]:self._child_offsets[node_id + 1]]
+
+    def _label(self, node_id: int) -> SparqlBinding | None:
+        label = self.labels[node_id]
+        return SparqlBinding(type="literal", value=label) if label else None
+
+    def children(self, uri: str) -> SparqlResults | None:
+        """Return ``?child ?childLabel`` rows for *uri*, or None if it is unknown."""
+        node_id = self.node_id(uri)
+        if node_id is None:
+            return None
+        results = SparqlResults(vars=["child", "childLabel"])
+        for child_id in self.child_ids(node_id):
+            row = {"child": SparqlBinding(type="uri", value=self.uris[child_id])}
+            label = self._label(child_id)
+            if label is not None:
+                row["childLabel"] = label
+            results.append(row)
+        return results
+
+    def children_of(self, parents: Sequence[str]) -> SparqlResults:
+        """Return ``?parent ?parentLabel ?child ?childLabel`` rows for *parents*."""
+        results = SparqlResults(vars=["parent", "parentLabel", "child", "childLabel"])
+        for parent in parents:
+            parent_id = self.node_id(parent)
+            if parent_id is None:
+                continue
+            parent_row = {"parent": SparqlBinding(type="uri", value=parent)}
+            parent_label = self._label(parent_id)
+            if parent_label is not None:
+                parent_row["parentLabel"] = parent_label
+            for child_id in self.child_ids(parent_id):
+                row = dict(parent_row)
+                row["child"] = SparqlBinding(type="uri", value=self.uris[child_id])
+                label = self._label(child_id)
+                if label is not None:
+                    row["childLabel"] = label
+                results.append(row)
+        return results
@@ -1,82 +1,695 @@
 """SPARQL client for querying the MEM ontology triple store."""
 
-from dataclasses import dataclass, field
+import asyncio
+import importlib.util
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    nullcontext,
+)
+from dataclasses import dataclass
+from typing import Any
 
 import httpx
 
+from .backends import SparqlBackend
+from .balancer import EndpointPool
+from .cache import ResultCache, cache_key
+from .config import env_bool, env_float, env_int
+from .formats import ResultFormat, parse_results
+from .metrics import NO_TOOL, Metrics
+from . import tracing
+from .middleware import current_tool
+from .output import TableWriter
+from .resilience import (
+    RETRYABLE_STATUS,
+    CircuitBreaker,
+    HedgePolicy,
+    RetryPolicy,
+    is_read_only,
+)
+from .results import SparqlBinding, SparqlResults, TermTable
+from .scheduler import Priority, RequestScheduler, priority_for
+from .slowlog import SlowQueryLog
+from .streaming import BindingStreamParser
 
-@dataclass
-class SparqlBinding:
-    """A single binding value returned by a SPARQL query."""
+__all__ = [
+    "HttpPoolConfig",
+    "ResultFormat",
+    "SparqlBinding",
+    "SparqlClient",
+    "SparqlResults",
+    "SparqlRowStream",
+    "TermTable",
+]
+
+
+def _row_from_json(raw: dict[str, Any]) -> dict[str, SparqlBinding]:
+    """Convert one raw JSON binding row into ``SparqlBinding`` values."""
+    return {
+        var: SparqlBinding(
+            type=val["type"],
+            value=val["value"],
+            lang=val.get("xml:lang"),
+            datatype=val.get("datatype"),
+        )
+        for var, val in raw.items()
+    }
+
+
+class SparqlRowStream:
+    """Async iterator over the rows of a streamed SPARQL JSON response.
+
+    Obtained from :meth:`SparqlClient.stream`. ``vars`` is known before the
+    first row for endpoints that send ``head`` first (Virtuoso does).
+    Iteration stops after ``max_rows`` rows; ``truncated`` then tells whether
+    more rows were left unread.
+    """
+
+    def __init__(self, response: httpx.Response, max_rows: int | None = None) -> None:
+        self.max_rows = max_rows
+        self.truncated = False
+        self._chunks = response.aiter_bytes()
+        self._parser = BindingStreamParser()
+        self._pending: deque[dict[str, Any]] = deque()
+        self._count = 0
+        self._exhausted = False
+
+    @property
+    def vars(self) -> list[str]:
+        return self._parser.vars or []
+
+    async def _fill(self) -> bool:
+        """Read chunks until a row is pending; return False at end of body."""
+        while not self._pending:
+            if self._exhausted:
+                return False
+            try:
+                chunk = await anext(self._chunks)
+            except StopAsyncIteration:
+                self._exhausted = True
+                if not self._parser.done:
+                    raise RuntimeError("SPARQL response ended before the results were complete")
+                return False
+            self._pending.extend(self._parser.feed(chunk))
+        return True
+
+    async def _read_head(self) -> None:
+        while (
+            self._parser.vars is None
+            and not self._parser.bindings_started
+            and not self._exhausted
+        ):
+            try:
+                chunk = await anext(self._chunks)
+            except StopAsyncIteration:
+                self._exhausted = True
+                break
+            self._pending.extend(self._parser.feed(chunk))
 
-    type: str
-    value: str
-    lang: str | None = None
-    datatype: str | None = None
+    def __aiter__(self) -> "SparqlRowStream":
+        return self
+
+    async def __anext__(self) -> dict[str, SparqlBinding]:
+        if self.max_rows is not None and self._count >= self.max_rows:
+            self.truncated = bool(self._pending) or await self._fill()
+            raise StopAsyncIteration
+        if not await self._fill():
+            raise StopAsyncIteration
+        self._count += 1
+        return _row_from_json(self._pending.popleft())
+
+    async def collect(self) -> SparqlResults:
+        """Read the remaining rows (up to ``max_rows``) into ``SparqlResults``."""
+        results = SparqlResults(vars=self.vars)
+        while self.max_rows is None or self._count < self.max_rows:
+            if not await self._fill():
+                break
+            self._count += 1
+            results.append_json(self._pending.popleft())
+        else:
+            self.truncated = bool(self._pending) or await self._fill()
+        if not results.vars:
+            results.vars = self.vars
+        return results
+
+
+class _ResultsRowStream:
+    """:class:`SparqlRowStream` counterpart over results already in memory."""
+
+    def __init__(self, results: SparqlResults, max_rows: int | None = None) -> None:
+        self.max_rows = max_rows
+        self.truncated = max_rows is not None and len(results) > max_rows
+        self.vars = results.vars
+        self._results = results if not self.truncated else results.head(max_rows)
+        self._rows = iter(self._results.bindings)
+        self._count = 0
+
+    def __aiter__(self) -> "_ResultsRowStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            row = next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration from None
+        self._count += 1
+        return row
+
+    async def collect(self) -> SparqlResults:
+        if self._count == 0:
+            self._count = len(self._results)
+            self._rows = iter(())
+            return self._results
+        rest = SparqlResults(vars=self.vars)
+        async for row in self:
+            rest.append(row)
+        return rest
 
 
 @dataclass
-class SparqlResults:
-    """Structured results from a SPARQL SELECT query."""
+class HttpPoolConfig:
+    """Connection pool settings for the long-lived SPARQL HTTP client."""
 
-    vars: list[str]
-    bindings: list[dict[str, SparqlBinding]] = field(default_factory=list)
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+    timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "HttpPoolConfig":
+        """Read pool settings from ``SPARQL_POOL_*``, ``SPARQL_HTTP2`` and ``SPARQL_TIMEOUT``."""
+        return cls(
+            max_connections=env_int("SPARQL_POOL_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=env_int(
+                "SPARQL_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections
+            ),
+            keepalive_expiry=env_float(
+                "SPARQL_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry
+            ),
+            http2=env_bool("SPARQL_HTTP2", cls.http2),
+            timeout=env_float("SPARQL_TIMEOUT", cls.timeout),
+        )
 
 
 class SparqlClient:
-    """Async client for executing SPARQL queries against a triple store endpoint."""
+    """Async client for executing SPARQL queries against a triple store endpoint.
+
+    A single pooled ``httpx.AsyncClient`` is shared by all queries so that
+    connections are kept alive between tool calls. Call :meth:`open` and
+    :meth:`aclose` (or use the client as an async context manager) to tie the
+    pool to the server lifespan; otherwise it is opened lazily on first use.
 
-    def __init__(self, endpoint: str) -> None:
-        self.endpoint = endpoint
+    When a :class:`~py_mem_mcp.cache.ResultCache` is given, results are served
+    from it and concurrent identical queries share a single request.
 
-    async def query(self, sparql: str) -> SparqlResults:
+    ``tabular_format`` is the compact wire format that tools request when they
+    only need plain values (see :mod:`py_mem_mcp.formats`).
+
+    With a :class:`~py_mem_mcp.scheduler.RequestScheduler`, every request
+    waits for a slot of its priority class, derived from the calling tool.
+
+    Failure handling is opt-in (see :mod:`py_mem_mcp.resilience`): read-only
+    queries are retried per ``retry``, slow requests are hedged per
+    ``hedging``, and ``breaker`` fails fast while the endpoint is unhealthy.
+
+    ``endpoint`` may be a single URL, a list of replica URLs or a prepared
+    :class:`~py_mem_mcp.balancer.EndpointPool`; with several replicas each
+    request goes to the least loaded one and failing replicas are re-probed
+    in the background while the client is open.
+
+    With :class:`~py_mem_mcp.metrics.Metrics`, every HTTP attempt records its
+    round-trip time, response size and outcome, and every decoded result its
+    row count, labelled with the calling tool.
+
+    With a :class:`~py_mem_mcp.slowlog.SlowQueryLog`, queries whose endpoint
+    time reaches its threshold are logged, optionally with their query plan.
+
+    With a :class:`~py_mem_mcp.backends.SparqlBackend`, queries are answered
+    in-process instead of over HTTP; ``endpoint`` is then only a label.
+    """
+
+    def __init__(
+        self,
+        endpoint: str | Sequence[str] | EndpointPool,
+        pool: HttpPoolConfig | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: ResultCache | None = None,
+        tabular_format: ResultFormat = ResultFormat.TSV,
+        scheduler: RequestScheduler | None = None,
+        retry: RetryPolicy | None = None,
+        hedging: HedgePolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        metrics: Metrics | None = None,
+        slow_log: SlowQueryLog | None = None,
+        backend: SparqlBackend | None = None,
+    ) -> None:
+        if isinstance(endpoint, str):
+            endpoint = [endpoint]
+        if not isinstance(endpoint, EndpointPool):
+            endpoint = EndpointPool(endpoint)
+        self.endpoints = endpoint
+        self.endpoint = endpoint.urls[0]
+        self.pool = pool or HttpPoolConfig()
+        self.cache = cache
+        self.tabular_format = tabular_format
+        self.scheduler = scheduler
+        self.retry = retry
+        self.hedging = hedging
+        self.breaker = breaker
+        self.metrics = metrics
+        self.slow_log = slow_log
+        self.backend = backend
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._probe_task: asyncio.Task | None = None
+        self._plan_tasks: set[asyncio.Task] = set()
+
+    async def open(self) -> None:
+        """Create the pooled HTTP client if it is not open yet.
+
+        With several endpoints this also starts re-probing ejected replicas.
+        """
+        if self._client is None:
+            self._client = self._build_client()
+        if len(self.endpoints.states) > 1 and self._probe_task is None:
+            self._probe_task = asyncio.create_task(self.endpoints.run_probes(self._probe))
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client and release all connections."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        for task in list(self._plan_tasks):
+            task.cancel()
+        await asyncio.gather(*self._plan_tasks, return_exceptions=True)
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def __aenter__(self) -> "SparqlClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    def _build_client(self) -> httpx.AsyncClient:
+        # HTTP/2 needs the optional "h2" package (httpx[http2]); fall back to
+        # HTTP/1.1 keep-alive when it is not installed.
+        http2 = self.pool.http2 and importlib.util.find_spec("h2") is not None
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.pool.max_connections,
+                max_keepalive_connections=self.pool.max_keepalive_connections,
+                keepalive_expiry=self.pool.keepalive_expiry,
+            ),
+            timeout=self.pool.timeout,
+            transport=self._transport,
+        )
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    def _slot(self, priority: Priority | None) -> AbstractAsyncContextManager:
+        """Return the scheduler slot to hold while a request is in flight."""
+        if self.scheduler is None:
+            return nullcontext()
+        if priority is None:
+            priority = priority_for(current_tool.get())
+        return self.scheduler.slot(priority)
+
+    async def query(
+        self,
+        sparql: str,
+        format: ResultFormat = ResultFormat.JSON,
+        priority: Priority | None = None,
+        cached: bool = True,
+    ) -> SparqlResults:
         """Execute a SPARQL SELECT query and return structured results.
 
         Args:
             sparql: The full SPARQL SELECT query string.
+            format: Wire format to request. TSV and CSV are smaller and faster
+                to parse; CSV drops term types, language tags and datatypes.
+            priority: Scheduling class; derived from the calling tool if omitted.
+            cached: Set to False to always ask the endpoint, e.g. for probes.
 
         Raises:
             RuntimeError: If the HTTP request fails or returns a non-success status.
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.endpoint,
-                content=sparql.encode(),
-                headers={
-                    "Content-Type": "application/sparql-query",
-                    "Accept": "application/sparql-results+json",
-                },
-                timeout=30.0,
-            )
+        with tracing.span("sparql.query", **{"sparql.format": format.value}) as span:
+            if self.cache is None or not cached:
+                results = await self._execute(sparql, format, priority)
+            else:
+                results = await self.cache.get_or_load(
+                    cache_key(sparql, format.value),
+                    lambda: self._execute(sparql, format, priority),
+                )
+            span.set_attribute("sparql.rows", len(results))
+        return results
+
+    async def _execute(
+        self, sparql: str, format: ResultFormat, priority: Priority | None = None
+    ) -> SparqlResults:
+        """Send *sparql* to the endpoint, bypassing the result cache."""
+        if self.backend is not None:
+            return await self._execute_local(sparql, priority)
+        async with self._slot(priority):
+            started = time.perf_counter()
+            try:
+                response = await self._send(sparql, format)
+            except RuntimeError as exc:
+                self._check_slow(sparql, time.perf_counter() - started, error=str(exc))
+                raise
+        with tracing.span("sparql.decode", **{"sparql.format": format.value}) as span:
+            results = parse_results(response.content, format)
+            span.set_attribute("sparql.bytes", len(response.content))
+            span.set_attribute("sparql.rows", len(results))
+        if self.metrics is not None:
+            self.metrics.sparql_rows.observe(len(results), current_tool.get() or NO_TOOL)
+        self._check_slow(sparql, time.perf_counter() - started, rows=len(results))
+        return results
 
+    async def _execute_local(
+        self,
+        sparql: str,
+        priority: Priority | None = None,
+        max_rows: int | None = None,
+    ) -> SparqlResults:
+        """Answer *sparql* from the in-process backend, reading up to ``max_rows + 1`` rows."""
+        async with self._slot(priority):
+            started = time.perf_counter()
+            try:
+                results = await self.backend.select(sparql, max_rows)
+            except RuntimeError as exc:
+                self._check_slow(sparql, time.perf_counter() - started, error=str(exc))
+                raise
+        if self.metrics is not None:
+            tool = current_tool.get() or NO_TOOL
+            self.metrics.sparql_latency.observe(time.perf_counter() - started, tool)
+            self.metrics.sparql_rows.observe(len(results), tool)
+        self._check_slow(sparql, time.perf_counter() - started, rows=len(results))
+        return results
+
+    def _check_slow(
+        self,
+        sparql: str,
+        duration: float,
+        rows: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Log *sparql* if it was slow; the plan is fetched in the background."""
+        slow_log = self.slow_log
+        if slow_log is None or not slow_log.is_slow(duration):
+            return
+        tool = current_tool.get()
+        if not slow_log.explain:
+            slow_log.record(sparql, duration, tool, rows, error)
+            return
+
+        async def record_with_plan() -> None:
+            try:
+                plan = await self.explain(sparql)
+            except Exception as exc:
+                plan = f"EXPLAIN failed: {exc!r}"
+            slow_log.record(sparql, duration, tool, rows, error, plan)
+
+        task = asyncio.create_task(record_with_plan())
+        self._plan_tasks.add(task)
+        task.add_done_callback(self._plan_tasks.discard)
+
+    async def explain(self, sparql: str) -> str:
+        """Return the endpoint's query plan for *sparql*.
+
+        Uses Virtuoso's ``explain=on`` endpoint parameter, which compiles the
+        query and returns the plan instead of running it.
+
+        Raises:
+            RuntimeError: If the endpoint does not return a plan.
+        """
+        if self.backend is not None:
+            raise RuntimeError("Query plans are not available from the embedded store.")
+        try:
+            response = await self._http().post(
+                self.endpoint, data={"query": sparql, "explain": "on"}
+            )
+        except httpx.TransportError as exc:
+            raise RuntimeError(f"SPARQL request failed: {exc!r}") from exc
         if not response.is_success:
-            body = response.text[:200]
             raise RuntimeError(
-                f"SPARQL query failed ({response.status_code}): {body}"
+                f"EXPLAIN failed ({response.status_code}): {response.text[:200]}"
+            )
+        return response.text
+
+    async def _send(self, sparql: str, format: ResultFormat) -> httpx.Response:
+        """POST *sparql*, applying the circuit breaker and retry policy.
+
+        Raises:
+            RuntimeError: If the request fails or returns a non-success status
+                after all permitted attempts.
+        """
+        attempts = self.retry.attempts if self.retry and is_read_only(sparql) else 1
+        error: RuntimeError | None = None
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(self.retry.delay(attempt - 1))
+            if self.breaker is not None:
+                self.breaker.check()
+            try:
+                response = await self._post_hedged(sparql, format)
+            except httpx.TransportError as exc:
+                error = RuntimeError(f"SPARQL request failed: {exc!r}")
+                self._record(success=False)
+                if self.retry is not None and not self.retry.retries(exc):
+                    raise error from exc
+                continue
+
+            if response.is_success:
+                self._record(success=True)
+                return response
+            error = RuntimeError(
+                f"SPARQL query failed ({response.status_code}): {response.text[:200]}"
             )
+            if response.status_code not in RETRYABLE_STATUS:
+                # The endpoint answered; the query itself is at fault.
+                self._record(success=True)
+                raise error
+            self._record(success=False)
+        raise error
+
+    def _record(self, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    async def _post(self, sparql: str, format: ResultFormat) -> httpx.Response:
+        """POST *sparql* to the best endpoint and record its latency or failure."""
+        endpoints = self.endpoints
+        with (
+            endpoints.lease(endpoints.choose()) as state,
+            self._in_flight(),
+            tracing.span("sparql.http", **{"server.address": state.url}) as span,
+        ):
+            started = time.perf_counter()
+            try:
+                response = await self._http().post(
+                    state.url,
+                    content=sparql.encode(),
+                    headers=self._headers(format.media_type, span),
+                )
+            except httpx.TransportError:
+                endpoints.record_failure(state)
+                self._observe(time.perf_counter() - started, None)
+                raise
+            elapsed = time.perf_counter() - started
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_attribute("http.response.body.size", len(response.content))
+        self._observe(elapsed, response)
+
+        if response.is_success:
+            endpoints.record_success(state, elapsed)
+            if self.hedging is not None:
+                self.hedging.record(elapsed)
+        elif response.status_code in RETRYABLE_STATUS:
+            endpoints.record_failure(state)
+        return response
+
+    @staticmethod
+    def _headers(accept: str, span: Any) -> dict[str, str]:
+        headers = {"Content-Type": "application/sparql-query", "Accept": accept}
+        if span.traceparent is not None:
+            headers["traceparent"] = span.traceparent
+        return headers
+
+    def _in_flight(self) -> AbstractContextManager:
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.sparql_in_flight.track()
+
+    def _observe(self, elapsed: float, response: httpx.Response | None) -> None:
+        """Record one HTTP attempt; *response* is None if the request failed."""
+        metrics = self.metrics
+        if metrics is None:
+            return
+        tool = current_tool.get() or NO_TOOL
+        metrics.sparql_latency.observe(elapsed, tool)
+        if response is None or not response.is_success:
+            metrics.sparql_errors.inc(tool)
+        if response is not None:
+            metrics.sparql_bytes.observe(len(response.content), tool)
+
+    async def _probe(self, url: str) -> bool:
+        """Return True if the endpoint at *url* answers a trivial query."""
+        response = await self._http().post(
+            url,
+            content=b"ASK {}",
+            headers={
+                "Content-Type": "application/sparql-query",
+                "Accept": "application/sparql-results+json",
+            },
+            timeout=5.0,
+        )
+        return response.is_success
+
+    async def _post_hedged(self, sparql: str, format: ResultFormat) -> httpx.Response:
+        """POST once; send a hedge if the first request is unusually slow."""
+        delay = self.hedging.hedge_after() if self.hedging is not None else None
+        if delay is None:
+            return await self._post(sparql, format)
+
+        attempts = [asyncio.create_task(self._post(sparql, format))]
+        pending: set[asyncio.Task] = set(attempts)
+        first_error: BaseException | None = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                attempts.append(asyncio.create_task(self._post(sparql, format)))
+                pending.add(attempts[-1])
+            while True:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # In attempt order, so a tie goes to the original request.
+                for task in (t for t in attempts if t in done):
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if first_error is None:
+                        first_error = error
+                if not pending:
+                    # Every attempt failed: re-raise the first error.
+                    raise first_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        sparql: str,
+        max_rows: int | None = None,
+        priority: Priority | None = None,
+    ) -> AsyncIterator[SparqlRowStream]:
+        """Execute a SPARQL SELECT query and stream its rows incrementally.
+
+        The response body is parsed as it arrives instead of being decoded as
+        a whole. Leaving the ``async with`` block, or reaching ``max_rows``,
+        stops reading and closes the underlying connection. Streamed results
+        bypass the result cache.
+
+        Args:
+            sparql: The full SPARQL SELECT query string.
+            max_rows: Optional cap on the number of rows to read.
+            priority: Scheduling class; derived from the calling tool if omitted.
 
-        data = response.json()
-        vars_ = data["head"]["vars"]
-        bindings: list[dict[str, SparqlBinding]] = []
-        for raw in data["results"]["bindings"]:
-            binding: dict[str, SparqlBinding] = {}
-            for var, val in raw.items():
-                binding[var] = SparqlBinding(
-                    type=val["type"],
-                    value=val["value"],
-                    lang=val.get("xml:lang"),
-                    datatype=val.get("datatype"),
+        Raises:
+            RuntimeError: If the HTTP request fails or returns a non-success status.
+        """
+        if self.backend is not None:
+            # The backend stops after max_rows + 1 rows; stream them from memory.
+            results = await self._execute_local(sparql, priority, max_rows)
+            yield _ResultsRowStream(results, max_rows)
+            return
+        if self.breaker is not None:
+            self.breaker.check()
+        async with self._slot(priority), AsyncExitStack() as stack:
+            state = stack.enter_context(self.endpoints.lease(self.endpoints.choose()))
+            stack.enter_context(self._in_flight())
+            span = stack.enter_context(
+                tracing.span("sparql.http", **{"server.address": state.url})
+            )
+            started = time.perf_counter()
+            try:
+                response = await stack.enter_async_context(
+                    self._http().stream(
+                        "POST",
+                        state.url,
+                        content=sparql.encode(),
+                        headers=self._headers("application/sparql-results+json", span),
+                    )
                 )
-            bindings.append(binding)
+            except httpx.TransportError as exc:
+                self.endpoints.record_failure(state)
+                self._record(success=False)
+                self._observe(time.perf_counter() - started, None)
+                raise RuntimeError(f"SPARQL request failed: {exc!r}") from exc
 
-        return SparqlResults(vars=vars_, bindings=bindings)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code in RETRYABLE_STATUS:
+                self.endpoints.record_failure(state)
+            self._record(success=response.status_code not in RETRYABLE_STATUS)
+            if not response.is_success:
+                await response.aread()
+                self._observe(time.perf_counter() - started, response)
+                body = response.content.decode(errors="replace")[:200]
+                error = f"SPARQL query failed ({response.status_code}): {body}"
+                self._check_slow(sparql, time.perf_counter() - started, error=error)
+                raise RuntimeError(error)
+            rows = SparqlRowStream(response, max_rows)
+            await rows._read_head()
+            if self.metrics is not None:
+                # Time to the first bytes; streamed bodies are not buffered.
+                self.metrics.sparql_latency.observe(
+                    time.perf_counter() - started, current_tool.get() or NO_TOOL
+                )
+            try:
+                yield rows
+            finally:
+                self._check_slow(sparql, time.perf_counter() - started, rows=rows._count)
 
     @staticmethod
-    def format_results(results: SparqlResults) -> str:
+    def format_results(
+        results: SparqlResults,
+        max_bytes: int | None = None,
+        advice: str | None = None,
+        reserve: int = 0,
+    ) -> str:
         """Format SPARQL results as a human-readable text table.
 
         Args:
             results: The SparqlResults to format.
+            max_bytes: Optional output budget; rows that do not fit are left
+                out and a notice is appended (see :mod:`py_mem_mcp.output`).
+            advice: What the notice suggests instead of the default advice
+                for ad-hoc queries.
+            reserve: Bytes of *max_bytes* kept for text the caller appends.
 
         Returns:
             A string with a header row, a separator, and one data row per binding.
@@ -84,12 +697,22 @@ class SparqlClient:
         """
         if not results.bindings:
             return "No results."
-
-        rows = [
-            " | ".join(
-                binding[v].value if v in binding else "" for v in results.vars
-            )
-            for binding in results.bindings
-        ]
-        header = " | ".join(results.vars)
-        return "\n".join([header, "---", *rows])
+        with tracing.span("format_results", **{"sparql.rows": len(results)}) as span:
+            if max_bytes is not None:
+                writer = (
+                    TableWriter(results.vars, max_bytes, reserve=reserve)
+                    if advice is None
+                    else TableWriter(results.vars, max_bytes, reserve=reserve, advice=advice)
+                )
+                for row in results.bindings:
+                    if not writer.add(row):
+                        break
+                text = writer.finish()
+                span.set_attribute("output.truncated", writer.truncated)
+            else:
+                columns = [results.values(v) for v in results.vars]
+                rows = [" | ".join(cells) for cells in zip(*columns)]
+                header = " | ".join(results.vars)
+                text = "\n".join([header, "---", *rows])
+            span.set_attribute("output.chars", len(text))
+        return text
@@ -0,0 +1,173 @@
+"""Incremental parsing of SPARQL JSON result streams.
+
+:class:`BindingStreamParser` scans the response body chunk by chunk and emits
+each entry of ``results.bindings`` as soon as its closing brace arrives, so
+large results never have to be held in memory as one document.
+"""
+
+import re
+from typing import Any
+
+from .decoding import _malformed, loads
+
+# Characters that can change the structural state outside / inside a string.
+_STRUCTURAL_RE = re.compile(rb'["{}\[\],:]')
+_STRING_RE = re.compile(rb'["\\]')
+
+_OBJECT = 0
+_ARRAY = 1
+
+
+def _loads(fragment: bytes | bytearray) -> Any:
+    try:
+        return loads(fragment)
+    except ValueError as exc:
+        raise _malformed(exc) from None
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "expect_key")
+
+    def __init__(self, kind: int, key: str | None) -> None:
+        self.kind = kind
+        self.key = key
+        self.expect_key = kind == _OBJECT
+
+
+class BindingStreamParser:
+    """Push parser that extracts rows from a SPARQL JSON results document.
+
+    Feed raw byte chunks with :meth:`feed`; each call returns the binding rows
+    (as plain dicts) that were completed by that chunk. ``vars`` is filled in
+    once the ``head`` object has been read.
+    """
+
+    def __init__(self) -> None:
+        self.vars: list[str] | None = None
+        self.bindings_started = False
+        self._buf = bytearray()
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._key_start: int | None = None
+        self._row_start: int | None = None
+        self._head_start: int | None = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level JSON object has been closed."""
+        return self._done
+
+    def feed(self, chunk: bytes) -> list[dict[str, Any]]:
+        """Consume *chunk* and return the binding rows it completed.
+
+        Raises:
+            RuntimeError: If the stream is not well-formed JSON.
+        """
+        rows: list[dict[str, Any]] = []
+        buf = self._buf
+        buf += chunk
+        stack = self._stack
+        i = self._pos
+        n = len(buf)
+
+        while i < n:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                    i += 1
+                    continue
+                match = _STRING_RE.search(buf, i)
+                if match is None:
+                    i = n
+                    break
+                i = match.start()
+                if buf[i] == 0x5C:  # backslash
+                    self._escape = True
+                    i += 1
+                    continue
+                self._in_string = False
+                if self._key_start is not None:
+                    stack[-1].key = _loads(buf[self._key_start:i + 1])
+                    self._key_start = None
+                i += 1
+                continue
+
+            match = _STRUCTURAL_RE.search(buf, i)
+            if match is None:
+                i = n
+                break
+            i = match.start()
+            c = buf[i]
+            top = stack[-1] if stack else None
+
+            if c == 0x22:  # '"'
+                self._in_string = True
+                # Only keys on the path to results.bindings are needed.
+                if (
+                    top is not None
+                    and top.kind == _OBJECT
+                    and top.expect_key
+                    and len(stack) <= 2
+                ):
+                    self._key_start = i
+            elif c == 0x7B or c == 0x5B:  # '{' or '['
+                depth = len(stack)
+                if self._in_bindings_array():
+                    self._row_start = i
+                elif depth == 1 and top.key == "head":
+                    self._head_start = i
+                elif depth == 2 and stack[0].key == "results" and top.key == "bindings":
+                    self.bindings_started = True
+                stack.append(_Frame(_OBJECT if c == 0x7B else _ARRAY, None))
+            elif c == 0x7D or c == 0x5D:  # '}' or ']'
+                if not stack:
+                    raise RuntimeError("Malformed SPARQL JSON results: unbalanced bracket")
+                stack.pop()
+                if self._row_start is not None and self._in_bindings_array():
+                    rows.append(_loads(buf[self._row_start:i + 1]))
+                    self._row_start = None
+                elif self._head_start is not None and len(stack) == 1:
+                    head = _loads(buf[self._head_start:i + 1])
+                    self.vars = list(head.get("vars", []))
+                    self._head_start = None
+                if not stack:
+                    self._done = True
+            elif c == 0x3A:  # ':'
+                if top is not None:
+                    top.expect_key = False
+            elif c == 0x2C:  # ','
+                if top is not None and top.kind == _OBJECT:
+                    top.expect_key = True
+            i += 1
+
+        self._compact(i)
+        return rows
+
+    def _in_bindings_array(self) -> bool:
+        stack = self._stack
+        return (
+            len(stack) == 3
+            and stack[2].kind == _ARRAY
+            and stack[0].key == "results"
+            and stack[1].key == "bindings"
+        )
+
+    def _compact(self, pos: int) -> None:
+        """Drop bytes that no pending capture still needs."""
+        starts = [
+            s for s in (self._row_start, self._head_start, self._key_start)
+            if s is not None
+        ]
+        keep = min(starts) if starts else pos
+        if keep:
+            del self._buf[:keep]
+            if self._row_start is not None:
+                self._row_start -= keep
+            if self._head_start is not None:
+                self._head_start -= keep
+            if self._key_start is not None:
+                self._key_start -= keep
+        self._pos = pos - keep
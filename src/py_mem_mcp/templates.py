@@ -0,0 +1,149 @@
+"""Prepared SPARQL query templates with typed, escaped parameters.
+
+Queries are written once as module-level :class:`QueryTemplate` constants
+and parsed at import time into static text and typed placeholders
+``{{name:kind}}``. Rendering only joins pre-split parts, so building a query
+costs no parsing, and every value is escaped or validated for its kind:
+
+========== ==========================================================
+kind       renders
+========== ==========================================================
+iri        one IRI as ``<...>``; rejects characters not allowed in IRIs
+iris       a sequence of IRIs, space separated (for ``VALUES``)
+literal    a string literal with SPARQL escapes
+int        an integer
+from       ``FROM <g>`` lines for a graph list, cached per graph set
+contains   a ``bif:contains`` prefix expression built from the words of
+           free text, as a string literal
+raw        a trusted, internally built fragment (e.g. a keyset filter)
+========== ==========================================================
+
+The same parameters always render the same text, so result cache keys of
+equal queries are equal.
+"""
+
+import re
+import textwrap
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from typing import Any
+
+from . import tracing
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)(?::(\w+))?\}\}")
+_IRI = re.compile(r'[^\x00-\x20<>"{}|^`\\]+')
+_WORD = re.compile(r"\w+")
+_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    '"': '\\"',
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+    "\b": "\\b",
+    "\f": "\\f",
+})
+
+
+def iri(value: str) -> str:
+    """Render *value* as an IRI reference.
+
+    Raises:
+        ValueError: If *value* is empty or contains characters IRIs cannot hold.
+    """
+    if not isinstance(value, str) or not _IRI.fullmatch(value):
+        raise ValueError(f"Invalid URI: {value!r}")
+    return f"<{value}>"
+
+
+def literal(value: str) -> str:
+    """Render *value* as a quoted SPARQL string literal."""
+    return '"' + str(value).translate(_ESCAPES) + '"'
+
+
+def integer(value: int) -> str:
+    """Render an integer, rejecting anything else (including booleans)."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"Expected an integer, got {value!r}")
+    return str(value)
+
+
+@lru_cache(maxsize=256)
+def _from_block(graphs: tuple[str, ...]) -> str:
+    return "\n".join(f"FROM {iri(g)}" for g in graphs)
+
+
+def from_block(graphs: Sequence[str]) -> str:
+    """Render ``FROM`` clauses for *graphs*; cached per graph list."""
+    return _from_block(tuple(graphs))
+
+
+def contains_expression(text: str) -> str:
+    """Render the words of *text* as a ``bif:contains`` prefix-AND literal.
+
+    Only word characters are kept, so quotes, wildcards and operators in user
+    input cannot change the full-text expression.
+
+    Raises:
+        ValueError: If *text* contains no words.
+    """
+    words = _WORD.findall(text)
+    if not words:
+        raise ValueError("The search query must contain at least one word.")
+    return literal(" AND ".join(f"'{w}*'" for w in words))
+
+
+_RENDERERS: dict[str, Callable[[Any], str]] = {
+    "iri": iri,
+    "iris": lambda values: " ".join(iri(v) for v in values),
+    "literal": literal,
+    "int": integer,
+    "from": from_block,
+    "contains": contains_expression,
+    "raw": str,
+}
+
+
+class QueryTemplate:
+    """A SPARQL query parsed once into static text and typed placeholders.
+
+    Raises:
+        ValueError: If a placeholder has an unknown kind.
+    """
+
+    __slots__ = ("text", "params", "_parts")
+
+    def __init__(self, text: str) -> None:
+        self.text = textwrap.dedent(text).strip()
+        self._parts: list[str | tuple[str, Callable[[Any], str]]] = []
+        self.params: dict[str, str] = {}
+        position = 0
+        for match in _PLACEHOLDER.finditer(self.text):
+            name, kind = match.group(1), match.group(2) or "literal"
+            if kind not in _RENDERERS:
+                raise ValueError(f"Unknown placeholder kind {kind!r} in {{{{{name}}}}}")
+            self._parts.append(self.text[position:match.start()])
+            self._parts.append((name, _RENDERERS[kind]))
+            self.params[name] = kind
+            position = match.end()
+        self._parts.append(self.text[position:])
+
+    def render(self, **params: Any) -> str:
+        """Bind *params* and return the query text.
+
+        Raises:
+            TypeError: If parameters are missing or unknown.
+            ValueError: If a value is invalid for its placeholder kind.
+        """
+        if params.keys() != self.params.keys():
+            missing = sorted(self.params.keys() - params.keys())
+            unknown = sorted(params.keys() - self.params.keys())
+            raise TypeError(f"Template parameters missing: {missing}, unknown: {unknown}")
+        with tracing.span("sparql.build") as span:
+            text = "".join(
+                part if isinstance(part, str) else part[1](params[part[0]])
+                for part in self._parts
+            )
+            if "graphs" in params:
+                span.set_attribute("sparql.graph_count", len(params["graphs"]))
+            span.set_attribute("sparql.query_length", len(text))
+        return text
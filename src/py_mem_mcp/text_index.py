@@ -0,0 +1,357 @@
+"""Local inverted full-text index over ``rdfs:label`` values.
+
+The SPARQL ``search`` relies on Virtuoso's ``bif:contains``, which scans the
+endpoint for every call and returns matches ordered by URI. :class:`TextIndex`
+keeps an inverted index of every label in memory instead:
+
+* labels and queries are folded the same way (case, ``ä``→``ae``,
+  ``ö``→``oe``, ``ü``→``ue``, ``ß``→``ss``), so either spelling matches;
+* the vocabulary is kept sorted, so the prefix semantics of
+  ``'word*'`` become a binary search for the range of terms sharing a prefix;
+* every query word must match (``AND``), and matches are ranked with BM25
+  using a bounded top-k heap; pages continue after the last
+  ``(score, uri, label)`` key shown.
+
+The index is built from a bulk label export, either read from a snapshot
+written by ``py-mem-mcp-export labels`` or pulled from SPARQL at startup.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .changes import RefreshError
+from .graphs import GraphRegistry
+from .paging import Page
+from .results import SparqlBinding, SparqlResults
+from .scheduler import Priority
+from .snapshot import SnapshotFile, StringTable, write_snapshot
+from .sparql import SparqlClient
+from .templates import QueryTemplate
+
+logger = logging.getLogger(__name__)
+
+#: BM25 term-frequency saturation and length normalisation.
+K1 = 1.2
+B = 0.75
+
+_FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_TOKEN = re.compile(r"\w+")
+
+#: Result variables of the local search, matching the unfiltered SPARQL search.
+SEARCH_VARS = ["s", "label", "parent", "parentLabel"]
+
+
+def fold(text: str) -> str:
+    """Fold *text* for matching: lower case and German umlauts/ß spelled out."""
+    return text.lower().translate(_FOLD)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split *text* into folded word tokens."""
+    return _TOKEN.findall(fold(text))
+
+
+@dataclass(frozen=True, slots=True)
+class LabelDoc:
+    """One ``rdfs:label`` of a node, with the graph it came from and a parent."""
+
+    uri: str
+    label: str
+    graph: str
+    parent: str | None = None
+
+
+_LABELS = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT ?s ?label ?parent
+{{graphs:from}}
+FROM NAMED {{graph:iri}}
+WHERE {
+  GRAPH {{graph:iri}} { ?s rdfs:label ?label . }
+  OPTIONAL { ?parent lp:LP_0000008 ?s . }
+}""")
+
+
+async def fetch_label_docs(
+    sparql: SparqlClient, graphs: GraphRegistry, graph: str
+) -> list[LabelDoc]:
+    """Stream every label of *graph*, keeping the first parent of each node."""
+    docs: dict[tuple[str, str], LabelDoc] = {}
+    async with sparql.stream(
+        _LABELS.render(graphs=graphs.all_graphs, graph=graph), priority=Priority.HEAVY
+    ) as rows:
+        async for row in rows:
+            key = (row["s"].value, row["label"].value)
+            if key not in docs:
+                parent = row["parent"].value if "parent" in row else None
+                docs[key] = LabelDoc(key[0], key[1], graph, parent)
+    return list(docs.values())
+
+
+def write_label_snapshot(
+    path: str | Path, docs: Sequence[LabelDoc], meta: dict | None = None
+) -> None:
+    """Write a bulk label export to a snapshot file."""
+    graph_names = sorted({doc.graph for doc in docs})
+    graph_ids = {graph: i for i, graph in enumerate(graph_names)}
+    uri_offsets, uri_blob = StringTable.build(doc.uri for doc in docs)
+    label_offsets, label_blob = StringTable.build(doc.label for doc in docs)
+    parent_offsets, parent_blob = StringTable.build(doc.parent or "" for doc in docs)
+    write_snapshot(
+        path,
+        {
+            "uri_offsets": uri_offsets,
+            "uri_blob": uri_blob,
+            "label_offsets": label_offsets,
+            "label_blob": label_blob,
+            "parent_offsets": parent_offsets,
+            "parent_blob": parent_blob,
+            "graphs": array("i", (graph_ids[doc.graph] for doc in docs)),
+        },
+        {**(meta or {}), "kind": "labels", "graph_names": graph_names, "docs": len(docs)},
+    )
+
+
+def read_label_snapshot(path: str | Path) -> list[LabelDoc]:
+    """Read the label docs of a snapshot written by :func:`write_label_snapshot`."""
+    file = SnapshotFile(path)
+    if file.meta.get("kind") != "labels":
+        raise ValueError(f"{file.path} is not a label snapshot.")
+    uris = StringTable(file.section("uri_offsets"), file.section("uri_blob"))
+    labels = StringTable(file.section("label_offsets"), file.section("label_blob"))
+    parents = StringTable(file.section("parent_offsets"), file.section("parent_blob"))
+    graph_names = file.meta["graph_names"]
+    graph_ids = file.section("graphs")
+    return [
+        LabelDoc(uris[i], labels[i], graph_names[graph_ids[i]], parents[i] or None)
+        for i in range(len(uris))
+    ]
+
+
+class _Postings:
+    """Immutable inverted index built from one set of label docs."""
+
+    def __init__(self, docs: Sequence[LabelDoc]) -> None:
+        self.docs = list(docs)
+        self.lengths = array("i")
+        postings: dict[str, array] = {}
+        for doc_id, doc in enumerate(self.docs):
+            tokens = tokenize(doc.label)
+            self.lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                # Interleaved (doc id, term frequency) pairs.
+                postings.setdefault(term, array("i")).extend((doc_id, tf))
+        self.terms = sorted(postings)
+        self.postings = postings
+        self.avg_length = (sum(self.lengths) / len(self.docs)) if self.docs else 0.0
+        self.labels: dict[str, str] = {}
+        for doc in self.docs:
+            self.labels.setdefault(doc.uri, doc.label)
+
+    def expand(self, prefix: str) -> list[str]:
+        """Return all vocabulary terms starting with *prefix*."""
+        start = bisect_left(self.terms, prefix)
+        end = start
+        while end < len(self.terms) and self.terms[end].startswith(prefix):
+            end += 1
+        return self.terms[start:end]
+
+    def word_scores(self, word: str, graphs: set[str] | None) -> dict[int, float]:
+        """BM25 scores of the docs matching *word* as a prefix.
+
+        The prefix is scored as one term: its frequency in a label is the
+        number of tokens it prefixes, its document frequency the number of
+        labels it matches.
+        """
+        tfs: Counter[int] = Counter()
+        for term in self.expand(word):
+            entries = self.postings[term]
+            for i in range(0, len(entries), 2):
+                tfs[entries[i]] += entries[i + 1]
+        df = len(tfs)
+        idf = math.log(1 + (len(self.docs) - df + 0.5) / (df + 0.5))
+        scores: dict[int, float] = {}
+        for doc_id, tf in tfs.items():
+            if graphs is not None and self.docs[doc_id].graph not in graphs:
+                continue
+            norm = 1 - B + B * self.lengths[doc_id] / self.avg_length
+            scores[doc_id] = idf * tf * (K1 + 1) / (tf + K1 * norm)
+        return scores
+
+
+class TextIndex:
+    """Ranked local full-text search over node labels.
+
+    Args:
+        sparql_client: Used to pull the labels when no snapshot *path* is given.
+        graph_registry: The graphs whose labels are indexed.
+        path: Optional label snapshot written by ``py-mem-mcp-export labels``.
+    """
+
+    def __init__(
+        self,
+        sparql_client: SparqlClient,
+        graph_registry: GraphRegistry,
+        path: str | Path | None = None,
+    ) -> None:
+        self.sparql = sparql_client
+        self.graphs = graph_registry
+        self.path = path
+        self._docs_by_graph: dict[str, list[LabelDoc]] = {}
+        self._index = _Postings([])
+
+    def __len__(self) -> int:
+        return len(self._index.docs)
+
+    @property
+    def ready(self) -> bool:
+        """Whether any labels have been loaded."""
+        return bool(self._index.docs)
+
+    def build(self, docs: Iterable[LabelDoc]) -> None:
+        """Replace the indexed docs with *docs*."""
+        by_graph: dict[str, list[LabelDoc]] = {}
+        for doc in docs:
+            by_graph.setdefault(doc.graph, []).append(doc)
+        self._docs_by_graph = by_graph
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._index = _Postings(
+            [doc for docs in self._docs_by_graph.values() for doc in docs]
+        )
+
+    async def load_graph(self, graph: str) -> None:
+        """(Re)load the labels of one graph from SPARQL."""
+        self._docs_by_graph[graph] = await fetch_label_docs(self.sparql, self.graphs, graph)
+        self._rebuild()
+
+    async def refresh(self, changed: set[str]) -> None:
+        """Re-pull the labels of the *changed* graphs and rebuild once.
+
+        A graph that fails to load keeps its previous labels.
+
+        Raises:
+            RefreshError: Naming the graphs that failed to load, after the
+                others have been updated.
+        """
+        graphs = [g for g in self.graphs.all_graphs if g in changed]
+        outcomes = await asyncio.gather(
+            *(fetch_label_docs(self.sparql, self.graphs, g) for g in graphs),
+            return_exceptions=True,
+        )
+        failed: set[str] = set()
+        for graph, outcome in zip(graphs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Could not refresh labels of %s: %s", graph, outcome)
+                failed.add(graph)
+            else:
+                self._docs_by_graph[graph] = outcome
+        self._rebuild()
+        if failed:
+            raise RefreshError(f"Could not refresh labels of {len(failed)} graphs", failed)
+
+    async def load(self) -> None:
+        """Build the index from the snapshot file, or from SPARQL without one.
+
+        A graph that fails to load is logged and left out of the index.
+        """
+        if self.path is not None:
+            self.build(read_label_snapshot(self.path))
+            return
+        all_graphs = self.graphs.all_graphs
+        outcomes = await asyncio.gather(
+            *(fetch_label_docs(self.sparql, self.graphs, g) for g in all_graphs),
+            return_exceptions=True,
+        )
+        by_graph: dict[str, list[LabelDoc]] = {}
+        for graph, outcome in zip(all_graphs, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Could not load labels of %s: %s", graph, outcome)
+            else:
+                by_graph[graph] = outcome
+        self._docs_by_graph = by_graph
+        self._rebuild()
+
+    def search(
+        self, query: str, graphs: Iterable[str] | None = None, limit: int = 50
+    ) -> SparqlResults:
+        """Return the *limit* best matches for *query*, best first.
+
+        Every query word must prefix-match a word of the label. Rows carry
+        the ``SEARCH_VARS`` of the SPARQL search; a label found in several
+        graphs is returned once.
+
+        Args:
+            query: Search words, matched as prefixes.
+            graphs: Only return labels from these graphs; all when omitted.
+            limit: Maximum number of rows.
+        """
+        return self.page(query, graphs, limit).results
+
+    def page(
+        self,
+        query: str,
+        graphs: Iterable[str] | None = None,
+        limit: int = 50,
+        after: Sequence[Any] | None = None,
+    ) -> Page:
+        """Like :meth:`search`, continuing after the ``[score, uri, label]`` key *after*.
+
+        The returned page carries the key of its last row when more matches follow.
+        """
+        index = self._index
+        graph_set = set(graphs) if graphs is not None else None
+        results = SparqlResults(vars=SEARCH_VARS)
+        words = tokenize(query)
+        if not words or not index.docs:
+            return Page(results)
+
+        totals: dict[int, float] | None = None
+        for word in sorted(set(words), key=lambda w: len(index.expand(w))):
+            scores = index.word_scores(word, graph_set)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {d: s + scores[d] for d, s in totals.items() if d in scores}
+            if not totals:
+                return Page(results)
+
+        best: dict[tuple[str, str], tuple[float, int]] = {}
+        for doc_id, score in totals.items():
+            doc = index.docs[doc_id]
+            key = (doc.uri, doc.label)
+            if key not in best or score > best[key][0]:
+                best[key] = (score, doc_id)
+        ranked = (((-score, *key), doc_id) for key, (score, doc_id) in best.items())
+        if after is not None:
+            last = (-after[0], *after[1:])
+            ranked = (item for item in ranked if item[0] > last)
+        top = heapq.nsmallest(limit + 1, ranked)
+
+        for _, doc_id in top[:limit]:
+            doc = index.docs[doc_id]
+            row = {
+                "s": SparqlBinding(type="uri", value=doc.uri),
+                "label": SparqlBinding(type="literal", value=doc.label),
+            }
+            if doc.parent is not None:
+                row["parent"] = SparqlBinding(type="uri", value=doc.parent)
+                parent_label = index.labels.get(doc.parent)
+                if parent_label is not None:
+                    row["parentLabel"] = SparqlBinding(type="literal", value=parent_label)
+            results.append(row)
+        if len(top) <= limit:
+            return Page(results)
+        (neg_score, uri, label), _ = top[limit - 1]
+        return Page(results, [-neg_score, uri, label])
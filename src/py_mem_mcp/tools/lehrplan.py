@@ -1,4 +1,4 @@
-"""Lehrplan tools: find_lehrplaene, get_lehrplan_tree, get_children.
+"""Lehrplan tools: find_lehrplaene, get_lehrplan_tree, get_children, get_children_batch.
 
 These tools navigate the hierarchical curriculum (Lehrplan) data stored
 in the MEM ontology triple store.
@@ -9,9 +9,70 @@ from typing import Annotated
 from fastmcp import FastMCP
 from pydantic import Field
 
+from .. import tracing
 from ..bundesland import BundeslandRegistry
 from ..graphs import GraphRegistry
+from ..name_index import NameIndex, normalize_label
+from ..paging import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    cursor_scope,
+    decode_cursor,
+    keyset_filter,
+    page_footer,
+    take_page,
+)
+from ..results import SparqlResults
+from ..snapshot import HierarchySnapshot
 from ..sparql import SparqlClient
+from ..templates import QueryTemplate, iri
+from ..tree import fetch_children, fetch_children_grouped, fetch_tree
+
+_NODE_BUDGET = 5000
+_MAX_BYTES = 100_000
+_MAX_BATCH_NODES = 100
+
+_RESOLVE = """
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT ?uri
+{{graphs:from}}
+WHERE {
+  ?s lp:%s ?uri .
+  ?uri rdfs:label ?l .
+  ?s lp:LP_0000029 {{bundesland:iri}} .
+  FILTER(LCASE(STR(?l)) = {{name:literal}})
+}
+LIMIT 1"""
+_RESOLVE_SCHULFACH = QueryTemplate(_RESOLVE % "LP_0000537")
+_RESOLVE_SCHULART = QueryTemplate(_RESOLVE % "LP_0000812")
+
+_FIND_LEHRPLAENE = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?s ?label
+{{graphs:from}}
+WHERE {
+  ?lpsubclass rdfs:subClassOf* lp:LP_0000438 .
+  ?s rdf:type ?lpsubclass .
+  ?s rdfs:label ?label .
+  ?s lp:LP_0000029 {{bundesland:iri}} .
+  {{filters:raw}}
+}
+ORDER BY STR(?label) STR(?s)
+LIMIT {{limit:int}}""")
+
+_GET_CHILDREN = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?child ?childLabel
+{{graphs:from}}
+WHERE {
+  {{node:iri}} lp:LP_0000008 ?child .
+  OPTIONAL { ?child rdfs:label ?childLabel . }
+}
+ORDER BY ?child""")
+
+# ORDER BY expressions of find_lehrplaene, and the variables they read.
+_LEHRPLAN_KEYS = ["STR(?label)", "STR(?s)"]
+_LEHRPLAN_VARS = ["label", "s"]
 
 
 async def _resolve_schulfach_uri(
@@ -19,20 +80,23 @@ async def _resolve_schulfach_uri(
     bundesland_uri: str,
     bl_graphs: list[str],
     sparql: SparqlClient,
+    index: NameIndex | None = None,
 ) -> str:
-    """Resolve a Schulfach name to its URI for the given Bundesland."""
-    query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT ?uri
-{GraphRegistry.from_clauses(bl_graphs)}
-WHERE {{
-  ?s lp:LP_0000537 ?uri .
-  ?uri rdfs:label ?l .
-  ?s lp:LP_0000029 <{bundesland_uri}> .
-  FILTER(LCASE(STR(?l)) = "{name.lower()}")
-}}
-LIMIT 1"""
-    results = await sparql.query(query)
+    """Resolve a Schulfach name to its URI for the given Bundesland.
+
+    Answered from the prewarmed *index* when possible; SPARQL is the fallback.
+    """
+    with tracing.span("resolve_schulfach", **{"sparql.graph_count": len(bl_graphs)}) as span:
+        if index is not None:
+            uri = index.lookup_schulfach(bundesland_uri, name)
+            if uri is not None:
+                span.set_attribute("resolve.source", "index")
+                return uri
+        span.set_attribute("resolve.source", "sparql")
+        query = _RESOLVE_SCHULFACH.render(
+            graphs=bl_graphs, bundesland=bundesland_uri, name=normalize_label(name)
+        )
+        results = await sparql.query(query, format=sparql.tabular_format)
     if not results.bindings:
         raise ValueError(
             f'Schulfach "{name}" not found for this Bundesland. '
@@ -46,20 +110,23 @@ async def _resolve_schulart_uri(
     bundesland_uri: str,
     bl_graphs: list[str],
     sparql: SparqlClient,
+    index: NameIndex | None = None,
 ) -> str:
-    """Resolve a Schulart name to its URI for the given Bundesland."""
-    query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT ?uri
-{GraphRegistry.from_clauses(bl_graphs)}
-WHERE {{
-  ?s lp:LP_0000812 ?uri .
-  ?uri rdfs:label ?l .
-  ?s lp:LP_0000029 <{bundesland_uri}> .
-  FILTER(LCASE(STR(?l)) = "{name.lower()}")
-}}
-LIMIT 1"""
-    results = await sparql.query(query)
+    """Resolve a Schulart name to its URI for the given Bundesland.
+
+    Answered from the prewarmed *index* when possible; SPARQL is the fallback.
+    """
+    with tracing.span("resolve_schulart", **{"sparql.graph_count": len(bl_graphs)}) as span:
+        if index is not None:
+            uri = index.lookup_schulart(bundesland_uri, name)
+            if uri is not None:
+                span.set_attribute("resolve.source", "index")
+                return uri
+        span.set_attribute("resolve.source", "sparql")
+        query = _RESOLVE_SCHULART.render(
+            graphs=bl_graphs, bundesland=bundesland_uri, name=normalize_label(name)
+        )
+        results = await sparql.query(query, format=sparql.tabular_format)
     if not results.bindings:
         raise ValueError(
             f'Schulart "{name}" not found for this Bundesland. '
@@ -69,23 +136,50 @@ LIMIT 1"""
 
 
 class LehrplanTools:
-    """Provides tools for navigating Lehrplan hierarchy data."""
+    """Provides tools for navigating Lehrplan hierarchy data.
+
+    ``get_lehrplan_tree`` collects at most ``node_budget`` nodes and renders
+    no more than ``max_bytes`` of them.
+    """
 
     def __init__(
         self,
         sparql_client: SparqlClient,
         graph_registry: GraphRegistry,
         bundesland_registry: BundeslandRegistry,
+        name_index: NameIndex | None = None,
+        node_budget: int = _NODE_BUDGET,
+        snapshot: HierarchySnapshot | None = None,
+        max_bytes: int | None = _MAX_BYTES,
     ) -> None:
         self.sparql = sparql_client
         self.graphs = graph_registry
         self.bl_registry = bundesland_registry
+        self.name_index = name_index
+        self.node_budget = node_budget
+        self.snapshot = snapshot
+        self.max_bytes = max_bytes
 
     def register(self, mcp: FastMCP) -> None:
         """Register all Lehrplan tools with the given FastMCP server instance."""
         sparql = self.sparql
         graphs = self.graphs
         bl_registry = self.bl_registry
+        name_index = self.name_index
+        node_budget = self.node_budget
+        snapshot = self.snapshot
+        max_bytes = self.max_bytes
+
+        async def children_of(parents: list[str]) -> SparqlResults:
+            # The local hierarchy snapshot answers nodes it knows; SPARQL the others.
+            if snapshot is None:
+                return await fetch_children(sparql, graphs.all_graphs, parents)
+            unknown = [parent for parent in parents if snapshot.node_id(parent) is None]
+            results = snapshot.children_of(parents)
+            if unknown:
+                for row in (await fetch_children(sparql, graphs.all_graphs, unknown)).bindings:
+                    results.append(row)
+            return results
 
         @mcp.tool(
             name="find_lehrplaene",
@@ -93,7 +187,8 @@ class LehrplanTools:
                 "Find curricula (Lehrpläne) by Bundesland, optionally filtered by "
                 "Schulfach, Schulart, or Jahrgangsstufe. "
                 "Use state codes/names. For Schulfach and Schulart, use the German "
-                "name as shown by the list tools."
+                "name as shown by the list tools. Results are paged; pass the "
+                "returned cursor to get the next page."
             ),
         )
         async def find_lehrplaene(
@@ -115,39 +210,55 @@ class LehrplanTools:
                 int | None,
                 Field(description="Optional: grade level (1–13)", ge=1, le=13),
             ] = None,
+            page_size: Annotated[
+                int,
+                Field(description="Results per page (default 50)", ge=1, le=MAX_PAGE_SIZE),
+            ] = DEFAULT_PAGE_SIZE,
+            cursor: Annotated[
+                str | None,
+                Field(description="Optional: cursor from the previous page to continue"),
+            ] = None,
         ) -> str:
+            scope = cursor_scope(
+                "find_lehrplaene",
+                bundesland=bundesland,
+                schulfach=schulfach,
+                schulart=schulart,
+                jahrgangsstufe=jahrgangsstufe,
+            )
+            after = decode_cursor(cursor, scope) if cursor else None
             bl = bl_registry.resolve(bundesland)
             bl_graphs = graphs.graphs_for_bundesland(bl.code)
-            filters = [f"?s lp:LP_0000029 <{bl.uri}> ."]
+            filters: list[str] = []
 
             if schulfach:
-                sf_uri = await _resolve_schulfach_uri(schulfach, bl.uri, bl_graphs, sparql)
-                filters.append(f"?s lp:LP_0000537 <{sf_uri}> .")
+                sf_uri = await _resolve_schulfach_uri(
+                    schulfach, bl.uri, bl_graphs, sparql, name_index
+                )
+                filters.append(f"?s lp:LP_0000537 {iri(sf_uri)} .")
             if schulart:
-                sa_uri = await _resolve_schulart_uri(schulart, bl.uri, bl_graphs, sparql)
-                filters.append(f"?s lp:LP_0000812 <{sa_uri}> .")
+                sa_uri = await _resolve_schulart_uri(
+                    schulart, bl.uri, bl_graphs, sparql, name_index
+                )
+                filters.append(f"?s lp:LP_0000812 {iri(sa_uri)} .")
             if jahrgangsstufe is not None:
                 js_uri = (
                     f"https://w3id.org/lehrplan/ontology/"
                     f"LP_{2000000 + jahrgangsstufe:07d}"
                 )
-                filters.append(f"?s lp:LP_0000026 <{js_uri}> .")
+                filters.append(f"?s lp:LP_0000026 {iri(js_uri)} .")
+            if after:
+                filters.append(keyset_filter(_LEHRPLAN_KEYS, after))
 
-            filter_block = "\n  ".join(filters)
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?s ?label
-{GraphRegistry.from_clauses(bl_graphs)}
-WHERE {{
-  ?lpsubclass rdfs:subClassOf* lp:LP_0000438 .
-  ?s rdf:type ?lpsubclass .
-  ?s rdfs:label ?label .
-  {filter_block}
-}}
-ORDER BY ?label
-LIMIT 50"""
-            results = await sparql.query(query)
-            return SparqlClient.format_results(results)
+            query = _FIND_LEHRPLAENE.render(
+                graphs=bl_graphs,
+                bundesland=bl.uri,
+                filters="\n  ".join(filters),
+                limit=page_size + 1,
+            )
+            results = await sparql.query(query, format=sparql.tabular_format)
+            page = take_page(results, page_size, _LEHRPLAN_VARS)
+            return SparqlClient.format_results(page.results) + page_footer(page, scope)
 
         @mcp.tool(
             name="get_lehrplan_tree",
@@ -168,45 +279,36 @@ LIMIT 50"""
                 Field(description="How many levels deep to retrieve (default 2)", ge=1, le=10),
             ] = 2,
         ) -> str:
-            unions: list[str] = []
-            for d in range(1, depth + 1):
-                if d == 1:
-                    unions.append(
-                        f"{{ BIND(<{lehrplan_uri}> AS ?parent) . "
-                        "?parent lp:LP_0000008 ?child . }}"
-                    )
-                else:
-                    steps = [f"<{lehrplan_uri}> lp:LP_0000008 ?step1 ."]
-                    for i in range(2, d):
-                        steps.append(f"?step{i - 1} lp:LP_0000008 ?step{i} .")
-                    steps.append(f"BIND(?step{d - 1} AS ?parent)")
-                    steps.append("?parent lp:LP_0000008 ?child .")
-                    unions.append("{ " + " ".join(steps) + " }")
-
-            union_block = "\n  UNION\n  ".join(unions)
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?parent ?parentLabel ?child ?childLabel
-{GraphRegistry.from_clauses(graphs.all_graphs)}
-WHERE {{
-  {union_block}
-  OPTIONAL {{ ?parent rdfs:label ?parentLabel . }}
-  OPTIONAL {{ ?child rdfs:label ?childLabel . }}
-}}
-ORDER BY ?parent ?child"""
-            results = await sparql.query(query)
+            tree = await fetch_tree(
+                children_of,
+                lehrplan_uri,
+                depth,
+                node_budget,
+            )
+            results = tree.results
 
             parent_uris = {b["parent"].value for b in results.bindings}
             child_uris = {b["child"].value for b in results.bindings}
             leaves = child_uris - parent_uris
 
-            text = SparqlClient.format_results(results)
-            if leaves:
-                text += (
+            footer = ""
+            if tree.truncated:
+                footer = (
+                    f"\n\n(Tree truncated after {node_budget} nodes. "
+                    "Use get_children to explore specific branches.)"
+                )
+            elif leaves:
+                footer = (
                     f"\n\n(Tree shown to depth {depth}. "
                     "Deeper levels may exist. Use get_children to explore further.)"
                 )
-            return text
+            text = SparqlClient.format_results(
+                results,
+                max_bytes,
+                advice="Lower the depth or use get_children to explore specific branches.",
+                reserve=len(footer.encode()),
+            )
+            return text + footer
 
         @mcp.tool(
             name="get_children",
@@ -222,16 +324,54 @@ ORDER BY ?parent ?child"""
                 Field(description="URI of the node to get children for"),
             ],
         ) -> str:
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?child ?childLabel
-{GraphRegistry.from_clauses(graphs.all_graphs)}
-WHERE {{
-  <{node_uri}> lp:LP_0000008 ?child .
-  OPTIONAL {{ ?child rdfs:label ?childLabel . }}
-}}
-ORDER BY ?child"""
-            results = await sparql.query(query)
+            if snapshot is not None:
+                local = snapshot.children(node_uri)
+                if local is not None:
+                    if not local.bindings:
+                        return "No children found (leaf node)."
+                    return SparqlClient.format_results(local)
+            query = _GET_CHILDREN.render(graphs=graphs.all_graphs, node=node_uri)
+            results = await sparql.query(query, format=sparql.tabular_format)
             if not results.bindings:
                 return "No children found (leaf node)."
             return SparqlClient.format_results(results)
+
+        @mcp.tool(
+            name="get_children_batch",
+            description=(
+                "Get the direct children of several nodes in the Lehrplan hierarchy "
+                "at once (via 'hat Teil'), grouped by parent. Prefer this over "
+                "repeated get_children calls when expanding a whole level."
+            ),
+        )
+        async def get_children_batch(
+            node_uris: Annotated[
+                list[str],
+                Field(
+                    description=f"URIs of the nodes to get children for (max {_MAX_BATCH_NODES})",
+                    min_length=1,
+                    max_length=_MAX_BATCH_NODES,
+                ),
+            ],
+        ) -> str:
+            grouped: dict[str, SparqlResults] = {}
+            remote: list[str] = []
+            for uri in dict.fromkeys(node_uris):
+                local = snapshot.children(uri) if snapshot is not None else None
+                if local is not None:
+                    grouped[uri] = local
+                else:
+                    remote.append(uri)
+            if remote:
+                grouped.update(await fetch_children_grouped(sparql, graphs.all_graphs, remote))
+
+            sections = []
+            for uri in dict.fromkeys(node_uris):
+                results = grouped[uri]
+                body = (
+                    SparqlClient.format_results(results)
+                    if results.bindings
+                    else "No children found (leaf node)."
+                )
+                sections.append(f"## {uri}\n{body}")
+            return "\n\n".join(sections)
@@ -6,8 +6,46 @@ from fastmcp import FastMCP
 from pydantic import Field
 
 from ..bundesland import BundeslandRegistry
+from ..fanout import FanOut
 from ..graphs import GraphRegistry
 from ..sparql import SparqlClient
+from ..templates import QueryTemplate
+
+_LIST_BUNDESLAENDER = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?uri ?label
+{{graphs:from}}
+WHERE {
+  ?s lp:LP_0000029 ?uri .
+  ?uri rdfs:label ?label .
+  FILTER(lang(?label) = "de")
+}
+ORDER BY ?label""")
+
+_LIST_SCHULFAECHER = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?uri (SAMPLE(?l) AS ?label)
+{{graphs:from}}
+WHERE {
+  ?s lp:LP_0000537 ?uri .
+  ?uri rdfs:label ?l .
+  ?s lp:LP_0000029 {{bundesland:iri}} .
+  FILTER(lang(?l) = "de")
+}
+GROUP BY ?uri
+ORDER BY ?label""")
+
+_LIST_SCHULARTEN = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?uri (SAMPLE(?l) AS ?label)
+{{graphs:from}}
+WHERE {
+  ?s lp:LP_0000812 ?uri .
+  ?uri rdfs:label ?l .
+  ?s lp:LP_0000029 {{bundesland:iri}} .
+}
+GROUP BY ?uri
+ORDER BY ?label""")
 
 
 class ListingTools:
@@ -18,16 +56,19 @@ class ListingTools:
         sparql_client: SparqlClient,
         graph_registry: GraphRegistry,
         bundesland_registry: BundeslandRegistry,
+        fanout: FanOut | None = None,
     ) -> None:
         self.sparql = sparql_client
         self.graphs = graph_registry
         self.bundesland = bundesland_registry
+        self.fanout = fanout
 
     def register(self, mcp: FastMCP) -> None:
         """Register all listing tools with the given FastMCP server instance."""
         sparql = self.sparql
         graphs = self.graphs
         bl_registry = self.bundesland
+        fanout = self.fanout
 
         @mcp.tool(
             name="list_bundeslaender",
@@ -37,17 +78,16 @@ class ListingTools:
             ),
         )
         async def list_bundeslaender() -> str:
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?uri ?label
-{GraphRegistry.from_clauses(graphs.all_graphs)}
-WHERE {{
-  ?s lp:LP_0000029 ?uri .
-  ?uri rdfs:label ?label .
-  FILTER(lang(?label) = "de")
-}}
-ORDER BY ?label"""
-            results = await sparql.query(query)
+            if fanout is not None:
+                results = await fanout.query(
+                    lambda query_graphs: _LIST_BUNDESLAENDER.render(graphs=query_graphs),
+                    order_by=["label"],
+                )
+            else:
+                results = await sparql.query(
+                    _LIST_BUNDESLAENDER.render(graphs=graphs.all_graphs),
+                    format=sparql.tabular_format,
+                )
             return SparqlClient.format_results(results)
 
         @mcp.tool(
@@ -70,19 +110,8 @@ ORDER BY ?label"""
         ) -> str:
             bl = bl_registry.resolve(bundesland)
             bl_graphs = graphs.graphs_for_bundesland(bl.code)
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?uri (SAMPLE(?l) AS ?label)
-{GraphRegistry.from_clauses(bl_graphs)}
-WHERE {{
-  ?s lp:LP_0000537 ?uri .
-  ?uri rdfs:label ?l .
-  ?s lp:LP_0000029 <{bl.uri}> .
-  FILTER(lang(?l) = "de")
-}}
-GROUP BY ?uri
-ORDER BY ?label"""
-            results = await sparql.query(query)
+            query = _LIST_SCHULFAECHER.render(graphs=bl_graphs, bundesland=bl.uri)
+            results = await sparql.query(query, format=sparql.tabular_format)
             return SparqlClient.format_results(results)
 
         @mcp.tool(
@@ -105,16 +134,6 @@ ORDER BY ?label"""
         ) -> str:
             bl = bl_registry.resolve(bundesland)
             bl_graphs = graphs.graphs_for_bundesland(bl.code)
-            query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?uri (SAMPLE(?l) AS ?label)
-{GraphRegistry.from_clauses(bl_graphs)}
-WHERE {{
-  ?s lp:LP_0000812 ?uri .
-  ?uri rdfs:label ?l .
-  ?s lp:LP_0000029 <{bl.uri}> .
-}}
-GROUP BY ?uri
-ORDER BY ?label"""
-            results = await sparql.query(query)
+            query = _LIST_SCHULARTEN.render(graphs=bl_graphs, bundesland=bl.uri)
+            results = await sparql.query(query, format=sparql.tabular_format)
             return SparqlClient.format_results(results)
@@ -1,25 +1,46 @@
 """Arbitrary SPARQL query tool for the MEM ontology MCP server."""
 
-from typing import Annotated
+from typing import Annotated, Literal
 
 from fastmcp import FastMCP
 from pydantic import Field
 
 from ..graphs import GraphRegistry
+from ..output import JsonWriter, TableWriter
 from ..sparql import SparqlClient
 
 
+_MAX_ROWS = 10000
+_MAX_BYTES = 100_000
+
+
 class QueryTools:
-    """Provides the ``sparql_query`` tool for executing raw SPARQL queries."""
+    """Provides the ``sparql_query`` tool for executing raw SPARQL queries.
+
+    Results are streamed from the endpoint and rendered row by row; reading
+    stops after ``max_rows`` rows or once the output would exceed
+    ``max_bytes``, so oversized ad-hoc queries cannot exhaust memory or flood
+    the client.
+    """
 
-    def __init__(self, sparql_client: SparqlClient, graph_registry: GraphRegistry) -> None:
+    def __init__(
+        self,
+        sparql_client: SparqlClient,
+        graph_registry: GraphRegistry,
+        max_rows: int = _MAX_ROWS,
+        max_bytes: int = _MAX_BYTES,
+    ) -> None:
         self.sparql = sparql_client
         self.graphs = graph_registry
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
 
     def register(self, mcp: FastMCP) -> None:
         """Register all query tools with the given FastMCP server instance."""
         sparql = self.sparql
         graphs = self.graphs
+        max_rows = self.max_rows
+        max_bytes = self.max_bytes
 
         graph_list = ", ".join(
             [f"<{g}>" for g in graphs.infra_graphs]
@@ -29,12 +50,24 @@ class QueryTools:
             "Execute a SPARQL query against the MEM ontology triple store. "
             "PREFIX lp: <https://w3id.org/lehrplan/ontology/> is available. "
             "You MUST include FROM clauses for the graphs you need. "
-            f"Available graphs: {graph_list}"
+            f"Available graphs: {graph_list}. "
+            'Use format="json" for compact rows with IRIs shortened to CURIEs (lp:...).'
         )
 
         @mcp.tool(name="sparql_query", description=description)
         async def sparql_query(
             query: Annotated[str, Field(description="The full SPARQL SELECT query to execute")],
+            format: Annotated[
+                Literal["table", "json"],
+                Field(description="Output format: text table (default) or compact JSON"),
+            ] = "table",
         ) -> str:
-            results = await sparql.query(query)
-            return SparqlClient.format_results(results)
+            notice = f"Results truncated to {max_rows} rows. Add a LIMIT or narrow the query."
+            async with sparql.stream(query, max_rows=max_rows) as rows:
+                writer = (
+                    JsonWriter(rows.vars, max_bytes, limit_note=notice)
+                    if format == "json"
+                    else TableWriter(rows.vars, max_bytes, limit_note=notice)
+                )
+                await writer.consume(rows)
+            return writer.finish(limited=rows.truncated)
@@ -6,11 +6,157 @@ from fastmcp import FastMCP
 from pydantic import Field
 
 from ..bundesland import BundeslandRegistry
+from ..closure import ClosureTable
+from ..fanout import FanOut
 from ..graphs import GraphRegistry
+from ..name_index import NameIndex
+from ..paging import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    Page,
+    cursor_scope,
+    decode_cursor,
+    keyset_filter,
+    page_footer,
+    take_page,
+)
+from ..results import SparqlBinding, SparqlResults
 from ..sparql import SparqlClient
+from ..templates import QueryTemplate
+from ..text_index import TextIndex
 from .lehrplan import _resolve_schulfach_uri
 
-_RESULTS_LIMIT = 50
+# Result variables and the string-valued ORDER BY expressions of the queries below.
+_SEARCH_VARS = ["s", "label", "parent", "parentLabel"]
+_SEARCH_KEYS = [
+    "STR(?s)",
+    "STR(?label)",
+    'COALESCE(STR(?parent), "")',
+    'COALESCE(STR(?parentLabel), "")',
+]
+_SUBJECT_VARS = ["s", "label", "lp", "lpLabel"]
+_SUBJECT_KEYS = ["STR(?s)", "STR(?label)", "STR(?lp)", "STR(?lpLabel)"]
+
+_SEARCH = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?s ?label ?parent ?parentLabel
+{{graphs:from}}
+WHERE {
+  ?s rdfs:label ?label .
+  ?label bif:contains {{text:contains}} .
+  OPTIONAL {
+    ?parent lp:LP_0000008 ?s .
+    ?parent rdfs:label ?parentLabel .
+  }
+  {{keyset:raw}}
+}
+ORDER BY STR(?s) STR(?label) COALESCE(STR(?parent), "") COALESCE(STR(?parentLabel), "")
+LIMIT {{limit:int}}""")
+
+_SEARCH_SUBJECT = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?s ?label ?lp ?lpLabel
+{{graphs:from}}
+WHERE {
+  ?s rdfs:label ?label .
+  ?label bif:contains {{text:contains}} .
+  ?lp lp:LP_0000008+ ?s .
+  ?lp lp:LP_0000537 {{schulfach:iri}} .
+  ?lp rdfs:label ?lpLabel .
+  {{keyset:raw}}
+}
+ORDER BY STR(?s) STR(?label) STR(?lp) STR(?lpLabel)
+LIMIT {{limit:int}}""")
+
+# Plain label matches, joined with the closure table instead of the + path.
+_SEARCH_CANDIDATES = QueryTemplate("""
+SELECT DISTINCT ?s ?label
+{{graphs:from}}
+WHERE {
+  ?s rdfs:label ?label .
+  ?label bif:contains {{text:contains}} .
+  {{keyset:raw}}
+}
+ORDER BY STR(?s) STR(?label)
+LIMIT {{limit:int}}""")
+
+# Label matches read per round trip, and per call, when joining with the closure.
+_SCAN_CHUNK = 500
+_MAX_SCAN = 5000
+
+
+def _render(query: str, page: Page, scope: str) -> str:
+    if not page.results.bindings:
+        if page.next_key is None:
+            return f'No results found for "{query}".'
+        return "No matches in the labels scanned so far." + page_footer(page, scope)
+    return SparqlClient.format_results(page.results) + page_footer(page, scope)
+
+
+async def _closure_page(
+    sparql: SparqlClient,
+    closure: ClosureTable,
+    search_graphs: list[str],
+    text: str,
+    schulfach_uri: str,
+    bundesland_uri: str,
+    page_size: int,
+    after: list | None,
+) -> Page:
+    """Subject-filtered search as label matches joined with the closure table.
+
+    Label matches are read in key order, ``_SCAN_CHUNK`` at a time, and kept
+    when the closure places them below a Lehrplan of the Schulfach. A cursor
+    is ``[s, label, lp, lpLabel]`` of the last row shown, or ``[s, label,
+    None, None]`` when the scan budget ran out before the page filled.
+    """
+    rows: list[tuple[str, str, str, str]] = []
+
+    def join(s: str, label: str, lp_after: tuple[str, str] | None = None) -> None:
+        for lp, lp_label in closure.lehrplaene(s, schulfach_uri, bundesland_uri):
+            if lp_after is None or (lp, lp_label) > lp_after:
+                rows.append((s, label, lp, lp_label))
+
+    scan_after: list[str] | None = None
+    if after:
+        s, label, lp, lp_label = after
+        if lp is not None:
+            join(s, label, (lp, lp_label))
+        scan_after = [s, label]
+
+    scanned = 0
+    exhausted = False
+    while len(rows) <= page_size and scanned < _MAX_SCAN:
+        candidates = await sparql.query(
+            _SEARCH_CANDIDATES.render(
+                graphs=search_graphs,
+                text=text,
+                keyset=keyset_filter(_SUBJECT_KEYS[:2], scan_after) if scan_after else "",
+                limit=_SCAN_CHUNK,
+            ),
+            format=sparql.tabular_format,
+        )
+        for s, label in zip(candidates.values("s"), candidates.values("label")):
+            join(s, label)
+            scan_after = [s, label]
+        scanned += len(candidates)
+        if len(candidates) < _SCAN_CHUNK:
+            exhausted = True
+            break
+
+    results = SparqlResults(vars=_SUBJECT_VARS)
+    for s, label, lp, lp_label in rows[:page_size]:
+        results.append({
+            "s": SparqlBinding(type="uri", value=s),
+            "label": SparqlBinding(type="literal", value=label),
+            "lp": SparqlBinding(type="uri", value=lp),
+            "lpLabel": SparqlBinding(type="literal", value=lp_label),
+        })
+    if len(rows) > page_size:
+        return Page(results, list(rows[page_size - 1]))
+    if not exhausted:
+        return Page(results, [*scan_after, None, None])
+    return Page(results)
 
 
 class SearchTools:
@@ -21,16 +167,28 @@ class SearchTools:
         sparql_client: SparqlClient,
         graph_registry: GraphRegistry,
         bundesland_registry: BundeslandRegistry,
+        name_index: NameIndex | None = None,
+        text_index: TextIndex | None = None,
+        fanout: FanOut | None = None,
+        closure: ClosureTable | None = None,
     ) -> None:
         self.sparql = sparql_client
         self.graphs = graph_registry
         self.bl_registry = bundesland_registry
+        self.name_index = name_index
+        self.text_index = text_index
+        self.fanout = fanout
+        self.closure = closure
 
     def register(self, mcp: FastMCP) -> None:
         """Register all search tools with the given FastMCP server instance."""
         sparql = self.sparql
         graphs = self.graphs
         bl_registry = self.bl_registry
+        name_index = self.name_index
+        text_index = self.text_index
+        fanout = self.fanout
+        closure = self.closure
 
         @mcp.tool(
             name="search",
@@ -38,7 +196,8 @@ class SearchTools:
                 "Full-text search across all Lehrplan nodes by keyword. "
                 "Uses prefix matching (e.g. 'Fisch' also finds 'Fische'). "
                 "Returns matching nodes with their parent Lehrplan for context. "
-                "Optionally filter by Bundesland and/or Schulfach."
+                "Optionally filter by Bundesland and/or Schulfach. "
+                "Results are paged; pass the returned cursor to get the next page."
             ),
         )
         async def search(
@@ -64,6 +223,14 @@ class SearchTools:
                     )
                 ),
             ] = None,
+            page_size: Annotated[
+                int,
+                Field(description="Results per page (default 50)", ge=1, le=MAX_PAGE_SIZE),
+            ] = DEFAULT_PAGE_SIZE,
+            cursor: Annotated[
+                str | None,
+                Field(description="Optional: cursor from the previous page to continue"),
+            ] = None,
         ) -> str:
             search_graphs = graphs.all_graphs
             bl_uri: str | None = None
@@ -73,10 +240,21 @@ class SearchTools:
                 search_graphs = graphs.graphs_for_bundesland(bl.code)
                 bl_uri = bl.uri
 
-            contains_expr = " AND ".join(
-                f"'{w.replace(chr(39), '')}*'"
-                for w in query.strip().split()
+            local = text_index is not None and text_index.ready and not schulfach
+            scope = cursor_scope(
+                "search",
+                query=query,
+                bundesland=bundesland,
+                schulfach=schulfach,
+                local=local,
+                closure=closure is not None,
             )
+            after = decode_cursor(cursor, scope) if cursor else None
+
+            if local:
+                # Ranked local index; Schulfach filters still need the SPARQL path.
+                page = text_index.page(query, search_graphs, page_size, after)
+                return _render(query, page, scope)
 
             if schulfach:
                 if not bl_uri:
@@ -84,45 +262,41 @@ class SearchTools:
                         "Bundesland is required when filtering by Schulfach."
                     )
                 sf_uri = await _resolve_schulfach_uri(
-                    schulfach, bl_uri, search_graphs, sparql
+                    schulfach, bl_uri, search_graphs, sparql, name_index
+                )
+                if closure is not None:
+                    page = await _closure_page(
+                        sparql, closure, search_graphs, query,
+                        sf_uri, bl_uri, page_size, after,
+                    )
+                    return _render(query, page, scope)
+                sparql_query = _SEARCH_SUBJECT.render(
+                    graphs=search_graphs,
+                    text=query,
+                    schulfach=sf_uri,
+                    keyset=keyset_filter(_SUBJECT_KEYS, after) if after else "",
+                    limit=page_size + 1,
+                )
+                results = await sparql.query(sparql_query, format=sparql.tabular_format)
+                return _render(query, take_page(results, page_size, _SUBJECT_VARS), scope)
+
+            def build_query(query_graphs: list[str]) -> str:
+                return _SEARCH.render(
+                    graphs=query_graphs,
+                    text=query,
+                    keyset=keyset_filter(_SEARCH_KEYS, after) if after else "",
+                    limit=page_size + 1,
+                )
+
+            if fanout is not None and bl_uri is None:
+                results = await fanout.query(
+                    build_query,
+                    order_by=_SEARCH_VARS,
+                    limit=page_size + 1,
+                    optional=["parent", "parentLabel"],
                 )
-                sparql_query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?s ?label ?lp ?lpLabel
-{GraphRegistry.from_clauses(search_graphs)}
-WHERE {{
-  ?s rdfs:label ?label .
-  ?label bif:contains "{contains_expr}" .
-  ?lp lp:LP_0000008+ ?s .
-  ?lp lp:LP_0000537 <{sf_uri}> .
-  ?lp rdfs:label ?lpLabel .
-}}
-ORDER BY ?s
-LIMIT {_RESULTS_LIMIT}"""
             else:
-                sparql_query = f"""
-PREFIX lp: <https://w3id.org/lehrplan/ontology/>
-SELECT DISTINCT ?s ?label ?parent ?parentLabel
-{GraphRegistry.from_clauses(search_graphs)}
-WHERE {{
-  ?s rdfs:label ?label .
-  ?label bif:contains "{contains_expr}" .
-  OPTIONAL {{
-    ?parent lp:LP_0000008 ?s .
-    ?parent rdfs:label ?parentLabel .
-  }}
-}}
-ORDER BY ?s
-LIMIT {_RESULTS_LIMIT}"""
-
-            results = await sparql.query(sparql_query)
-            if not results.bindings:
-                return f'No results found for "{query}".'
-
-            text = SparqlClient.format_results(results)
-            if len(results.bindings) == _RESULTS_LIMIT:
-                text += (
-                    "\n\n(Results limited to 50. "
-                    "Try a more specific query or add filters.)"
+                results = await sparql.query(
+                    build_query(search_graphs), format=sparql.tabular_format
                 )
-            return text
+            return _render(query, take_page(results, page_size, _SEARCH_VARS), scope)
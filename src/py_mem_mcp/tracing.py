@@ -0,0 +1,249 @@
+"""Lightweight tracing spans from MCP tool call down to the SPARQL request.
+
+Spans follow the OpenTelemetry data model: W3C trace and span ids, parent
+links, start and end times in Unix nanoseconds, attributes and a status.
+Finished spans are handed to exporters; :class:`InMemoryExporter` keeps them
+for inspection and tests, :class:`JsonlExporter` appends them to a file as
+OTLP-style JSON lines, so traces can be collected offline. It buffers spans
+in memory and :meth:`Tracer.run_flush` writes them out in a worker thread,
+so the event loop does not wait for the disk. Outgoing SPARQL requests carry
+a ``traceparent`` header.
+
+Instrumented code calls :func:`span`, which is a no-op until a
+:class:`Tracer` is installed with :func:`install`, like the global tracer
+provider in OpenTelemetry.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+AttributeValue = str | int | float | bool
+
+
+@dataclass
+class Span:
+    """One timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_ns: int = 0
+    end_ns: int = 0
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    status: str = "UNSET"
+    status_message: str = ""
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value pointing at this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the span as an OTLP-style JSON object."""
+        data: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+        }
+        if self.parent_id is not None:
+            data["parentSpanId"] = self.parent_id
+        if self.status_message:
+            data["status"]["message"] = self.status_message
+        return data
+
+
+class _NoopSpan:
+    """Stands in for :class:`Span` while tracing is off."""
+
+    traceparent = None
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        pass
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class InMemoryExporter:
+    """Keep finished spans in a list."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonlExporter:
+    """Append finished spans to *path*, one JSON object per line.
+
+    Spans are buffered and written in batches through one open file handle,
+    by :meth:`flush_async` in a worker thread, or inline once ``max_pending``
+    spans are waiting. :meth:`close` writes what is left.
+    """
+
+    def __init__(self, path: str | Path, max_pending: int = 1000) -> None:
+        self.path = Path(path)
+        self.max_pending = max_pending
+        self._pending: list[str] = []
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        self._pending.append(json.dumps(span.to_dict(), ensure_ascii=False) + "\n")
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def _take(self) -> list[str]:
+        lines, self._pending = self._pending, []
+        return lines
+
+    def _write(self, lines: list[str]) -> None:
+        with self._lock:
+            if self._file is None:
+                self._file = self.path.open("a", encoding="utf-8")
+            self._file.writelines(lines)
+            self._file.flush()
+
+    def flush(self) -> None:
+        """Write the buffered spans now."""
+        lines = self._take()
+        if lines:
+            self._write(lines)
+
+    async def flush_async(self) -> None:
+        """Write the buffered spans in a worker thread."""
+        lines = self._take()
+        if lines:
+            await asyncio.to_thread(self._write, lines)
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span) -> None:
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.span.start_ns = time.time_ns()
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self.span
+        span.end_ns = time.time_ns()
+        _current_span.reset(self.token)
+        if exc is not None:
+            span.status = "ERROR"
+            span.status_message = f"{exc_type.__name__}: {exc}"[:500]
+        for exporter in self.tracer.exporters:
+            exporter.export(span)
+
+
+class _NoopContext:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP_CONTEXT = _NoopContext()
+
+
+class Tracer:
+    """Create spans and pass them to *exporters* when they end."""
+
+    def __init__(self, exporters: list[SpanExporter]) -> None:
+        self.exporters = exporters
+
+    @classmethod
+    def from_env(cls) -> "Tracer | None":
+        """Read ``TRACE_FILE``; returns None when it is unset."""
+        path = os.environ.get("TRACE_FILE")
+        if not path:
+            return None
+        return cls([JsonlExporter(path)])
+
+    async def run_flush(self, interval: float = 1.0) -> None:
+        """Flush buffering exporters every *interval* seconds; close them when cancelled."""
+        buffered = [e for e in self.exporters if isinstance(e, JsonlExporter)]
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                for exporter in buffered:
+                    await exporter.flush_async()
+        finally:
+            for exporter in buffered:
+                exporter.close()
+
+    def span(self, name: str, **attributes: AttributeValue) -> _SpanContext:
+        parent = _current_span.get()
+        return _SpanContext(
+            self,
+            Span(
+                name=name,
+                trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+                span_id=os.urandom(8).hex(),
+                parent_id=parent.span_id if parent is not None else None,
+                attributes=attributes,
+            ),
+        )
+
+
+_tracer: Tracer | None = None
+
+
+def install(tracer: Tracer | None) -> None:
+    """Make *tracer* the one used by :func:`span`; None turns tracing off."""
+    global _tracer
+    _tracer = tracer
+
+
+def span(name: str, **attributes: AttributeValue) -> _SpanContext | _NoopContext:
+    """Return a context manager timing *name* as a child of the current span.
+
+    The context manager yields the span, so attributes known only at the end
+    (row counts, sizes) can be added with ``set_attribute``.
+    """
+    if _tracer is None:
+        return _NOOP_CONTEXT
+    return _tracer.span(name, **attributes)
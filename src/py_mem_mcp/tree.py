@@ -0,0 +1,175 @@
+"""Breadth-first traversal of the Lehrplan "hat Teil" hierarchy.
+
+Each level of the tree is fetched with one ``VALUES ?parent { ... }`` query
+over the current frontier, instead of one UNION branch per depth that
+re-walks the path from the root. Visited nodes are expanded only once, so
+the cost grows linearly with the number of nodes rather than quadratically
+with the depth, and traversal stops early once a node budget is used up.
+:func:`fetch_children_grouped` serves batched child lookups with per-node
+caching.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass
+
+from .cache import CacheKey
+from .results import SparqlBinding, SparqlResults
+from .sparql import SparqlClient
+from .templates import QueryTemplate
+
+#: Result variables of child lookups and tree traversals.
+TREE_VARS = ["parent", "parentLabel", "child", "childLabel"]
+
+#: Maximum number of parents bound in one ``VALUES`` block.
+BATCH_SIZE = 200
+
+ChildrenFetcher = Callable[[Sequence[str]], Awaitable[SparqlResults]]
+
+
+_CHILDREN = QueryTemplate("""
+PREFIX lp: <https://w3id.org/lehrplan/ontology/>
+SELECT DISTINCT ?parent ?parentLabel ?child ?childLabel
+{{graphs:from}}
+WHERE {
+  VALUES ?parent { {{parents:iris}} }
+  ?parent lp:LP_0000008 ?child .
+  OPTIONAL { ?parent rdfs:label ?parentLabel . }
+  OPTIONAL { ?child rdfs:label ?childLabel . }
+}""")
+
+
+def children_query(parents: Sequence[str], graphs: list[str]) -> str:
+    """Build the query for the direct children of all *parents*."""
+    return _CHILDREN.render(graphs=graphs, parents=parents)
+
+
+async def fetch_children(
+    sparql: SparqlClient,
+    graphs: list[str],
+    parents: Sequence[str],
+    batch_size: int = BATCH_SIZE,
+    cached: bool = True,
+) -> SparqlResults:
+    """Fetch the children of all *parents*, batching large sets concurrently."""
+    batches = [parents[i:i + batch_size] for i in range(0, len(parents), batch_size)]
+    parts = await asyncio.gather(
+        *(
+            sparql.query(
+                children_query(batch, graphs), format=sparql.tabular_format, cached=cached
+            )
+            for batch in batches
+        )
+    )
+    if len(parts) == 1:
+        return parts[0]
+    merged = SparqlResults(vars=TREE_VARS)
+    for part in parts:
+        for row in part.bindings:
+            merged.append(row)
+    return merged
+
+
+def _children_cache_key(parent: str, graphs: list[str]) -> CacheKey:
+    # Shaped like cache_key() so that ResultCache.invalidate_graphs applies.
+    return f"children <{parent}>", frozenset(graphs), "children"
+
+
+async def fetch_children_grouped(
+    sparql: SparqlClient,
+    graphs: list[str],
+    parents: Sequence[str],
+) -> dict[str, SparqlResults]:
+    """Return ``?child ?childLabel`` rows for each of *parents*.
+
+    Children are cached per parent when the client has a result cache, so a
+    batch that overlaps earlier ones only queries the parents not seen yet,
+    all of them in one ``VALUES`` query.
+    """
+    cache = sparql.cache
+    grouped: dict[str, SparqlResults] = {}
+    missing: list[str] = []
+    for parent in dict.fromkeys(parents):
+        hit = cache.lookup(_children_cache_key(parent, graphs)) if cache is not None else None
+        if hit is not None:
+            grouped[parent] = hit
+        else:
+            missing.append(parent)
+    if not missing:
+        return grouped
+
+    rows: dict[str, list[Mapping[str, SparqlBinding]]] = {parent: [] for parent in missing}
+    for row in (await fetch_children(sparql, graphs, missing, cached=False)).bindings:
+        rows[row["parent"].value].append(row)
+    for parent in missing:
+        children = SparqlResults(vars=["child", "childLabel"])
+        # Project to DISTINCT ?child ?childLabel, as get_children selects them.
+        projected = {
+            (row["child"], row.get("childLabel")): None
+            for row in sorted(rows[parent], key=_sort_key)
+        }
+        for child, label in projected:
+            children.append({"child": child, **({"childLabel": label} if label else {})})
+        if cache is not None:
+            cache.put(_children_cache_key(parent, graphs), children)
+        grouped[parent] = children
+    return {parent: grouped[parent] for parent in dict.fromkeys(parents)}
+
+
+@dataclass
+class TreeResult:
+    """Rows of a tree traversal and whether the node budget cut it short."""
+
+    results: SparqlResults
+    truncated: bool = False
+
+
+def _sort_key(row: Mapping[str, SparqlBinding]) -> tuple[str, ...]:
+    return tuple(row[v].value if v in row else "" for v in TREE_VARS)
+
+
+async def fetch_tree(
+    fetch: ChildrenFetcher,
+    root: str,
+    depth: int,
+    node_budget: int | None = None,
+) -> TreeResult:
+    """Walk the hierarchy below *root* breadth-first, one query per level.
+
+    Args:
+        fetch: Returns ``TREE_VARS`` rows for the children of a set of parents.
+        root: URI of the node to start from.
+        depth: Number of levels to descend.
+        node_budget: Optional cap on the number of nodes collected.
+
+    Returns:
+        The ``(parent, child)`` rows ordered by parent and child, as the
+        single-query traversal returned them.
+    """
+    visited = {root}
+    frontier = [root]
+    rows: list[Mapping[str, SparqlBinding]] = []
+    truncated = False
+
+    for _ in range(depth):
+        if not frontier:
+            break
+        level = await fetch(frontier)
+        next_frontier: list[str] = []
+        for row in level.bindings:
+            child = row["child"].value
+            if child not in visited:
+                if node_budget is not None and len(visited) >= node_budget:
+                    truncated = True
+                    continue
+                visited.add(child)
+                next_frontier.append(child)
+            rows.append(row)
+        if truncated:
+            break
+        frontier = next_frontier
+
+    results = SparqlResults(vars=TREE_VARS)
+    for row in sorted(rows, key=_sort_key):
+        results.append(row)
+    return TreeResult(results=results, truncated=truncated)
@@ -0,0 +1,157 @@
+"""Unit tests for py_mem_mcp.backends."""
+
+import asyncio
+import importlib.util
+import threading
+
+import pytest
+
+from py_mem_mcp.backends import OxigraphBackend, adapt_query, dump_names, find_dumps
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.results import SparqlBinding, SparqlResults
+from py_mem_mcp.sparql import SparqlClient
+from py_mem_mcp.templates import contains_expression
+
+_HAS_OXIGRAPH = importlib.util.find_spec("pyoxigraph") is not None
+
+
+@pytest.fixture
+def graphs(monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "https://ontology.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULART", "https://schulart.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "https://schulfach.example.com/")
+    monkeypatch.setenv("GRAPH_STATE_SN", "https://sn.example.com/")
+    return GraphRegistry()
+
+
+def test_adapt_query_declares_missing_prefixes():
+    query = adapt_query(
+        "PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>\nSELECT ?s WHERE { ?s rdf:type ?t }"
+    )
+    assert query.count("PREFIX rdfs:") == 1
+    assert "PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>" in query
+    assert query.endswith("SELECT ?s WHERE { ?s rdf:type ?t }")
+
+
+def test_adapt_query_rewrites_bif_contains():
+    query = adapt_query(
+        f"SELECT ?s WHERE {{ ?s rdfs:label ?label .\n"
+        f"  ?label bif:contains {contains_expression('Zelle Atmung')} .\n}}"
+    )
+    assert "bif:contains" not in query
+    assert (
+        'FILTER(REGEX(STR(?label), "\\\\bZelle", "i") && '
+        'REGEX(STR(?label), "\\\\bAtmung", "i"))'
+    ) in query
+
+
+def test_find_dumps(tmp_path, graphs):
+    assert dump_names(graphs)["state_sn"] == "https://sn.example.com/"
+    for name in ("ontology.ttl", "schulart.nt", "schulfach.nt.gz"):
+        (tmp_path / name).write_text("")
+    with pytest.raises(FileNotFoundError, match="state_sn"):
+        find_dumps(tmp_path, graphs)
+    (tmp_path / "state_sn.nt").write_text("")
+    found = dict(find_dumps(tmp_path, graphs))
+    assert found["https://schulfach.example.com/"].name == "schulfach.nt.gz"
+    assert found["https://sn.example.com/"].name == "state_sn.nt"
+
+
+class _FakeBackend:
+    def __init__(self, results: SparqlResults) -> None:
+        self.results = results
+        self.queries: list[str] = []
+        self.max_rows: list[int | None] = []
+
+    async def select(self, sparql: str, max_rows: int | None = None) -> SparqlResults:
+        self.queries.append(sparql)
+        self.max_rows.append(max_rows)
+        if max_rows is not None:
+            return self.results.head(max_rows + 1)
+        return self.results
+
+
+def _results(n: int) -> SparqlResults:
+    return SparqlResults(
+        vars=["x"], bindings=[{"x": SparqlBinding("literal", str(i))} for i in range(n)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_uses_backend_for_query_and_stream():
+    backend = _FakeBackend(_results(5))
+    client = SparqlClient("embedded:test", backend=backend)
+    results = await client.query("SELECT ?x WHERE { ?x ?p ?o }")
+    assert results.values("x") == ["0", "1", "2", "3", "4"]
+
+    async with client.stream("SELECT ?x WHERE { ?x ?p ?o }", max_rows=3) as rows:
+        assert rows.vars == ["x"]
+        first = await anext(rows)
+        rest = await rows.collect()
+    assert first["x"].value == "0"
+    assert rest.values("x") == ["1", "2"]
+    assert rows.truncated
+    assert backend.max_rows == [None, 3]
+    with pytest.raises(RuntimeError, match="not available"):
+        await client.explain("SELECT ?x WHERE { ?x ?p ?o }")
+
+
+@pytest.mark.asyncio
+async def test_oxigraph_select_times_out():
+    # Bypass __init__, which needs pyoxigraph; only the thread handling is tested.
+    backend = OxigraphBackend.__new__(OxigraphBackend)
+    backend.timeout = 0.05
+    stopped = threading.Event()
+
+    def slow_select(sparql, max_rows, stop):
+        if stop.wait(5):
+            stopped.set()
+        return _results(1)
+
+    backend._select = slow_select
+    with pytest.raises(RuntimeError, match="timed out"):
+        await backend.select("SELECT ?x WHERE { ?x ?p ?o }")
+    assert await asyncio.to_thread(stopped.wait, 5)
+
+
+@pytest.mark.skipif(_HAS_OXIGRAPH, reason="pyoxigraph is installed")
+def test_oxigraph_backend_requires_pyoxigraph(tmp_path):
+    with pytest.raises(EnvironmentError, match="pyoxigraph"):
+        OxigraphBackend(tmp_path / "store")
+
+
+@pytest.mark.skipif(not _HAS_OXIGRAPH, reason="pyoxigraph is not installed")
+@pytest.mark.asyncio
+async def test_oxigraph_backend_answers_tool_queries(tmp_path, graphs):
+    dumps = tmp_path / "dumps"
+    dumps.mkdir()
+    for name in ("ontology", "schulart", "schulfach"):
+        (dumps / f"{name}.nt").write_text("")
+    (dumps / "state_sn.ttl").write_text(
+        "@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .\n"
+        "@prefix lp: <https://w3id.org/lehrplan/ontology/> .\n"
+        '<urn:lp> rdfs:label "Lehrplan Biologie"@de ; lp:LP_0000008 <urn:a> .\n'
+        '<urn:a> rdfs:label "Zellatmung und Photosynthese"@de .\n'
+    )
+    backend = OxigraphBackend(tmp_path / "store")
+    assert backend.load_dumps(dumps, graphs) == graphs.all_graphs
+    client = SparqlClient("embedded:test", backend=backend)
+
+    query = (
+        f"SELECT ?s ?label {GraphRegistry.from_clauses(graphs.all_graphs)} WHERE {{\n"
+        f"  ?s rdfs:label ?label .\n"
+        f"  ?label bif:contains {contains_expression('photo')} .\n}}"
+    )
+    results = await client.query(query)
+    assert results.values("s") == ["urn:a"]
+    assert results.bindings[0]["label"].lang == "de"
+
+    children = await client.query(
+        "SELECT ?c WHERE { <urn:lp> <https://w3id.org/lehrplan/ontology/LP_0000008> ?c }"
+    )
+    assert children.values("c") == ["urn:a"]
+
+    async with client.stream("SELECT ?s ?p ?o WHERE { ?s ?p ?o }", max_rows=1) as rows:
+        capped = await rows.collect()
+    assert len(capped) == 1
+    assert rows.truncated
@@ -0,0 +1,120 @@
+"""Unit tests for py_mem_mcp.balancer."""
+
+import httpx
+import pytest
+
+from py_mem_mcp.balancer import EndpointPool
+from py_mem_mcp.resilience import RetryPolicy
+from py_mem_mcp.sparql import SparqlClient
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestEndpointPool:
+    def test_requires_endpoint(self):
+        with pytest.raises(ValueError):
+            EndpointPool([])
+
+    def test_prefers_lower_latency(self):
+        pool = EndpointPool(["https://a/", "https://b/"])
+        a, b = pool.states
+        pool.record_success(a, 0.5)
+        pool.record_success(b, 0.1)
+        assert pool.choose() is b
+
+    def test_outstanding_requests_penalised(self):
+        pool = EndpointPool(["https://a/", "https://b/"])
+        a, b = pool.states
+        pool.record_success(a, 0.2)
+        pool.record_success(b, 0.1)
+        with pool.lease(b), pool.lease(b):
+            assert pool.choose() is a
+        assert b.outstanding == 0
+
+    def test_ewma_smoothing(self):
+        pool = EndpointPool(["https://a/"], alpha=0.5)
+        state = pool.states[0]
+        pool.record_success(state, 1.0)
+        pool.record_success(state, 0.0)
+        assert state.ewma == 0.5
+
+    def test_failing_endpoint_ejected_then_returns(self):
+        clock = FakeClock()
+        pool = EndpointPool(["https://a/", "https://b/"], eject_after=2, eject_seconds=10, clock=clock)
+        a, b = pool.states
+        pool.record_failure(a)
+        pool.record_failure(a)
+        assert pool.is_ejected(a)
+        assert pool.choose() is b
+        clock.now = 10
+        assert not pool.is_ejected(a)
+
+    def test_transient_failure_expires(self):
+        clock = FakeClock()
+        pool = EndpointPool(["https://a/", "https://b/"], eject_seconds=10, clock=clock)
+        a, b = pool.states
+        pool.record_success(a, 0.1)
+        pool.record_success(b, 0.5)
+        pool.record_failure(a)
+        assert not pool.is_ejected(a)
+        assert pool.choose() is b
+        clock.now = 10
+        assert pool.choose() is a
+        assert a.consecutive_failures == 0
+
+    def test_expired_failures_do_not_add_up(self):
+        clock = FakeClock()
+        pool = EndpointPool(["https://a/", "https://b/"], eject_after=2, eject_seconds=10, clock=clock)
+        a, _ = pool.states
+        pool.record_failure(a)
+        clock.now = 20
+        pool.record_failure(a)
+        assert not pool.is_ejected(a)
+
+    def test_all_ejected_uses_first_due(self):
+        clock = FakeClock()
+        pool = EndpointPool(["https://a/", "https://b/"], eject_after=1, eject_seconds=10, clock=clock)
+        a, b = pool.states
+        pool.record_failure(b)
+        clock.now = 1
+        pool.record_failure(a)
+        assert pool.choose() is b
+
+    @pytest.mark.asyncio
+    async def test_probe_reinstates(self):
+        pool = EndpointPool(["https://a/", "https://b/"], eject_after=1)
+        a, _ = pool.states
+        pool.record_failure(a)
+
+        async def probe(url):
+            return True
+
+        await pool.probe_ejected(probe)
+        assert not pool.is_ejected(a)
+
+
+@pytest.mark.asyncio
+async def test_client_fails_over_to_healthy_replica():
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.host)
+        if request.url.host == "down.example.com":
+            raise httpx.ConnectError("refused")
+        return httpx.Response(200, json={"head": {"vars": []}, "results": {"bindings": []}})
+
+    client = SparqlClient(
+        ["https://down.example.com/sparql", "https://up.example.com/sparql"],
+        transport=httpx.MockTransport(handler),
+        retry=RetryPolicy(attempts=2, backoff=0.0),
+    )
+    assert client.endpoint == "https://down.example.com/sparql"
+    await client.query("SELECT * WHERE { ?s ?p ?o }")
+    await client.aclose()
+    assert seen == ["down.example.com", "up.example.com"]
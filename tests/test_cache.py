@@ -0,0 +1,108 @@
+"""Unit tests for py_mem_mcp.cache."""
+
+import asyncio
+
+import pytest
+
+from py_mem_mcp.cache import ResultCache, cache_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCacheKey:
+    def test_whitespace_normalised(self):
+        a = cache_key("SELECT ?s\n  WHERE { ?s ?p ?o }")
+        b = cache_key("SELECT ?s WHERE {\t?s ?p ?o }")
+        assert a == b
+
+    def test_literal_whitespace_preserved(self):
+        a = cache_key('SELECT ?s WHERE { ?s ?p "a  b" }')
+        b = cache_key('SELECT ?s WHERE { ?s ?p "a b" }')
+        assert a != b
+
+    def test_graph_order_ignored(self):
+        a = cache_key("SELECT ?s\nFROM <https://a/>\nFROM <https://b/>\nWHERE { ?s ?p ?o }")
+        b = cache_key("SELECT ?s\nFROM <https://b/>\nFROM <https://a/>\nWHERE { ?s ?p ?o }")
+        assert a == b
+        assert a[1] == frozenset({"https://a/", "https://b/"})
+
+
+class TestResultCache:
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_invalidate_graphs(self):
+        cache = ResultCache()
+        by = cache_key("SELECT * FROM <urn:by> WHERE { ?s ?p ?o }")
+        sn = cache_key("SELECT * FROM <urn:sn> WHERE { ?s ?p ?o }")
+        default = cache_key("SELECT * WHERE { ?s ?p ?o }")
+        for key in (by, sn, default):
+            cache.put(key, [key])
+        assert cache.invalidate_graphs({"urn:by"}) == 2
+        assert cache.get(by) is None and cache.get(default) is None
+        assert cache.get(sn) == [sn]
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl=10.0, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.0
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.stats.expirations == 1
+
+    @pytest.mark.asyncio
+    async def test_hit_and_miss_counters(self):
+        cache = ResultCache()
+
+        async def loader():
+            return "value"
+
+        assert await cache.get_or_load("k", loader) == "value"
+        assert await cache.get_or_load("k", loader) == "value"
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_coalesced(self):
+        cache = ResultCache()
+        calls = 0
+        release = asyncio.Event()
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return "value"
+
+        tasks = [asyncio.create_task(cache.get_or_load("k", loader)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*tasks) == ["value"] * 5
+        assert calls == 1
+        assert cache.stats.coalesced == 4
+
+    @pytest.mark.asyncio
+    async def test_failures_not_cached(self):
+        cache = ResultCache()
+
+        async def failing():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", failing)
+        assert len(cache) == 0
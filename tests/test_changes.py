@@ -0,0 +1,108 @@
+"""Unit tests for py_mem_mcp.changes."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from py_mem_mcp.changes import GraphWatcher, RefreshError, fingerprint_query
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.sparql import SparqlBinding, SparqlClient, SparqlResults
+
+
+@pytest.fixture
+def graphs(monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "urn:g:ontology")
+    monkeypatch.setenv("GRAPH_SCHULART", "urn:g:schulart")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "urn:g:schulfach")
+    monkeypatch.setenv("GRAPH_STATE_BY", "urn:g:by")
+    return GraphRegistry()
+
+
+def _counts(counts: dict[str, int]) -> SparqlResults:
+    return SparqlResults(
+        vars=["g", "n"],
+        bindings=[
+            {
+                "g": SparqlBinding(type="uri", value=g),
+                "n": SparqlBinding(type="literal", value=str(n)),
+            }
+            for g, n in counts.items()
+        ],
+    )
+
+
+def _watcher(graphs, *probes) -> tuple[GraphWatcher, SparqlClient]:
+    sparql = SparqlClient("https://sparql.example.com/sparql")
+    sparql.query = AsyncMock(side_effect=[_counts(p) for p in probes])
+    return GraphWatcher(sparql, graphs), sparql
+
+
+_BASE = {"urn:g:ontology": 10, "urn:g:schulart": 5, "urn:g:schulfach": 5, "urn:g:by": 100}
+
+
+def test_fingerprint_query_groups_by_graph():
+    query = fingerprint_query(["urn:a", "urn:b"])
+    assert "VALUES ?g { <urn:a> <urn:b> }" in query
+    assert "GROUP BY ?g" in query
+
+
+class TestGraphWatcher:
+    @pytest.mark.asyncio
+    async def test_probe_bypasses_cache_and_defaults_empty_graphs(self, graphs):
+        watcher, sparql = _watcher(graphs, {"urn:g:by": 3})
+        fingerprints = await watcher.probe()
+        assert fingerprints["urn:g:by"] == "3"
+        assert fingerprints["urn:g:ontology"] == "0"
+        assert sparql.query.call_args.kwargs["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_first_check_is_baseline(self, graphs):
+        watcher, _ = _watcher(graphs, _BASE, _BASE, {**_BASE, "urn:g:by": 101})
+        assert await watcher.check() == set()
+        assert await watcher.check() == set()
+        assert await watcher.check() == {"urn:g:by"}
+
+    @pytest.mark.asyncio
+    async def test_notify_runs_listeners_in_order_and_survives_failures(self, graphs):
+        watcher, _ = _watcher(graphs)
+        calls = []
+        watcher.subscribe(lambda changed: calls.append(("sync", changed)))
+        watcher.subscribe(AsyncMock(side_effect=RuntimeError("down")))
+        async_listener = AsyncMock()
+        watcher.subscribe(async_listener)
+
+        await watcher.notify({"urn:g:by"})
+        assert calls == [("sync", {"urn:g:by"})]
+        async_listener.assert_awaited_once_with({"urn:g:by"})
+
+    @pytest.mark.asyncio
+    async def test_unchanged_graphs_trigger_nothing(self, graphs):
+        watcher, _ = _watcher(graphs, _BASE, _BASE)
+        listener = Mock()
+        watcher.subscribe(listener)
+        for _ in range(2):
+            changed = await watcher.check()
+            if changed:
+                await watcher.notify(changed)
+        listener.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_is_delivered_again(self, graphs):
+        moved = {**_BASE, "urn:g:by": 101}
+        watcher, _ = _watcher(graphs, _BASE, moved, moved, moved)
+        listener = AsyncMock(side_effect=[RuntimeError("down"), None])
+        watcher.subscribe(listener)
+        await watcher.check()
+        for _ in range(2):
+            await watcher.notify(await watcher.check())
+        assert [c.args[0] for c in listener.await_args_list] == [{"urn:g:by"}, {"urn:g:by"}]
+        assert await watcher.check() == set()
+
+    @pytest.mark.asyncio
+    async def test_refresh_error_keeps_only_its_graphs_pending(self, graphs):
+        watcher, _ = _watcher(graphs)
+        watcher.subscribe(
+            AsyncMock(side_effect=RefreshError("partial", {"urn:g:by", "urn:g:other"}))
+        )
+        await watcher.notify({"urn:g:by", "urn:g:ontology"})
+        assert watcher.pending == {"urn:g:by"}
@@ -0,0 +1,76 @@
+"""Unit tests for py_mem_mcp.closure."""
+
+import pytest
+
+from py_mem_mcp.closure import ClosureTable, LehrplanInfo
+from py_mem_mcp.snapshot import write_snapshot
+
+# lp1 -> a -> c; lp2 -> b -> c (shared); lp1 -> lp2 (nested Lehrplan)
+_EDGES = [
+    ("urn:lp1", "urn:a"),
+    ("urn:a", "urn:c"),
+    ("urn:lp2", "urn:b"),
+    ("urn:b", "urn:c"),
+    ("urn:lp1", "urn:lp2"),
+]
+_LEHRPLAENE = [
+    LehrplanInfo("urn:lp1", "Biologie BY", "urn:bio", "urn:BY"),
+    LehrplanInfo("urn:lp2", "Chemie BY", "urn:chem", "urn:BY"),
+]
+
+
+@pytest.fixture
+def closure(tmp_path):
+    path = tmp_path / "closure.snap"
+    ClosureTable.write(path, _EDGES, _LEHRPLAENE)
+    return ClosureTable.open(path)
+
+
+class TestClosureTable:
+    def test_meta(self, closure):
+        assert closure.meta["kind"] == "closure"
+        assert closure.meta["lehrplaene"] == 2
+        assert closure.meta["nodes"] == 4
+
+    def test_transitive_ancestors(self, closure):
+        assert closure.lehrplaene("urn:c") == [
+            ("urn:lp1", "Biologie BY"),
+            ("urn:lp2", "Chemie BY"),
+        ]
+        assert closure.lehrplaene("urn:b") == [
+            ("urn:lp1", "Biologie BY"),
+            ("urn:lp2", "Chemie BY"),
+        ]
+
+    def test_lehrplan_is_not_its_own_ancestor(self, closure):
+        assert closure.lehrplaene("urn:lp1") == []
+        assert closure.lehrplaene("urn:lp2") == [("urn:lp1", "Biologie BY")]
+
+    def test_filters(self, closure):
+        assert closure.lehrplaene("urn:c", schulfach="urn:chem") == [("urn:lp2", "Chemie BY")]
+        assert closure.lehrplaene("urn:c", schulfach="urn:bio", bundesland="urn:SN") == []
+        assert closure.lehrplaene("urn:c", schulfach="urn:unknown") == []
+        assert closure.lehrplaene("urn:missing") == []
+
+    def test_lehrplan_without_bundesland_kept(self, tmp_path):
+        path = tmp_path / "closure.snap"
+        ClosureTable.write(
+            path,
+            _EDGES,
+            [LehrplanInfo("urn:lp1", "Biologie", "urn:bio"), _LEHRPLAENE[1]],
+        )
+        closure = ClosureTable.open(path)
+        assert closure.lehrplaene("urn:a", bundesland="urn:BY") == [("urn:lp1", "Biologie")]
+        assert closure.lehrplaene("urn:b", bundesland="urn:SN") == [("urn:lp1", "Biologie")]
+
+    def test_reload_after_rewrite(self, closure):
+        ClosureTable.write(closure.file.path, _EDGES[:2], _LEHRPLAENE[:1])
+        closure.reload()
+        assert closure.meta["lehrplaene"] == 1
+        assert closure.lehrplaene("urn:b") == []
+
+    def test_rejects_other_snapshot_kinds(self, tmp_path):
+        path = tmp_path / "data.snap"
+        write_snapshot(path, {}, {"kind": "hierarchy"})
+        with pytest.raises(ValueError, match="not a closure snapshot"):
+            ClosureTable.open(path)
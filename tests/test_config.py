@@ -4,7 +4,7 @@ import os
 
 import pytest
 
-from py_mem_mcp.config import require_env
+from py_mem_mcp.config import env_bool, env_float, env_int, require_env
 
 
 def test_require_env_returns_value(monkeypatch):
@@ -22,3 +22,26 @@ def test_require_env_raises_when_empty(monkeypatch):
     monkeypatch.setenv("EMPTY_VAR", "")
     with pytest.raises(EnvironmentError, match="EMPTY_VAR"):
         require_env("EMPTY_VAR")
+
+
+def test_env_int_default_when_unset(monkeypatch):
+    monkeypatch.delenv("TEST_INT_VAR", raising=False)
+    assert env_int("TEST_INT_VAR", 7) == 7
+
+
+def test_env_int_invalid_raises(monkeypatch):
+    monkeypatch.setenv("TEST_INT_VAR", "seven")
+    with pytest.raises(EnvironmentError, match="TEST_INT_VAR"):
+        env_int("TEST_INT_VAR", 7)
+
+
+def test_env_float_parses(monkeypatch):
+    monkeypatch.setenv("TEST_FLOAT_VAR", "0.25")
+    assert env_float("TEST_FLOAT_VAR", 1.0) == 0.25
+
+
+def test_env_bool_parses(monkeypatch):
+    monkeypatch.setenv("TEST_BOOL_VAR", "Yes")
+    assert env_bool("TEST_BOOL_VAR", False) is True
+    monkeypatch.setenv("TEST_BOOL_VAR", "off")
+    assert env_bool("TEST_BOOL_VAR", True) is False
@@ -0,0 +1,59 @@
+"""Unit tests for py_mem_mcp.decoding."""
+
+import json
+
+import pytest
+
+from py_mem_mcp.decoding import DECODER_BACKEND, DECODERS, decode_results
+
+_DOCUMENT = {
+    "head": {"vars": ["s", "label", "n"]},
+    "results": {
+        "bindings": [
+            {
+                "s": {"type": "uri", "value": "https://example.com/a"},
+                "label": {"type": "literal", "value": "Fisch", "xml:lang": "de"},
+                "n": {
+                    "type": "typed-literal",
+                    "value": "3",
+                    "datatype": "http://www.w3.org/2001/XMLSchema#integer",
+                },
+            },
+            {"s": {"type": "uri", "value": "https://example.com/a"}},
+        ]
+    },
+}
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+def test_backends_agree(backend):
+    results = DECODERS[backend](json.dumps(_DOCUMENT).encode())
+    assert results.vars == ["s", "label", "n"]
+    assert len(results.bindings) == 2
+    first = results.bindings[0]
+    assert first["label"].lang == "de"
+    assert first["n"].datatype.endswith("#integer")
+    assert "label" not in results.bindings[1]
+    # The repeated subject URI is interned once.
+    assert len(results.terms) == 3
+
+
+@pytest.mark.parametrize("backend", sorted(DECODERS))
+@pytest.mark.parametrize(
+    "body",
+    [json.dumps(_DOCUMENT).encode()[:-20], b'{"head": {"vars": ["s"]}}', b"<html>"],
+    ids=["truncated", "missing-results", "not-json"],
+)
+def test_malformed_documents_raise_runtime_error(backend, body):
+    with pytest.raises(RuntimeError, match="Malformed SPARQL JSON results"):
+        DECODERS[backend](body)
+
+
+def test_stdlib_fallback_always_available():
+    assert "json" in DECODERS
+    assert DECODER_BACKEND in DECODERS
+
+
+def test_decode_results_uses_selected_backend():
+    results = decode_results(json.dumps(_DOCUMENT).encode())
+    assert results.values("s") == ["https://example.com/a"] * 2
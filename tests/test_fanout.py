@@ -0,0 +1,101 @@
+"""Unit tests for py_mem_mcp.fanout."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+from py_mem_mcp.fanout import FanOut, merge_results
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.sparql import SparqlBinding, SparqlClient, SparqlResults
+
+
+@pytest.fixture
+def graphs(monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "urn:g:ontology")
+    monkeypatch.setenv("GRAPH_SCHULART", "urn:g:schulart")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "urn:g:schulfach")
+    for key in list(os.environ):
+        if key.startswith("GRAPH_STATE_"):
+            monkeypatch.delenv(key, raising=False)
+    for code in ("BY", "SN", "RP"):
+        monkeypatch.setenv(f"GRAPH_STATE_{code}", f"urn:g:{code.lower()}")
+    return GraphRegistry()
+
+
+def _results(values: list[str]) -> SparqlResults:
+    return SparqlResults(
+        vars=["s"], bindings=[{"s": SparqlBinding(type="uri", value=v)} for v in values]
+    )
+
+
+class TestMergeResults:
+    def test_k_way_merge_dedupes_and_limits(self):
+        merged = merge_results(
+            [_results(["a", "c", "e"]), _results(["b", "c", "f"]), _results([])],
+            order_by=["s"],
+            limit=4,
+        )
+        assert merged.values("s") == ["a", "b", "c", "e"]
+
+    def test_cross_partition_optional_matches_single_query(self):
+        def rows(*values: tuple[str, str | None]) -> SparqlResults:
+            results = SparqlResults(vars=["s", "parent"])
+            for s, parent in values:
+                row = {"s": SparqlBinding(type="uri", value=s)}
+                if parent is not None:
+                    row["parent"] = SparqlBinding(type="uri", value=parent)
+                results.append(row)
+            return results
+
+        # Node a has its parent in the second partition only, c in neither.
+        single = rows(("a", "p2"), ("b", "p1"), ("c", None))
+        merged = merge_results(
+            [rows(("a", None), ("b", "p1"), ("c", None)), rows(("a", "p2"), ("c", None))],
+            order_by=["s", "parent"],
+            limit=3,
+            optional=["parent"],
+        )
+        assert merged.bindings == single.bindings
+
+    def test_empty_parts(self):
+        assert not merge_results([_results([])], order_by=["s"]).bindings
+
+
+class TestFanOut:
+    def test_from_env_disabled_by_default(self, graphs, monkeypatch):
+        monkeypatch.delenv("SPARQL_FANOUT_CONCURRENCY", raising=False)
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        assert FanOut.from_env(sparql, graphs) is None
+        monkeypatch.setenv("SPARQL_FANOUT_CONCURRENCY", "2")
+        assert FanOut.from_env(sparql, graphs).concurrency == 2
+
+    def test_partitions_per_state(self, graphs):
+        fanout = FanOut(SparqlClient("https://sparql.example.com/sparql"), graphs)
+        partitions = fanout.partitions()
+        assert len(partitions) == 3
+        assert all(p[:3] == graphs.infra_graphs for p in partitions)
+        assert sorted(p[3] for p in partitions) == ["urn:g:by", "urn:g:rp", "urn:g:sn"]
+
+    @pytest.mark.asyncio
+    async def test_query_runs_bounded_and_merges(self, graphs):
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        active = peak = 0
+
+        async def fake_query(query, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            state = query.split()[-1]
+            return _results(["shared", f"{state}-only"])
+
+        sparql.query = AsyncMock(side_effect=fake_query)
+        fanout = FanOut(sparql, graphs, concurrency=2)
+        results = await fanout.query(lambda g: " ".join(g), order_by=["s"], limit=3)
+
+        assert sparql.query.await_count == 3
+        assert peak == 2
+        assert results.values("s") == ["shared", "urn:g:by-only", "urn:g:rp-only"]
@@ -0,0 +1,82 @@
+"""Unit tests for py_mem_mcp.formats."""
+
+from pathlib import Path
+
+import pytest
+
+from py_mem_mcp.formats import ResultFormat, parse_csv, parse_results, parse_tsv
+
+_XSD = "http://www.w3.org/2001/XMLSchema#"
+_FIXTURES = Path(__file__).with_name("fixtures")
+
+
+class TestParseTsv:
+    def test_terms(self):
+        body = (
+            "?s\t?label\t?n\n"
+            '<https://example.com/a>\t"Fische"@de\t42\n'
+            '<https://example.com/b>\t"say \\"hi\\"\\tnow"\t"1.5"^^<' + _XSD + 'decimal>\n'
+        ).encode()
+        results = parse_tsv(body)
+        assert results.vars == ["s", "label", "n"]
+        first, second = results.bindings
+        assert first["s"].type == "uri"
+        assert first["s"].value == "https://example.com/a"
+        assert first["label"].value == "Fische"
+        assert first["label"].lang == "de"
+        assert first["n"].datatype == _XSD + "integer"
+        assert second["label"].value == 'say "hi"\tnow'
+        assert second["n"].datatype == _XSD + "decimal"
+
+    def test_unbound_cells_and_crlf(self):
+        body = b"?a\t?b\r\n<https://example.com/a>\t\r\n"
+        results = parse_tsv(body)
+        assert len(results.bindings) == 1
+        assert "b" not in results.bindings[0]
+
+    def test_repeated_cells_interned(self):
+        rows = "".join(f"<https://example.com/p>\t<https://example.com/{i}>\n" for i in range(10))
+        results = parse_tsv(("?parent\t?child\n" + rows).encode())
+        assert len(results.terms) == 11
+
+    def test_empty_result(self):
+        results = parse_tsv(b"?s\t?label\n")
+        assert results.vars == ["s", "label"]
+        assert results.bindings == []
+
+    def test_virtuoso_dialect(self):
+        # Virtuoso quotes header names and writes IRIs as quoted strings.
+        results = parse_tsv((_FIXTURES / "virtuoso_children.tsv").read_bytes())
+        assert results.vars == ["parent", "parentLabel", "child", "childLabel"]
+        first, second, third = results.bindings
+        assert first["parent"].type == "uri"
+        assert first["parent"].value == "http://sn-2026-01-29/lehrplan/12"
+        assert first["child"].value == "http://sn-2026-01-29/lehrplan/12/1"
+        assert first["childLabel"].type == "literal"
+        assert first["childLabel"].value == "Lernbereich 1: Bau und Funktion der Zelle"
+        assert second["childLabel"].value == 'Lernbereich 2: Wirbeltiere "im" Lebensraum'
+        assert "childLabel" not in third
+
+    def test_wrong_field_count_raises(self):
+        with pytest.raises(RuntimeError, match="Malformed"):
+            parse_tsv(b"?a\t?b\n<https://example.com/a>\n")
+
+
+class TestParseCsv:
+    def test_values_are_plain_literals(self):
+        body = b'uri,label\r\nhttps://example.com/a,"Fische, S\xc3\xbc\xc3\x9fwasser"\r\nhttps://example.com/b,\r\n'
+        results = parse_csv(body)
+        assert results.vars == ["uri", "label"]
+        assert results.values("label") == ["Fische, Süßwasser", ""]
+        assert results.bindings[0]["uri"].type == "literal"
+
+
+def test_media_types():
+    assert ResultFormat.JSON.media_type == "application/sparql-results+json"
+    assert ResultFormat.TSV.media_type == "text/tab-separated-values"
+    assert ResultFormat.CSV.media_type == "text/csv"
+
+
+def test_parse_results_dispatch():
+    results = parse_results(b"?x\n\"1\"\n", ResultFormat.TSV)
+    assert results.values("x") == ["1"]
@@ -0,0 +1,103 @@
+"""Unit tests for py_mem_mcp.metrics."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from py_mem_mcp.metrics import NO_TOOL, Counter, Gauge, Histogram, Metrics
+from py_mem_mcp.scheduler import Priority, RequestScheduler
+from py_mem_mcp.sparql import SparqlClient
+
+
+def test_counter_and_gauge_render():
+    counter = Counter("calls_total", "Calls.", ["tool"])
+    counter.inc("search")
+    counter.inc("search", amount=2)
+    gauge = Gauge("in_flight", "In flight.")
+    with gauge.track():
+        assert gauge.value() == 1
+    assert list(counter.render()) == [
+        "# HELP calls_total Calls.",
+        "# TYPE calls_total counter",
+        'calls_total{tool="search"} 3',
+    ]
+    assert list(gauge.render())[-1] == "in_flight 0"
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency", "Latency.", ["tool"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "a")
+    lines = list(histogram.render())[2:]
+    assert lines == [
+        'latency_bucket{tool="a",le="0.1"} 2',
+        'latency_bucket{tool="a",le="1"} 3',
+        'latency_bucket{tool="a",le="+Inf"} 4',
+        'latency_sum{tool="a"} 3.65',
+        'latency_count{tool="a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    counter = Counter("c", "C.", ["tool"])
+    counter.inc('a"b\\')
+    assert list(counter.render())[-1] == 'c{tool="a\\"b\\\\"} 1'
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("METRICS_PATH", "/internal/metrics")
+    assert Metrics.from_env().path == "/internal/metrics"
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    assert Metrics.from_env() is None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_gauges():
+    metrics = Metrics()
+    scheduler = RequestScheduler(max_concurrency=1)
+    metrics.watch_scheduler(scheduler)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.slot():
+            await release.wait()
+
+    async def wait_for_slot() -> None:
+        async with scheduler.slot(Priority.HEAVY):
+            pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait_for_slot())
+    await asyncio.sleep(0.01)
+    assert 'sparql_scheduler_queue_depth{priority="heavy"} 1' in metrics.render()
+
+    release.set()
+    await asyncio.gather(holder, waiter)
+    text = metrics.render()
+    assert 'sparql_scheduler_queue_depth{priority="heavy"} 0' in text
+    mean_wait = float(text.split("\nsparql_scheduler_wait_seconds_mean ")[1].split()[0])
+    assert mean_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_client_records_round_trips():
+    payload = b'{"head": {"vars": ["x"]}, "results": {"bindings": [{"x": {"type": "literal", "value": "v"}}]}}'
+    responses = iter([httpx.Response(200, content=payload), httpx.Response(400, text="bad")])
+    metrics = Metrics()
+    client = SparqlClient(
+        "https://sparql.example.com/sparql",
+        transport=httpx.MockTransport(lambda request: next(responses)),
+        metrics=metrics,
+    )
+    async with client:
+        await client.query("SELECT ?x WHERE { ?x ?p ?o }")
+        with pytest.raises(RuntimeError):
+            await client.query("SELECT ?x WHERE { ?x ?p ?o }")
+
+    assert metrics.sparql_latency.count(NO_TOOL) == 2
+    assert metrics.sparql_errors.value(NO_TOOL) == 1
+    assert metrics.sparql_rows.count(NO_TOOL) == 1
+    assert metrics.sparql_in_flight.value() == 0
+    assert f'sparql_response_bytes_sum{{tool="{NO_TOOL}"}} {len(payload) + 3}' in metrics.render()
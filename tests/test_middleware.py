@@ -0,0 +1,65 @@
+"""Unit tests for py_mem_mcp.middleware."""
+
+import pytest
+from fastmcp import FastMCP
+
+from py_mem_mcp.metrics import UNKNOWN_TOOL, Metrics
+from py_mem_mcp.middleware import MetricsMiddleware, ToolContextMiddleware, current_tool
+
+
+@pytest.mark.asyncio
+async def test_current_tool_set_during_call():
+    mcp = FastMCP("test", middleware=[ToolContextMiddleware()])
+
+    @mcp.tool(name="whoami")
+    async def whoami() -> str:
+        return current_tool.get() or "none"
+
+    result, _ = await mcp._call_tool_mcp("whoami", {})
+    assert result[0].text == "whoami"
+    assert current_tool.get() is None
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_counts_calls_and_errors():
+    metrics = Metrics()
+    mcp = FastMCP("test", middleware=[MetricsMiddleware(metrics)])
+
+    @mcp.tool(name="ok")
+    async def ok() -> str:
+        return "fine"
+
+    @mcp.tool(name="fails")
+    async def fails() -> str:
+        raise ValueError("nope")
+
+    await mcp._call_tool_mcp("ok", {})
+    with pytest.raises(Exception):
+        await mcp._call_tool_mcp("fails", {})
+
+    assert metrics.tool_calls.value("ok") == 1
+    assert metrics.tool_errors.value("ok") == 0
+    assert metrics.tool_errors.value("fails") == 1
+    assert metrics.tool_latency.count("fails") == 1
+    assert metrics.tool_in_flight.value("ok") == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_labels_unregistered_tools_unknown():
+    metrics = Metrics()
+    mcp = FastMCP("test", middleware=[MetricsMiddleware(metrics)])
+
+    @mcp.tool(name="ok")
+    async def ok() -> str:
+        return "fine"
+
+    for name in ("ok", "no_such_tool", "another_made_up_name"):
+        try:
+            await mcp._call_tool_mcp(name, {})
+        except Exception:
+            pass
+
+    assert metrics.tool_calls.value("ok") == 1
+    assert metrics.tool_calls.value(UNKNOWN_TOOL) == 2
+    assert metrics.tool_errors.value(UNKNOWN_TOOL) == 2
+    assert "no_such_tool" not in metrics.render()
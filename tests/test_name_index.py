@@ -0,0 +1,98 @@
+"""Unit tests for py_mem_mcp.name_index."""
+
+import os
+from unittest.mock import AsyncMock
+
+import pytest
+
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.name_index import SCHULART, SCHULFACH, NameIndex, normalize_label
+from py_mem_mcp.sparql import SparqlBinding, SparqlClient, SparqlResults
+from py_mem_mcp.tools.lehrplan import _resolve_schulfach_uri
+
+_BY = "https://w3id.org/lehrplan/ontology/LP_3000051"
+
+
+@pytest.fixture
+def graphs(monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "https://ontology.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULART", "https://schulart.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "https://schulfach.example.com/")
+    for key in list(os.environ):
+        if key.startswith("GRAPH_STATE_"):
+            monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("GRAPH_STATE_BY", "https://by.example.com/")
+    return GraphRegistry()
+
+
+def _results(rows: list[tuple[str, str]]) -> SparqlResults:
+    return SparqlResults(
+        vars=["uri", "l"],
+        bindings=[
+            {"uri": SparqlBinding(type="uri", value=u), "l": SparqlBinding(type="literal", value=l)}
+            for u, l in rows
+        ],
+    )
+
+
+def _fake_query(sparql_text: str, **kwargs) -> SparqlResults:
+    if SCHULFACH in sparql_text:
+        return _results([("https://example.com/bio", "Biologie")])
+    if SCHULART in sparql_text:
+        return _results([("https://example.com/gym", "Gymnasium")])
+    raise AssertionError("unexpected query")
+
+
+def test_normalize_label():
+    assert normalize_label("  Biologie ") == "biologie"
+
+
+class TestNameIndex:
+    @pytest.mark.asyncio
+    async def test_load_and_lookup(self, graphs):
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        sparql.query = AsyncMock(side_effect=_fake_query)
+        index = NameIndex(sparql, graphs)
+        await index.load()
+        assert index.lookup_schulfach(_BY, "biologie") == "https://example.com/bio"
+        assert index.lookup_schulart(_BY, "GYMNASIUM") == "https://example.com/gym"
+        assert index.lookup_schulfach(_BY, "Chemie") is None
+        assert index.lookup_schulfach("https://example.com/other", "Biologie") is None
+
+    @pytest.mark.asyncio
+    async def test_failed_state_load_is_tolerated(self, graphs):
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        sparql.query = AsyncMock(side_effect=RuntimeError("down"))
+        index = NameIndex(sparql, graphs)
+        await index.load()
+        assert index.lookup_schulfach(_BY, "Biologie") is None
+
+    @pytest.mark.asyncio
+    async def test_resolver_uses_index_without_round_trip(self, graphs):
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        sparql.query = AsyncMock(side_effect=_fake_query)
+        index = NameIndex(sparql, graphs)
+        await index.load()
+        sparql.query.reset_mock()
+
+        uri = await _resolve_schulfach_uri("Biologie", _BY, graphs.graphs_for_bundesland("BY"), sparql, index)
+        assert uri == "https://example.com/bio"
+        sparql.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_refresh_reloads_only_affected_states(self, graphs, monkeypatch):
+        sparql = SparqlClient("https://sparql.example.com/sparql")
+        sparql.query = AsyncMock(side_effect=_fake_query)
+        index = NameIndex(sparql, graphs)
+
+        await index.refresh({"https://other.example.com/"})
+        sparql.query.assert_not_called()
+
+        await index.refresh({"https://by.example.com/"})
+        assert sparql.query.await_count == 2
+        assert index.lookup_schulfach(_BY, "Biologie") == "https://example.com/bio"
+
+        load = AsyncMock()
+        monkeypatch.setattr(index, "load", load)
+        await index.refresh({"https://schulfach.example.com/"})
+        load.assert_awaited_once()
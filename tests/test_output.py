@@ -0,0 +1,108 @@
+"""Unit tests for py_mem_mcp.output."""
+
+import json
+
+import pytest
+
+from py_mem_mcp.output import JsonWriter, TableWriter, curie
+from py_mem_mcp.results import SparqlBinding, SparqlResults
+from py_mem_mcp.sparql import SparqlClient
+
+_LP = "https://w3id.org/lehrplan/ontology/"
+
+
+def _rows(n: int) -> list[dict[str, SparqlBinding]]:
+    return [
+        {
+            "s": SparqlBinding("uri", f"{_LP}LP_{i:07d}"),
+            "label": SparqlBinding("literal", f"Knoten {i}", lang="de"),
+        }
+        for i in range(n)
+    ]
+
+
+def test_curie():
+    assert curie(f"{_LP}LP_0000008") == ("lp", "lp:LP_0000008")
+    assert curie("http://www.w3.org/2000/01/rdf-schema#label") == ("rdfs", "rdfs:label")
+    assert curie(f"{_LP}a/b") is None
+    assert curie("urn:x") is None
+
+
+def test_table_writer_matches_format_results():
+    rows = _rows(3)
+    writer = TableWriter(["s", "label"])
+    for row in rows:
+        assert writer.add(row)
+    results = SparqlResults(vars=["s", "label"], bindings=rows)
+    assert writer.finish() == SparqlClient.format_results(results)
+    assert TableWriter(["s"]).finish() == "No results."
+
+
+def test_table_writer_stops_at_budget():
+    writer = TableWriter(["s", "label"], max_bytes=200)
+    added = [writer.add(row) for row in _rows(10)]
+    text = writer.finish()
+    assert len(text.encode()) <= 200
+    assert added.count(True) == writer.rows < 10
+    assert f"truncated after {writer.rows} rows to stay within 200 bytes" in text
+
+
+def test_format_results_budget():
+    results = SparqlResults(vars=["s", "label"], bindings=_rows(50))
+    text = SparqlClient.format_results(results, max_bytes=500)
+    assert "Output truncated after" in text
+    assert len(text.encode()) <= 500
+
+
+def test_json_writer_uses_curies():
+    writer = JsonWriter(["s", "label", "missing"])
+    for row in _rows(2):
+        writer.add(row)
+    data = json.loads(writer.finish())
+    assert data == {
+        "prefixes": {"lp": _LP},
+        "vars": ["s", "label", "missing"],
+        "rows": [["lp:LP_0000000", "Knoten 0", None], ["lp:LP_0000001", "Knoten 1", None]],
+    }
+
+
+def test_json_writer_budget_and_note():
+    writer = JsonWriter(["s", "label"], max_bytes=400)
+    for row in _rows(50):
+        if not writer.add(row):
+            break
+    text = writer.finish()
+    data = json.loads(text)
+    assert data["truncated"] is True
+    assert f"after {writer.rows} rows" in data["note"]
+    assert len(data["rows"]) == writer.rows
+    assert len(text.encode()) <= 400
+
+    capped = JsonWriter(["s"], limit_note="capped")
+    assert "note" not in json.loads(capped.finish())
+    assert json.loads(capped.finish(limited=True))["note"] == "capped"
+
+
+def test_limit_note_fits_budget():
+    note = "Results truncated to 3 rows. " + "Narrow the query. " * 10
+    writer = TableWriter(["s", "label"], max_bytes=400, limit_note=note)
+    for row in _rows(3):
+        writer.add(row)
+    text = writer.finish(limited=not writer.truncated)
+    assert len(text.encode()) <= 400
+
+
+@pytest.mark.asyncio
+async def test_consume_stops_reading():
+    read = 0
+
+    async def stream():
+        nonlocal read
+        for row in _rows(100):
+            read += 1
+            yield row
+
+    writer = TableWriter(["s", "label"], max_bytes=300)
+    await writer.consume(stream())
+    assert writer.truncated
+    assert read == writer.rows + 1
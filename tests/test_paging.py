@@ -0,0 +1,58 @@
+"""Unit tests for py_mem_mcp.paging."""
+
+import pytest
+
+from py_mem_mcp.paging import (
+    cursor_scope,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    page_footer,
+    take_page,
+)
+from py_mem_mcp.sparql import SparqlBinding, SparqlResults
+
+
+def _results(labels: list[str]) -> SparqlResults:
+    return SparqlResults(
+        vars=["label"],
+        bindings=[{"label": SparqlBinding(type="literal", value=v)} for v in labels],
+    )
+
+
+class TestCursor:
+    def test_round_trip(self):
+        scope = cursor_scope("search", query="Fisch")
+        cursor = encode_cursor(scope, ["Äpfel", "urn:x"])
+        assert "=" not in cursor
+        assert decode_cursor(cursor, scope) == ["Äpfel", "urn:x"]
+
+    def test_other_arguments_rejected(self):
+        cursor = encode_cursor(cursor_scope("search", query="Fisch"), ["a"])
+        with pytest.raises(ValueError, match="different query"):
+            decode_cursor(cursor, cursor_scope("search", query="Vogel"))
+
+    def test_garbage_rejected(self):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor("not-a-cursor!", "scope")
+
+
+class TestKeysetFilter:
+    def test_lexicographic_comparison(self):
+        assert keyset_filter(["STR(?label)", "STR(?s)"], ["Bio", "urn:x"]) == (
+            'FILTER((STR(?label) > "Bio") || '
+            '(STR(?label) = "Bio" && STR(?s) > "urn:x"))'
+        )
+
+
+class TestTakePage:
+    def test_extra_row_yields_next_key(self):
+        page = take_page(_results(["a", "b", "c"]), 2, ["label"])
+        assert page.results.values("label") == ["a", "b"]
+        assert page.next_key == ["b"]
+        assert "cursor=" in page_footer(page, "scope")
+
+    def test_last_page_has_no_cursor(self):
+        page = take_page(_results(["a", "b"]), 2, ["label"])
+        assert page.next_key is None
+        assert page_footer(page, "scope") == ""
@@ -0,0 +1,205 @@
+"""Unit tests for py_mem_mcp.resilience."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from py_mem_mcp.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HedgePolicy,
+    RetryPolicy,
+    is_read_only,
+)
+from py_mem_mcp.sparql import SparqlClient
+
+_PAYLOAD = {"head": {"vars": ["x"]}, "results": {"bindings": []}}
+_QUERY = "PREFIX lp: <https://w3id.org/lehrplan/ontology/>\nSELECT ?x WHERE { ?x ?p ?o }"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_is_read_only():
+    assert is_read_only(_QUERY)
+    assert is_read_only("# comment\nask { ?s ?p ?o }")
+    assert not is_read_only("PREFIX ex: <https://example.com/>\nINSERT DATA { ex:a ex:b ex:c }")
+
+
+def test_retry_delay_bounded():
+    policy = RetryPolicy(backoff=0.1, max_backoff=0.3)
+    for attempt in range(6):
+        assert 0.0 <= policy.delay(attempt) <= 0.3
+
+
+def test_retry_policy_from_env(monkeypatch):
+    monkeypatch.setenv("SPARQL_RETRIES", "4")
+    assert RetryPolicy.from_env().attempts == 5
+    assert RetryPolicy.from_env().retry_read_timeouts is False
+    monkeypatch.setenv("SPARQL_RETRY_READ_TIMEOUTS", "true")
+    assert RetryPolicy.from_env().retry_read_timeouts is True
+
+
+def test_hedge_policy_disabled_by_default(monkeypatch):
+    monkeypatch.delenv("SPARQL_HEDGE_PERCENTILE", raising=False)
+    assert HedgePolicy.from_env() is None
+
+
+def test_hedge_after_percentile():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    assert policy.hedge_after() is None
+    for i in range(1, 11):
+        policy.record(i / 10)
+    assert policy.hedge_after() == 1.0
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_and_half_opens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        breaker.check()
+        breaker.record_failure()
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        clock.now = 10
+        breaker.check()  # probe admitted
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError, match="probe"):
+            breaker.check()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record_failure()
+        clock.now = 5
+        breaker.check()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+def _client(handler, **kwargs) -> SparqlClient:
+    return SparqlClient(
+        "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler), **kwargs
+    )
+
+
+class TestClientResilience:
+    @pytest.mark.asyncio
+    async def test_retries_transient_status(self):
+        statuses = [503, 502, 200]
+
+        def handler(request):
+            status = statuses.pop(0)
+            return httpx.Response(status, json=_PAYLOAD) if status == 200 else httpx.Response(status)
+
+        client = _client(handler, retry=RetryPolicy(attempts=3, backoff=0.0))
+        results = await client.query(_QUERY)
+        await client.aclose()
+        assert results.vars == ["x"]
+        assert statuses == []
+
+    @pytest.mark.asyncio
+    async def test_no_retry_on_query_error(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, text="syntax error")
+
+        client = _client(handler, retry=RetryPolicy(attempts=3, backoff=0.0))
+        with pytest.raises(RuntimeError, match="400"):
+            await client.query(_QUERY)
+        await client.aclose()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_no_retry_on_read_timeout(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            raise httpx.ReadTimeout("slow")
+
+        client = _client(handler, retry=RetryPolicy(attempts=3, backoff=0.0))
+        with pytest.raises(RuntimeError, match="ReadTimeout"):
+            await client.query(_QUERY)
+        await client.aclose()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_retried_when_enabled(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ReadTimeout("slow")
+            return httpx.Response(200, json=_PAYLOAD)
+
+        retry = RetryPolicy(attempts=3, backoff=0.0, retry_read_timeouts=True)
+        client = _client(handler, retry=retry)
+        results = await client.query(_QUERY)
+        await client.aclose()
+        assert results.vars == ["x"]
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_open_breaker(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client = _client(handler, retry=RetryPolicy(attempts=2, backoff=0.0), breaker=breaker)
+        with pytest.raises(RuntimeError, match="refused"):
+            await client.query(_QUERY)
+        with pytest.raises(CircuitOpenError):
+            await client.query(_QUERY)
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_over_slow_request(self):
+        calls = 0
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(5)
+            return httpx.Response(200, json=_PAYLOAD)
+
+        hedging = HedgePolicy(percentile=50, min_samples=1)
+        hedging.record(0.01)
+        client = _client(handler, hedging=hedging)
+        results = await asyncio.wait_for(client.query(_QUERY), timeout=2)
+        await client.aclose()
+        assert results.vars == ["x"]
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_hedge_reraises_first_failure(self):
+        calls = 0
+
+        async def handler(request):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.2)
+                return httpx.Response(500, text="late failure")
+            return httpx.Response(503, text="early failure")
+
+        hedging = HedgePolicy(percentile=50, min_samples=1)
+        hedging.record(0.01)
+        client = _client(handler, hedging=hedging)
+        with pytest.raises(RuntimeError, match="early failure"):
+            await asyncio.wait_for(client.query(_QUERY), timeout=2)
+        await client.aclose()
+        assert calls == 2
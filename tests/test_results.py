@@ -0,0 +1,58 @@
+"""Unit tests for py_mem_mcp.results."""
+
+import pytest
+
+from py_mem_mcp.results import SparqlBinding, SparqlResults, TermTable
+
+
+def _uri(value: str) -> SparqlBinding:
+    return SparqlBinding(type="uri", value=value)
+
+
+class TestTermTable:
+    def test_repeated_terms_interned(self):
+        table = TermTable()
+        a = table.intern("uri", "https://example.com/a")
+        b = table.intern_binding(_uri("https://example.com/a"))
+        c = table.intern("literal", "https://example.com/a")
+        assert a == b
+        assert a != c
+        assert len(table) == 2
+
+    def test_binding_is_slotted(self):
+        assert not hasattr(_uri("x"), "__dict__")
+
+
+class TestSparqlResults:
+    def test_parents_stored_once(self):
+        parent = _uri("https://example.com/parent")
+        rows = [{"parent": parent, "child": _uri(f"https://example.com/{i}")} for i in range(100)]
+        results = SparqlResults(vars=["parent", "child"], bindings=rows)
+        assert len(results.bindings) == 100
+        assert len(results.terms) == 101
+
+    def test_row_view_behaves_like_dict(self):
+        results = SparqlResults(
+            vars=["uri", "label"],
+            bindings=[{"uri": _uri("https://example.com")}],
+        )
+        row = results.bindings[0]
+        assert row["uri"].value == "https://example.com"
+        assert "label" not in row
+        assert dict(row) == {"uri": _uri("https://example.com")}
+        with pytest.raises(KeyError):
+            row["label"]
+
+    def test_bindings_compare_to_list(self):
+        row = {"x": SparqlBinding(type="literal", value="1")}
+        results = SparqlResults(vars=["x"], bindings=[row])
+        assert results.bindings == [row]
+        assert SparqlResults(vars=["x"]).bindings == []
+
+    def test_append_json_with_unannounced_var(self):
+        results = SparqlResults(vars=["a"])
+        results.append_json({"a": {"type": "literal", "value": "1"}})
+        results.append_json({"b": {"type": "literal", "value": "2", "xml:lang": "de"}})
+        assert results.values("a") == ["1", ""]
+        assert results.values("b") == ["", "2"]
+        assert results.bindings[1]["b"].lang == "de"
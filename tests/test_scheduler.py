@@ -0,0 +1,108 @@
+"""Unit tests for py_mem_mcp.scheduler."""
+
+import asyncio
+
+import pytest
+
+from py_mem_mcp.scheduler import Priority, RequestScheduler, priority_for
+
+
+def test_priority_for_tools():
+    assert priority_for("get_children") == Priority.INTERACTIVE
+    assert priority_for("sparql_query") == Priority.HEAVY
+    assert priority_for(None) == Priority.STANDARD
+    assert priority_for("unknown_tool") == Priority.STANDARD
+
+
+def test_invalid_limits_rejected():
+    with pytest.raises(ValueError):
+        RequestScheduler(max_concurrency=0)
+
+
+class TestRequestScheduler:
+    @pytest.mark.asyncio
+    async def test_global_cap(self):
+        scheduler = RequestScheduler(max_concurrency=2)
+        running = 0
+        peak = 0
+
+        async def job():
+            nonlocal running, peak
+            async with scheduler.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(job() for _ in range(6)))
+        assert peak == 2
+        assert scheduler.stats().waits == 4
+
+    @pytest.mark.asyncio
+    async def test_heavy_cap_leaves_room_for_interactive(self):
+        scheduler = RequestScheduler(max_concurrency=3, max_heavy=1)
+        release = asyncio.Event()
+
+        async def heavy():
+            async with scheduler.slot(Priority.HEAVY):
+                await release.wait()
+
+        tasks = [asyncio.create_task(heavy()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert scheduler.stats().heavy_in_flight == 1
+        assert scheduler.stats().queue_depth["heavy"] == 2
+
+        # Interactive work is not blocked by the queued heavy requests.
+        async with scheduler.slot(Priority.INTERACTIVE):
+            assert scheduler.stats().in_flight == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_interactive_dispatched_first(self):
+        scheduler = RequestScheduler(max_concurrency=1)
+        order: list[str] = []
+        gate = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot(Priority.STANDARD):
+                await gate.wait()
+
+        async def job(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = [
+            asyncio.create_task(job("heavy", Priority.HEAVY)),
+            asyncio.create_task(job("standard", Priority.STANDARD)),
+            asyncio.create_task(job("interactive", Priority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(first, *waiting)
+        assert order == ["interactive", "standard", "heavy"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = RequestScheduler(max_concurrency=1)
+        gate = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot():
+                await gate.wait()
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler._acquire(Priority.STANDARD))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.queue_depth == 0
+        gate.set()
+        await first
+        assert scheduler.stats().in_flight == 0
@@ -0,0 +1,121 @@
+"""Unit tests for py_mem_mcp.slowlog."""
+
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from py_mem_mcp.middleware import current_tool
+from py_mem_mcp.slowlog import SlowQueryLog, query_graphs
+from py_mem_mcp.sparql import SparqlClient
+
+_QUERY = "SELECT ?x FROM <urn:g1> FROM NAMED <urn:g2> WHERE { ?x ?p ?o }"
+_PAYLOAD = {
+    "head": {"vars": ["x"]},
+    "results": {"bindings": [{"x": {"type": "literal", "value": "v"}}] * 3},
+}
+
+
+def _entries(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_query_graphs():
+    assert query_graphs(_QUERY + " FROM <urn:g1>") == ["urn:g1", "urn:g2"]
+
+
+def test_record_writes_json_lines(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"))
+    log.record(_QUERY, 3.21, tool="search", rows=7)
+    log.close()
+    [entry] = _entries(tmp_path / "slow.jsonl")
+    assert entry["tool"] == "search"
+    assert entry["duration"] == 3.21
+    assert entry["rows"] == 7
+    assert entry["graphs"] == ["urn:g1", "urn:g2"]
+    assert entry["query"] == _QUERY
+    assert "error" not in entry and "plan" not in entry
+
+
+def test_log_rotates(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), max_bytes=300, backups=2)
+    for _ in range(5):
+        log.record(_QUERY, 1.0)
+    log.close()
+    assert (tmp_path / "slow.jsonl.1").exists()
+    assert not (tmp_path / "slow.jsonl.3").exists()
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("SLOW_QUERY_LOG", raising=False)
+    assert SlowQueryLog.from_env() is None
+    monkeypatch.setenv("SLOW_QUERY_LOG", str(tmp_path / "slow.jsonl"))
+    monkeypatch.setenv("SLOW_QUERY_THRESHOLD", "0.5")
+    monkeypatch.setenv("SLOW_QUERY_EXPLAIN", "true")
+    log = SlowQueryLog.from_env()
+    assert log.threshold == 0.5
+    assert log.explain is True
+
+
+@pytest.mark.asyncio
+async def test_client_logs_slow_queries(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), threshold=0.0)
+    client = SparqlClient(
+        "https://sparql.example.com/sparql",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=_PAYLOAD)),
+        slow_log=log,
+    )
+    token = current_tool.set("sparql_query")
+    try:
+        async with client:
+            await client.query(_QUERY)
+            async with client.stream(_QUERY) as rows:
+                await rows.collect()
+    finally:
+        current_tool.reset(token)
+    first, second = _entries(tmp_path / "slow.jsonl")
+    assert first["tool"] == second["tool"] == "sparql_query"
+    assert first["rows"] == second["rows"] == 3
+    assert first["graphs"] == ["urn:g1", "urn:g2"]
+
+
+@pytest.mark.asyncio
+async def test_client_skips_fast_queries(tmp_path):
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), threshold=60.0)
+    client = SparqlClient(
+        "https://sparql.example.com/sparql",
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=_PAYLOAD)),
+        slow_log=log,
+    )
+    async with client:
+        await client.query(_QUERY)
+    assert not (tmp_path / "slow.jsonl").exists()
+
+
+@pytest.mark.asyncio
+async def test_client_logs_failure_with_plan(tmp_path):
+    explained = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        form = parse_qs(request.content.decode())
+        if form.get("explain") == ["on"]:
+            explained.append(form["query"][0])
+            return httpx.Response(200, text="{ Fork 1 ... }")
+        return httpx.Response(400, text="syntax error")
+
+    log = SlowQueryLog(str(tmp_path / "slow.jsonl"), threshold=0.0, explain=True)
+    client = SparqlClient(
+        "https://sparql.example.com/sparql",
+        transport=httpx.MockTransport(handler),
+        slow_log=log,
+    )
+    async with client:
+        with pytest.raises(RuntimeError):
+            await client.query(_QUERY)
+        await next(iter(client._plan_tasks))
+    [entry] = _entries(tmp_path / "slow.jsonl")
+    assert explained == [_QUERY]
+    assert entry["plan"] == "{ Fork 1 ... }"
+    assert entry["rows"] is None
+    assert "syntax error" in entry["error"]
@@ -0,0 +1,200 @@
+"""Unit tests for py_mem_mcp.snapshot."""
+
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from py_mem_mcp.export import export_hierarchy, refresh_hierarchy
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.snapshot import HierarchySnapshot, SnapshotFile, StringTable, write_snapshot
+from py_mem_mcp.sparql import SparqlClient
+
+_EDGES = [
+    ("urn:root", "urn:b"),
+    ("urn:root", "urn:a"),
+    ("urn:a", "urn:c"),
+    ("urn:b", "urn:c"),
+    ("urn:b", "urn:c"),
+]
+_LABELS = {"urn:root": "Lehrplan", "urn:a": "Äpfel", "urn:b": "Birnen"}
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "hierarchy.snap"
+    HierarchySnapshot.write(path, _EDGES, _LABELS, {"graphs": ["urn:g"]})
+    return HierarchySnapshot.open(path)
+
+
+class TestSnapshotFile:
+    def test_round_trips_sections_and_meta(self, tmp_path):
+        path = tmp_path / "data.snap"
+        write_snapshot(
+            path,
+            {"blob": b"abc", "ints": array("i", [1, -2, 3]), "longs": array("q", [2**40])},
+            {"kind": "test"},
+        )
+        file = SnapshotFile(path)
+        assert file.meta == {"kind": "test"}
+        assert bytes(file.section("blob")) == b"abc"
+        assert list(file.section("ints")) == [1, -2, 3]
+        assert list(file.section("longs")) == [2**40]
+        assert [p.name for p in tmp_path.iterdir()] == ["data.snap"]
+
+    def test_concurrent_writes_leave_a_valid_snapshot(self, tmp_path):
+        path = tmp_path / "data.snap"
+
+        def write(writer: int) -> None:
+            ints = array("i", [writer] * 100_000 * writer)
+            write_snapshot(path, {"ints": ints}, {"writer": writer})
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(write, [1, 2]))
+        file = SnapshotFile(path)
+        writer = file.meta["writer"]
+        assert list(file.section("ints")) == [writer] * 100_000 * writer
+        assert [p.name for p in tmp_path.iterdir()] == ["data.snap"]
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.snap"
+        path.write_bytes(b"not a snapshot")
+        with pytest.raises(ValueError, match="Not a snapshot"):
+            SnapshotFile(path)
+
+
+class TestStringTable:
+    def test_get_and_find(self):
+        offsets, blob = StringTable.build(["alpha", "beta", "gamma", "äther"])
+        table = StringTable(offsets, blob)
+        assert len(table) == 4
+        assert table[3] == "äther"
+        assert table.find("gamma") == 2
+        assert table.find("äther") == 3
+        assert table.find("delta") is None
+        with pytest.raises(IndexError):
+            table[4]
+
+
+class TestHierarchySnapshot:
+    def test_meta_counts_unique_edges(self, snapshot):
+        assert snapshot.meta["kind"] == "hierarchy"
+        assert snapshot.meta["nodes"] == 4
+        assert snapshot.meta["edges"] == 4
+        assert snapshot.meta["graphs"] == ["urn:g"]
+
+    def test_children_sorted_with_labels(self, snapshot):
+        results = snapshot.children("urn:root")
+        assert results.vars == ["child", "childLabel"]
+        assert [row["child"].value for row in results.bindings] == ["urn:a", "urn:b"]
+        assert results.values("childLabel") == ["Äpfel", "Birnen"]
+
+    def test_leaf_and_unknown_nodes(self, snapshot):
+        leaf = snapshot.children("urn:c")
+        assert leaf is not None and not leaf.bindings
+        assert "childLabel" not in (snapshot.children("urn:a").bindings[0])
+        assert snapshot.children("urn:missing") is None
+
+    def test_children_of_returns_tree_rows(self, snapshot):
+        results = snapshot.children_of(["urn:a", "urn:b", "urn:missing"])
+        assert [(row["parent"].value, row["child"].value) for row in results.bindings] == [
+            ("urn:a", "urn:c"),
+            ("urn:b", "urn:c"),
+        ]
+        assert results.values("parentLabel") == ["Äpfel", "Birnen"]
+
+    def test_rejects_other_snapshot_kinds(self, tmp_path):
+        path = tmp_path / "data.snap"
+        write_snapshot(path, {}, {"kind": "other"})
+        with pytest.raises(ValueError, match="not a hierarchy snapshot"):
+            HierarchySnapshot.open(path)
+
+
+class TestExportHierarchy:
+    @pytest.mark.asyncio
+    async def test_exports_edges_and_prefers_german_labels(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("GRAPH_ONTOLOGY", "urn:g:ontology")
+        monkeypatch.setenv("GRAPH_SCHULART", "urn:g:schulart")
+        monkeypatch.setenv("GRAPH_SCHULFACH", "urn:g:schulfach")
+
+        def uri(value):
+            return {"type": "uri", "value": value}
+
+        def lit(value, lang=None):
+            return {"type": "literal", "value": value, **({"xml:lang": lang} if lang else {})}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "?parent ?child" in request.content.decode():
+                rows = [{"parent": uri("urn:lp"), "child": uri("urn:a")}]
+                head = ["parent", "child"]
+            else:
+                rows = [
+                    {"node": uri("urn:a"), "label": lit("Part A", "en")},
+                    {"node": uri("urn:a"), "label": lit("Teil A", "de")},
+                    {"node": uri("urn:lp"), "label": lit("Lehrplan")},
+                ]
+                head = ["node", "label"]
+            return httpx.Response(
+                200, json={"head": {"vars": head}, "results": {"bindings": rows}}
+            )
+
+        path = tmp_path / "hierarchy.snap"
+        client = SparqlClient(
+            "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+        )
+        async with client as sparql:
+            meta = await export_hierarchy(sparql, GraphRegistry(), str(path))
+
+        assert meta["nodes"] == 2 and meta["edges"] == 1
+        snapshot = HierarchySnapshot.open(path)
+        assert snapshot.children("urn:lp").values("childLabel") == ["Teil A"]
+
+
+class TestRefreshHierarchy:
+    @pytest.fixture
+    def graphs(self, monkeypatch):
+        monkeypatch.setenv("GRAPH_ONTOLOGY", "urn:g:ontology")
+        monkeypatch.setenv("GRAPH_SCHULART", "urn:g:schulart")
+        monkeypatch.setenv("GRAPH_SCHULFACH", "urn:g:schulfach")
+        return GraphRegistry()
+
+    @staticmethod
+    def _client(requests):
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if "?parent ?child" in request.content.decode():
+                rows = [{"parent": {"type": "uri", "value": "urn:root"},
+                         "child": {"type": "uri", "value": "urn:new"}}]
+                head = ["parent", "child"]
+            else:
+                rows, head = [], ["node", "label"]
+            return httpx.Response(
+                200, json={"head": {"vars": head}, "results": {"bindings": rows}}
+            )
+
+        return SparqlClient(
+            "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+        )
+
+    @pytest.mark.asyncio
+    async def test_reexports_and_reloads_in_place(self, tmp_path, graphs):
+        path = tmp_path / "hierarchy.snap"
+        HierarchySnapshot.write(path, _EDGES, _LABELS, {"graphs": graphs.all_graphs})
+        snapshot = HierarchySnapshot.open(path)
+        requests: list[httpx.Request] = []
+        async with self._client(requests) as sparql:
+            await refresh_hierarchy(sparql, graphs, snapshot, {"urn:g:schulfach"})
+        assert snapshot.children("urn:root").values("child") == ["urn:new"]
+        assert HierarchySnapshot.open(path).meta["edges"] == 1
+
+    @pytest.mark.asyncio
+    async def test_ignores_other_graphs(self, tmp_path, graphs):
+        path = tmp_path / "hierarchy.snap"
+        HierarchySnapshot.write(path, _EDGES, _LABELS, {"graphs": ["urn:g:ontology"]})
+        snapshot = HierarchySnapshot.open(path)
+        requests: list[httpx.Request] = []
+        async with self._client(requests) as sparql:
+            await refresh_hierarchy(sparql, graphs, snapshot, {"urn:g:schulfach"})
+        assert not requests
+        assert snapshot.children("urn:root").values("child") == ["urn:a", "urn:b"]
@@ -1,8 +1,16 @@
 """Unit tests for py_mem_mcp.sparql."""
 
+import httpx
 import pytest
 
-from py_mem_mcp.sparql import SparqlBinding, SparqlClient, SparqlResults
+from py_mem_mcp.cache import ResultCache
+from py_mem_mcp.sparql import (
+    HttpPoolConfig,
+    ResultFormat,
+    SparqlBinding,
+    SparqlClient,
+    SparqlResults,
+)
 
 
 class TestSparqlBinding:
@@ -74,3 +82,134 @@ class TestSparqlClientInit:
     def test_endpoint_stored(self):
         client = SparqlClient("https://sparql.example.com/sparql")
         assert client.endpoint == "https://sparql.example.com/sparql"
+
+
+def _json_transport(payload: dict, calls: list | None = None) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if calls is not None:
+            calls.append(request)
+        return httpx.Response(200, json=payload)
+
+    return httpx.MockTransport(handler)
+
+
+_SIMPLE_PAYLOAD = {
+    "head": {"vars": ["x"]},
+    "results": {"bindings": [{"x": {"type": "literal", "value": "v", "xml:lang": "de"}}]},
+}
+
+
+class TestSparqlClientPool:
+    def test_pool_config_from_env(self, monkeypatch):
+        monkeypatch.setenv("SPARQL_POOL_MAX_CONNECTIONS", "5")
+        monkeypatch.setenv("SPARQL_POOL_KEEPALIVE_EXPIRY", "2.5")
+        monkeypatch.setenv("SPARQL_HTTP2", "true")
+        pool = HttpPoolConfig.from_env()
+        assert pool.max_connections == 5
+        assert pool.keepalive_expiry == 2.5
+        assert pool.http2 is True
+
+    @pytest.mark.asyncio
+    async def test_client_reused_across_queries(self):
+        calls: list = []
+        client = SparqlClient(
+            "https://sparql.example.com/sparql",
+            transport=_json_transport(_SIMPLE_PAYLOAD, calls),
+        )
+        async with client:
+            http = client._client
+            await client.query("SELECT * WHERE { ?s ?p ?o }")
+            await client.query("SELECT * WHERE { ?s ?p ?o }")
+            assert client._client is http
+        assert len(calls) == 2
+        assert client._client is None
+
+    @pytest.mark.asyncio
+    async def test_query_parses_bindings(self):
+        client = SparqlClient(
+            "https://sparql.example.com/sparql",
+            transport=_json_transport(_SIMPLE_PAYLOAD),
+        )
+        results = await client.query("SELECT ?x WHERE { ?x ?p ?o }")
+        await client.aclose()
+        assert results.vars == ["x"]
+        assert results.bindings[0]["x"].value == "v"
+        assert results.bindings[0]["x"].lang == "de"
+
+    @pytest.mark.asyncio
+    async def test_query_raises_on_error_status(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(500, text="boom"))
+        client = SparqlClient("https://sparql.example.com/sparql", transport=transport)
+        with pytest.raises(RuntimeError, match="500"):
+            await client.query("SELECT * WHERE { ?s ?p ?o }")
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_cached_query_hits_endpoint_once(self):
+        calls: list = []
+        client = SparqlClient(
+            "https://sparql.example.com/sparql",
+            transport=_json_transport(_SIMPLE_PAYLOAD, calls),
+            cache=ResultCache(),
+        )
+        async with client:
+            await client.query("SELECT ?x WHERE { ?x ?p ?o }")
+            await client.query("SELECT ?x\nWHERE { ?x ?p ?o }")
+        assert len(calls) == 1
+
+
+class TestSparqlClientStream:
+    @pytest.mark.asyncio
+    async def test_stream_yields_rows(self):
+        payload = {
+            "head": {"vars": ["x"]},
+            "results": {"bindings": [{"x": {"type": "literal", "value": str(i)}} for i in range(3)]},
+        }
+        client = SparqlClient("https://sparql.example.com/sparql", transport=_json_transport(payload))
+        async with client.stream("SELECT ?x WHERE { ?x ?p ?o }") as rows:
+            assert rows.vars == ["x"]
+            values = [row["x"].value async for row in rows]
+        await client.aclose()
+        assert values == ["0", "1", "2"]
+        assert rows.truncated is False
+
+    @pytest.mark.asyncio
+    async def test_stream_stops_at_max_rows(self):
+        payload = {
+            "head": {"vars": ["x"]},
+            "results": {"bindings": [{"x": {"type": "literal", "value": str(i)}} for i in range(10)]},
+        }
+        client = SparqlClient("https://sparql.example.com/sparql", transport=_json_transport(payload))
+        async with client.stream("SELECT ?x WHERE { ?x ?p ?o }", max_rows=4) as rows:
+            results = await rows.collect()
+        await client.aclose()
+        assert len(results.bindings) == 4
+        assert rows.truncated is True
+
+    @pytest.mark.asyncio
+    async def test_tsv_format_negotiated(self):
+        calls: list = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, content=b'?x\n"v"@de\n')
+
+        client = SparqlClient(
+            "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+        )
+        results = await client.query("SELECT ?x WHERE { ?x ?p ?o }", format=ResultFormat.TSV)
+        await client.aclose()
+        assert calls[0].headers["Accept"] == "text/tab-separated-values"
+        assert results.bindings[0]["x"].lang == "de"
+
+    @pytest.mark.asyncio
+    async def test_malformed_tsv_raises_runtime_error(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b"?a\t?b\n<https://example.com/a>\n")
+
+        client = SparqlClient(
+            "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+        )
+        with pytest.raises(RuntimeError, match="Malformed SPARQL TSV results"):
+            await client.query("SELECT ?a ?b WHERE { ?a ?p ?b }", format=ResultFormat.TSV)
+        await client.aclose()
@@ -0,0 +1,71 @@
+"""Unit tests for py_mem_mcp.streaming."""
+
+import json
+
+import pytest
+
+from py_mem_mcp.streaming import BindingStreamParser
+
+
+def _document(n: int) -> dict:
+    return {
+        "head": {"vars": ["s", "label"]},
+        "results": {
+            "bindings": [
+                {
+                    "s": {"type": "uri", "value": f"https://example.com/{i}"},
+                    "label": {
+                        "type": "literal",
+                        "value": f'tricky "{{[,:]}}" \\\\ label {i}',
+                        "xml:lang": "de",
+                    },
+                }
+                for i in range(n)
+            ]
+        },
+    }
+
+
+class TestBindingStreamParser:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 100000])
+    def test_rows_match_full_parse(self, chunk_size):
+        doc = _document(50)
+        body = json.dumps(doc).encode()
+        parser = BindingStreamParser()
+        rows = []
+        for i in range(0, len(body), chunk_size):
+            rows.extend(parser.feed(body[i:i + chunk_size]))
+        assert rows == doc["results"]["bindings"]
+        assert parser.vars == ["s", "label"]
+        assert parser.done
+
+    def test_rows_emitted_incrementally(self):
+        body = json.dumps(_document(2)).encode()
+        cut = body.index(b"}},") + 2
+        parser = BindingStreamParser()
+        assert len(parser.feed(body[:cut])) == 1
+        assert len(parser.feed(body[cut:])) == 1
+
+    def test_head_after_results(self):
+        doc = {"results": {"bindings": [{"x": {"type": "literal", "value": "1"}}]},
+               "head": {"vars": ["x"]}}
+        parser = BindingStreamParser()
+        rows = parser.feed(json.dumps(doc).encode())
+        assert len(rows) == 1
+        assert parser.vars == ["x"]
+
+    def test_buffer_compacted_between_rows(self):
+        body = json.dumps(_document(200)).encode()
+        parser = BindingStreamParser()
+        for i in range(0, len(body), 512):
+            parser.feed(body[i:i + 512])
+        assert len(parser._buf) < 1024
+
+    def test_unbalanced_bracket_raises_runtime_error(self):
+        with pytest.raises(RuntimeError, match="unbalanced bracket"):
+            BindingStreamParser().feed(b'{"head": {}}}')
+
+    def test_malformed_row_raises_runtime_error(self):
+        parser = BindingStreamParser()
+        with pytest.raises(RuntimeError, match="Malformed SPARQL JSON results"):
+            parser.feed(b'{"results": {"bindings": [{"s": tru}]}}')
@@ -0,0 +1,68 @@
+"""Unit tests for py_mem_mcp.templates."""
+
+import pytest
+
+from py_mem_mcp.templates import (
+    QueryTemplate,
+    contains_expression,
+    from_block,
+    integer,
+    iri,
+    literal,
+)
+
+
+def test_template_parses_placeholders():
+    template = QueryTemplate("""
+        SELECT ?s {{graphs:from}}
+        WHERE { ?s ?p {{value}} . }
+        LIMIT {{limit:int}}""")
+    assert template.params == {"graphs": "from", "value": "literal", "limit": "int"}
+    assert template.render(graphs=["urn:g"], value='a "b"', limit=5) == (
+        'SELECT ?s FROM <urn:g>\nWHERE { ?s ?p "a \\"b\\"" . }\nLIMIT 5'
+    )
+
+
+def test_template_rejects_unknown_kind():
+    with pytest.raises(ValueError, match="Unknown placeholder kind"):
+        QueryTemplate("SELECT * WHERE { ?s ?p {{x:blob}} }")
+
+
+def test_render_requires_exact_params():
+    template = QueryTemplate("SELECT * WHERE { {{node:iri}} ?p ?o }")
+    with pytest.raises(TypeError, match="missing"):
+        template.render()
+    with pytest.raises(TypeError, match="unknown"):
+        template.render(node="urn:a", extra=1)
+
+
+def test_iri_rejects_injection():
+    assert iri("https://example.com/a") == "<https://example.com/a>"
+    for value in ["urn:x> . ?s ?p ?o <", "", "a b", 'x"y']:
+        with pytest.raises(ValueError, match="Invalid URI"):
+            iri(value)
+
+
+def test_literal_escapes_control_characters():
+    assert literal('a\\b"c\nd\te') == '"a\\\\b\\"c\\nd\\te"'
+
+
+def test_integer_rejects_non_integers():
+    assert integer(7) == "7"
+    for value in [True, "7", 1.5]:
+        with pytest.raises(ValueError):
+            integer(value)
+
+
+def test_contains_expression_keeps_only_words():
+    assert contains_expression("Photo' OR 'x*  Synthese") == (
+        "\"'Photo*' AND 'OR*' AND 'x*' AND 'Synthese*'\""
+    )
+    with pytest.raises(ValueError, match="at least one word"):
+        contains_expression(" '*' ")
+
+
+def test_from_block_is_cached_per_graph_list():
+    first = from_block(["urn:a", "urn:b"])
+    assert first == "FROM <urn:a>\nFROM <urn:b>"
+    assert from_block(("urn:a", "urn:b")) is first
@@ -0,0 +1,160 @@
+"""Unit tests for py_mem_mcp.text_index."""
+
+import httpx
+import pytest
+
+from py_mem_mcp.changes import RefreshError
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.sparql import SparqlClient
+from py_mem_mcp.text_index import (
+    LabelDoc,
+    TextIndex,
+    fold,
+    read_label_snapshot,
+    tokenize,
+    write_label_snapshot,
+)
+
+_DOCS = [
+    LabelDoc("urn:1", "Fische und Amphibien", "urn:g:by", "urn:lp"),
+    LabelDoc("urn:2", "Fisch", "urn:g:by", "urn:lp"),
+    LabelDoc("urn:3", "Übungen zu Fischen im Süßwasser", "urn:g:sn"),
+    LabelDoc("urn:4", "Vögel", "urn:g:sn"),
+    LabelDoc("urn:lp", "Lehrplan Biologie", "urn:g:by"),
+    LabelDoc("urn:2", "Fisch", "urn:g:sn"),
+]
+
+
+@pytest.fixture
+def graph_env(monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "urn:g:ontology")
+    monkeypatch.setenv("GRAPH_SCHULART", "urn:g:schulart")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "urn:g:schulfach")
+
+
+@pytest.fixture
+def index(graph_env):
+    text_index = TextIndex(SparqlClient("https://sparql.example.com/sparql"), GraphRegistry())
+    text_index.build(_DOCS)
+    return text_index
+
+
+def _uris(results):
+    return [row["s"].value for row in results.bindings]
+
+
+class TestFolding:
+    def test_fold_spells_out_umlauts(self):
+        assert fold("Übung Größe") == "uebung groesse"
+
+    def test_tokenize_splits_words(self):
+        assert tokenize("Fische, Amphibien-Arten") == ["fische", "amphibien", "arten"]
+
+
+class TestSearch:
+    def test_prefix_match_ranks_shorter_label_first(self, index):
+        assert _uris(index.search("fisch")) == ["urn:2", "urn:1", "urn:3"]
+
+    def test_all_words_must_match(self, index):
+        assert _uris(index.search("fisch amph")) == ["urn:1"]
+        assert _uris(index.search("fisch vogel")) == []
+
+    def test_folded_spellings_match(self, index):
+        assert _uris(index.search("uebung")) == ["urn:3"]
+        assert _uris(index.search("Süsswasser")) == ["urn:3"]
+        assert _uris(index.search("VÖGEL")) == ["urn:4"]
+
+    def test_graph_filter_and_duplicates(self, index):
+        assert _uris(index.search("fisch", graphs=["urn:g:sn"])) == ["urn:2", "urn:3"]
+        assert _uris(index.search("fisch")).count("urn:2") == 1
+
+    def test_limit_and_parent_label(self, index):
+        results = index.search("fisch", limit=1)
+        assert results.vars == ["s", "label", "parent", "parentLabel"]
+        assert results.values("parentLabel") == ["Lehrplan Biologie"]
+
+    def test_pages_continue_after_last_key(self, index):
+        first = index.page("fisch", limit=2)
+        assert _uris(first.results) == ["urn:2", "urn:1"]
+        assert first.next_key[1:] == ["urn:1", "Fische und Amphibien"]
+        rest = index.page("fisch", limit=2, after=first.next_key)
+        assert _uris(rest.results) == ["urn:3"]
+        assert rest.next_key is None
+
+    def test_empty_query_and_index(self, index, graph_env):
+        assert not index.search("  ").bindings
+        empty = TextIndex(SparqlClient("https://sparql.example.com/sparql"), GraphRegistry())
+        assert not empty.ready
+        assert not empty.search("fisch").bindings
+
+
+class TestLoading:
+    def test_snapshot_round_trip(self, tmp_path):
+        path = tmp_path / "labels.snap"
+        write_label_snapshot(path, _DOCS)
+        assert read_label_snapshot(path) == _DOCS
+
+    @pytest.mark.asyncio
+    async def test_load_from_snapshot(self, tmp_path, graph_env):
+        path = tmp_path / "labels.snap"
+        write_label_snapshot(path, _DOCS)
+        index = TextIndex(
+            SparqlClient("https://sparql.example.com/sparql"), GraphRegistry(), path
+        )
+        await index.load()
+        assert len(index) == len(_DOCS)
+
+    @pytest.mark.asyncio
+    async def test_refresh_replaces_only_changed_graphs(self, index, monkeypatch):
+        async def fetch(sparql, graphs, graph):
+            return [LabelDoc("urn:5", "Fischotter", graph)]
+
+        monkeypatch.setattr("py_mem_mcp.text_index.fetch_label_docs", fetch)
+        index.build([
+            LabelDoc("urn:1", "Fische", "urn:g:ontology"),
+            LabelDoc("urn:2", "Fisch", "urn:g:schulfach"),
+        ])
+        await index.refresh({"urn:g:ontology", "urn:g:unknown"})
+        assert sorted(_uris(index.search("fisch"))) == ["urn:2", "urn:5"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_keeps_failed_graphs_and_reports_them(self, index, monkeypatch):
+        async def fetch(sparql, graphs, graph):
+            if graph == "urn:g:schulfach":
+                raise RuntimeError("down")
+            return [LabelDoc("urn:5", "Fischotter", graph)]
+
+        monkeypatch.setattr("py_mem_mcp.text_index.fetch_label_docs", fetch)
+        index.build([
+            LabelDoc("urn:1", "Fische", "urn:g:ontology"),
+            LabelDoc("urn:2", "Fisch", "urn:g:schulfach"),
+        ])
+        with pytest.raises(RefreshError) as excinfo:
+            await index.refresh({"urn:g:ontology", "urn:g:schulfach"})
+        assert excinfo.value.graphs == {"urn:g:schulfach"}
+        assert sorted(_uris(index.search("fisch"))) == ["urn:2", "urn:5"]
+
+    @pytest.mark.asyncio
+    async def test_load_from_sparql_per_graph(self, graph_env):
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = request.content.decode()
+            if "GRAPH <urn:g:schulfach>" in body:
+                return httpx.Response(500)
+            rows = []
+            if "GRAPH <urn:g:ontology>" in body:
+                rows = [{
+                    "s": {"type": "uri", "value": "urn:x"},
+                    "label": {"type": "literal", "value": "Fisch"},
+                }]
+            return httpx.Response(
+                200,
+                json={"head": {"vars": ["s", "label", "parent"]}, "results": {"bindings": rows}},
+            )
+
+        client = SparqlClient(
+            "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+        )
+        async with client as sparql:
+            index = TextIndex(sparql, GraphRegistry())
+            await index.load()
+        assert _uris(index.search("fisch")) == ["urn:x"]
@@ -1,14 +1,22 @@
 """Unit tests for MCP tool registration and basic logic."""
 
 import asyncio
+import json
 import os
+import re
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 
 from py_mem_mcp.bundesland import BundeslandRegistry
+from py_mem_mcp.closure import ClosureTable, LehrplanInfo
+from py_mem_mcp.fanout import FanOut
 from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.snapshot import HierarchySnapshot
 from py_mem_mcp.sparql import SparqlBinding, SparqlClient, SparqlResults
+from py_mem_mcp.text_index import LabelDoc, TextIndex
+from py_mem_mcp.tools.lehrplan import LehrplanTools
 from py_mem_mcp.tools.listing import ListingTools
 from py_mem_mcp.tools.query import QueryTools
 from py_mem_mcp.tools.search import SearchTools
@@ -47,6 +55,29 @@ def _mock_results(vars_: list[str], rows: list[list[str]]) -> SparqlResults:
     return SparqlResults(vars=vars_, bindings=bindings)
 
 
+def _streaming_client(
+    vars_: list[str], rows: list[list[str]], calls: list | None = None
+) -> SparqlClient:
+    payload = {
+        "head": {"vars": vars_},
+        "results": {
+            "bindings": [
+                {v: {"type": "literal", "value": row[i]} for i, v in enumerate(vars_)}
+                for row in rows
+            ]
+        },
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if calls is not None:
+            calls.append(request)
+        return httpx.Response(200, json=payload)
+
+    return SparqlClient(
+        "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+    )
+
+
 class TestQueryTools:
     def test_registration_succeeds(self, components):
         from fastmcp import FastMCP
@@ -57,19 +88,64 @@ class TestQueryTools:
     @pytest.mark.asyncio
     async def test_sparql_query_tool_calls_client(self, components):
         from fastmcp import FastMCP
-        sparql, graphs, _ = components
+        _, graphs, _ = components
+        calls: list = []
+        sparql = _streaming_client(["s"], [["value1"]], calls)
         mcp = FastMCP("test")
         QueryTools(sparql, graphs).register(mcp)
 
-        mock_results = _mock_results(["s"], [["value1"]])
-        sparql.query = AsyncMock(return_value=mock_results)
-
         tools = await mcp.get_tools()
         assert "sparql_query" in tools
         result, _ = await mcp._call_tool_mcp("sparql_query", {"query": "SELECT * WHERE { ?s ?p ?o }"})
-        sparql.query.assert_called_once()
+        assert len(calls) == 1
         assert "value1" in result[0].text
 
+    @pytest.mark.asyncio
+    async def test_sparql_query_truncates_at_max_rows(self, components):
+        from fastmcp import FastMCP
+        _, graphs, _ = components
+        sparql = _streaming_client(["s"], [[f"value{i}"] for i in range(5)])
+        mcp = FastMCP("test")
+        QueryTools(sparql, graphs, max_rows=2).register(mcp)
+
+        result, _ = await mcp._call_tool_mcp("sparql_query", {"query": "SELECT * WHERE { ?s ?p ?o }"})
+        text = result[0].text
+        assert "value1" in text
+        assert "value2" not in text
+        assert "truncated to 2 rows" in text
+
+    @pytest.mark.asyncio
+    async def test_sparql_query_enforces_byte_budget(self, components):
+        from fastmcp import FastMCP
+        _, graphs, _ = components
+        sparql = _streaming_client(["s"], [[f"value{i:04d}"] for i in range(1000)])
+        mcp = FastMCP("test")
+        QueryTools(sparql, graphs, max_bytes=1000).register(mcp)
+
+        result, _ = await mcp._call_tool_mcp("sparql_query", {"query": "SELECT * WHERE { ?s ?p ?o }"})
+        text = result[0].text
+        assert len(text.encode()) <= 1000
+        assert "value0000" in text
+        assert "value0999" not in text
+        assert "to stay within 1000 bytes" in text
+
+    @pytest.mark.asyncio
+    async def test_sparql_query_json_output(self, components):
+        from fastmcp import FastMCP
+        _, graphs, _ = components
+        sparql = _streaming_client(["s"], [[f"value{i}"] for i in range(5)])
+        mcp = FastMCP("test")
+        QueryTools(sparql, graphs, max_rows=2).register(mcp)
+
+        result, _ = await mcp._call_tool_mcp(
+            "sparql_query", {"query": "SELECT * WHERE { ?s ?p ?o }", "format": "json"}
+        )
+        data = json.loads(result[0].text)
+        assert data["vars"] == ["s"]
+        assert data["rows"] == [["value0"], ["value1"]]
+        assert data["truncated"] is True
+        assert "truncated to 2 rows" in data["note"]
+
 
 class TestListingTools:
     def test_registration_succeeds(self, components):
@@ -104,8 +180,187 @@ class TestListingTools:
         result, _ = await mcp._call_tool_mcp("list_bundeslaender", {})
         assert "Bayern" in result[0].text
 
+    @pytest.mark.asyncio
+    async def test_list_bundeslaender_fans_out_per_state(self, components, monkeypatch):
+        from fastmcp import FastMCP
+        monkeypatch.setenv("GRAPH_STATE_BY", "https://by.example.com/")
+        monkeypatch.setenv("GRAPH_STATE_SN", "https://sn.example.com/")
+        sparql, _, bl_reg = components
+        graphs = GraphRegistry()
+        mcp = FastMCP("test")
+        ListingTools(sparql, graphs, bl_reg, FanOut(sparql, graphs)).register(mcp)
+
+        def fake_query(query, **kwargs):
+            label = "Bayern" if "by.example.com" in query else "Sachsen"
+            return _mock_results(["uri", "label"], [[f"urn:{label}", label]])
+
+        sparql.query = AsyncMock(side_effect=fake_query)
+        result, _ = await mcp._call_tool_mcp("list_bundeslaender", {})
+        assert sparql.query.await_count == 2
+        assert result[0].text.index("Bayern") < result[0].text.index("Sachsen")
+
+
+class TestLehrplanTools:
+    @pytest.fixture
+    def snapshot(self, tmp_path):
+        path = tmp_path / "hierarchy.snap"
+        HierarchySnapshot.write(
+            path,
+            [("urn:lp", "urn:a"), ("urn:a", "urn:b")],
+            {"urn:a": "Kapitel A", "urn:b": "Abschnitt B"},
+        )
+        return HierarchySnapshot.open(path)
+
+    @pytest.mark.asyncio
+    async def test_find_lehrplaene_pages_with_cursor(self, components):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg).register(mcp)
+        sparql.query = AsyncMock(side_effect=[
+            _mock_results(["s", "label"], [["urn:1", "A"], ["urn:2", "B"], ["urn:3", "C"]]),
+            _mock_results(["s", "label"], [["urn:3", "C"]]),
+        ])
+
+        result, _ = await mcp._call_tool_mcp(
+            "find_lehrplaene", {"bundesland": "BY", "page_size": 2}
+        )
+        assert "LIMIT 3" in sparql.query.call_args.args[0]
+        assert "urn:2" in result[0].text and "urn:3" not in result[0].text
+        cursor = re.search(r'cursor="([^"]+)"', result[0].text).group(1)
+
+        result, _ = await mcp._call_tool_mcp(
+            "find_lehrplaene", {"bundesland": "BY", "page_size": 2, "cursor": cursor}
+        )
+        assert 'STR(?label) = "B" && STR(?s) > "urn:2"' in sparql.query.call_args.args[0]
+        assert "urn:3" in result[0].text and "cursor=" not in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_find_lehrplaene_rejects_foreign_cursor(self, components):
+        from fastmcp import FastMCP
+        from fastmcp.exceptions import ToolError
+        from py_mem_mcp.paging import cursor_scope, encode_cursor
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg).register(mcp)
+        cursor = encode_cursor(cursor_scope("search", query="x"), ["a", "b"])
+
+        with pytest.raises(ToolError, match="different query"):
+            await mcp._call_tool_mcp("find_lehrplaene", {"bundesland": "BY", "cursor": cursor})
+
+    @pytest.mark.asyncio
+    async def test_get_children_batch_groups_by_parent(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot).register(mcp)
+        sparql.query = AsyncMock(return_value=SparqlResults(
+            vars=["parent", "parentLabel", "child", "childLabel"],
+            bindings=[{
+                "parent": SparqlBinding(type="uri", value="urn:remote"),
+                "child": SparqlBinding(type="uri", value="urn:remote-child"),
+            }],
+        ))
+
+        result, _ = await mcp._call_tool_mcp(
+            "get_children_batch", {"node_uris": ["urn:lp", "urn:remote", "urn:b"]}
+        )
+        text = result[0].text
+        assert text.index("## urn:lp") < text.index("Kapitel A") < text.index("## urn:remote")
+        assert "urn:remote-child" in text
+        assert text.endswith("## urn:b\nNo children found (leaf node).")
+        assert "<urn:lp>" not in sparql.query.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_get_children_from_snapshot(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot).register(mcp)
+        sparql.query = AsyncMock()
+
+        result, _ = await mcp._call_tool_mcp("get_children", {"node_uri": "urn:lp"})
+        assert "Kapitel A" in result[0].text
+        result, _ = await mcp._call_tool_mcp("get_children", {"node_uri": "urn:b"})
+        assert result[0].text == "No children found (leaf node)."
+        sparql.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_children_falls_back_to_sparql(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot).register(mcp)
+        sparql.query = AsyncMock(return_value=_mock_results(["child", "childLabel"], [
+            ["urn:new", "Neu"],
+        ]))
+
+        result, _ = await mcp._call_tool_mcp("get_children", {"node_uri": "urn:unknown"})
+        assert "Neu" in result[0].text
+        sparql.query.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_get_lehrplan_tree_from_snapshot(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot).register(mcp)
+        sparql.query = AsyncMock()
+
+        result, _ = await mcp._call_tool_mcp(
+            "get_lehrplan_tree", {"lehrplan_uri": "urn:lp", "depth": 3}
+        )
+        assert "Kapitel A" in result[0].text
+        assert "Abschnitt B" in result[0].text
+        sparql.query.assert_not_called()
+
+
+    @pytest.mark.asyncio
+    async def test_get_lehrplan_tree_mixes_snapshot_and_sparql(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot).register(mcp)
+        tree_vars = ["parent", "parentLabel", "child", "childLabel"]
+
+        async def fake_query(query, **kwargs):
+            if "<urn:root>" in query:
+                return _mock_results(tree_vars, [
+                    ["urn:root", "Wurzel", "urn:a", "Kapitel A"],
+                    ["urn:root", "Wurzel", "urn:x", "Kapitel X"],
+                ])
+            assert "<urn:a>" not in query and "<urn:b>" not in query
+            return _mock_results(tree_vars, [["urn:x", "Kapitel X", "urn:y", "Abschnitt Y"]])
+
+        sparql.query = AsyncMock(side_effect=fake_query)
+        result, _ = await mcp._call_tool_mcp(
+            "get_lehrplan_tree", {"lehrplan_uri": "urn:root", "depth": 3}
+        )
+        # urn:a comes from the snapshot, urn:x (not in it) from SPARQL.
+        assert "Abschnitt B" in result[0].text
+        assert "Abschnitt Y" in result[0].text
+        # Levels 2 and 3 each query only the nodes missing from the snapshot.
+        assert sparql.query.await_count == 3
+
+
+    @pytest.mark.asyncio
+    async def test_get_lehrplan_tree_output_budget(self, components, snapshot):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        mcp = FastMCP("test")
+        LehrplanTools(sparql, graphs, bl_reg, snapshot=snapshot, max_bytes=340).register(mcp)
+        sparql.query = AsyncMock()
+
+        result, _ = await mcp._call_tool_mcp(
+            "get_lehrplan_tree", {"lehrplan_uri": "urn:lp", "depth": 3}
+        )
+        text = result[0].text
+        rows = text.split("---\n")[1].split("\n\n")[0].splitlines()
+        assert len(rows) == 1
+        assert "Output truncated after 1 rows to stay within 340 bytes" in text
+        assert "Lower the depth" in text
+        assert len(text.encode()) <= 340
 
-class TestSearchTools:
     @pytest.mark.asyncio
     async def test_search_requires_bundesland_with_schulfach(self, components):
         from fastmcp import FastMCP
@@ -129,3 +384,64 @@ class TestSearchTools:
 
         result, _ = await mcp._call_tool_mcp("search", {"query": "Fisch"})
         assert 'No results found for "Fisch"' in result[0].text
+
+    @pytest.mark.asyncio
+    async def test_search_uses_local_index(self, components):
+        from fastmcp import FastMCP
+        sparql, graphs, bl_reg = components
+        text_index = TextIndex(sparql, graphs)
+        text_index.build([LabelDoc("urn:a", "Fische", graphs.infra_graphs[0])])
+        mcp = FastMCP("test")
+        SearchTools(sparql, graphs, bl_reg, text_index=text_index).register(mcp)
+        sparql.query = AsyncMock()
+
+        result, _ = await mcp._call_tool_mcp("search", {"query": "fisch"})
+        assert "Fische" in result[0].text
+        sparql.query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_subject_search_joins_closure(self, components, tmp_path, monkeypatch):
+        from fastmcp import FastMCP
+        import py_mem_mcp.tools.search as search_module
+        monkeypatch.setattr(search_module, "_SCAN_CHUNK", 2)
+        sparql, graphs, bl_reg = components
+        by = bl_reg.resolve("BY")
+        path = tmp_path / "closure.snap"
+        ClosureTable.write(
+            path,
+            [("urn:lp", "urn:1"), ("urn:lp", "urn:3"), ("urn:other", "urn:2")],
+            [
+                LehrplanInfo("urn:lp", "Biologie", "urn:bio", by.uri),
+                LehrplanInfo("urn:other", "Chemie", "urn:chem", by.uri),
+            ],
+        )
+        mcp = FastMCP("test")
+        SearchTools(
+            sparql, graphs, bl_reg, closure=ClosureTable.open(path)
+        ).register(mcp)
+
+        async def fake_query(query, **kwargs):
+            if "lp:LP_0000537" in query:
+                return _mock_results(["uri"], [["urn:bio"]])
+            assert "LP_0000008+" not in query
+            rows = [["urn:1", "Fisch"], ["urn:2", "Fischer"], ["urn:3", "Fische"]]
+            after = re.search(r'STR\(\?s\) > "([^"]+)"', query)
+            rows = [r for r in rows if after is None or r[0] > after.group(1)]
+            return _mock_results(["s", "label"], rows[:2])
+
+        sparql.query = AsyncMock(side_effect=fake_query)
+        result, _ = await mcp._call_tool_mcp(
+            "search",
+            {"query": "Fisch", "bundesland": "BY", "schulfach": "Biologie", "page_size": 1},
+        )
+        text = result[0].text
+        assert "urn:1 | Fisch | urn:lp | Biologie" in text
+        assert "urn:2" not in text.split("(More results")[0]
+
+        cursor = re.search(r'cursor="([^"]+)"', text).group(1)
+        result, _ = await mcp._call_tool_mcp(
+            "search",
+            {"query": "Fisch", "bundesland": "BY", "schulfach": "Biologie",
+             "page_size": 1, "cursor": cursor},
+        )
+        assert "urn:3 | Fische | urn:lp | Biologie" in result[0].text
@@ -0,0 +1,162 @@
+"""Unit tests for py_mem_mcp.tracing."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+from py_mem_mcp import tracing
+from py_mem_mcp.bundesland import BundeslandRegistry
+from py_mem_mcp.graphs import GraphRegistry
+from py_mem_mcp.middleware import TracingMiddleware
+from py_mem_mcp.results import SparqlBinding, SparqlResults
+from py_mem_mcp.sparql import SparqlClient
+from py_mem_mcp.tools.lehrplan import LehrplanTools
+from py_mem_mcp.tracing import InMemoryExporter, JsonlExporter, Tracer
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracing.install(Tracer([exporter]))
+    yield exporter
+    tracing.install(None)
+
+
+def test_spans_nest_within_a_trace(exporter):
+    with tracing.span("outer", a=1) as outer:
+        with tracing.span("inner") as inner:
+            inner.set_attribute("rows", 3)
+    assert [s.name for s in exporter.spans] == ["inner", "outer"]
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert outer.parent_id is None
+    assert inner.attributes == {"rows": 3}
+    assert outer.end_ns >= inner.end_ns >= inner.start_ns >= outer.start_ns
+    assert outer.traceparent == f"00-{outer.trace_id}-{outer.span_id}-01"
+
+
+def test_error_sets_status(exporter):
+    with pytest.raises(ValueError):
+        with tracing.span("fails"):
+            raise ValueError("boom")
+    assert exporter.spans[0].status == "ERROR"
+    assert exporter.spans[0].status_message == "ValueError: boom"
+
+
+def test_span_is_noop_without_tracer():
+    with tracing.span("ignored") as span:
+        span.set_attribute("x", 1)
+    assert span.traceparent is None
+
+
+def test_jsonl_exporter(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(path)
+    tracing.install(Tracer([exporter]))
+    try:
+        with tracing.span("parent"):
+            with tracing.span("child", rows=2):
+                pass
+    finally:
+        tracing.install(None)
+    assert not path.exists()
+    exporter.close()
+    child, parent = [json.loads(line) for line in path.read_text().splitlines()]
+    assert child["name"] == "child"
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["attributes"] == {"rows": 2}
+    assert "parentSpanId" not in parent
+    assert parent["status"] == {"code": "UNSET"}
+
+
+def test_jsonl_exporter_flushes_when_buffer_is_full(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(path, max_pending=2)
+    tracer = Tracer([exporter])
+    for name in ("a", "b", "c"):
+        with tracer.span(name):
+            pass
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["a", "b"]
+    exporter.close()
+    assert len(path.read_text().splitlines()) == 3
+
+
+@pytest.mark.asyncio
+async def test_run_flush_writes_in_background_and_closes(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    exporter = JsonlExporter(path)
+    tracer = Tracer([exporter])
+    task = asyncio.create_task(tracer.run_flush(0.01))
+    with tracer.span("a"):
+        pass
+    await asyncio.sleep(0.05)
+    assert json.loads(path.read_text())["name"] == "a"
+    with tracer.span("b"):
+        pass
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert len(path.read_text().splitlines()) == 2
+    assert exporter._file is None
+
+
+def test_format_results_budget_is_traced(exporter):
+    results = SparqlResults(
+        vars=["x"], bindings=[{"x": SparqlBinding("literal", "v" * 50)} for _ in range(10)]
+    )
+    text = SparqlClient.format_results(results, max_bytes=200)
+    span = exporter.spans[-1]
+    assert span.name == "format_results"
+    assert span.attributes["output.truncated"] is True
+    assert span.attributes["output.chars"] == len(text)
+
+
+def test_from_env(monkeypatch, tmp_path):
+    monkeypatch.delenv("TRACE_FILE", raising=False)
+    assert Tracer.from_env() is None
+    monkeypatch.setenv("TRACE_FILE", str(tmp_path / "t.jsonl"))
+    assert isinstance(Tracer.from_env().exporters[0], JsonlExporter)
+
+
+@pytest.mark.asyncio
+async def test_find_lehrplaene_trace(exporter, monkeypatch):
+    monkeypatch.setenv("GRAPH_ONTOLOGY", "https://ontology.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULART", "https://schulart.example.com/")
+    monkeypatch.setenv("GRAPH_SCHULFACH", "https://schulfach.example.com/")
+    monkeypatch.setenv("GRAPH_STATE_SN", "https://sn.example.com/")
+    headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers.append(request.headers.get("traceparent"))
+        if b"?uri" in request.content:
+            return httpx.Response(200, content=b"?uri\n<https://sf.example.com/bio>\n")
+        return httpx.Response(200, content=b'?s\t?label\n<urn:lp>\t"Biologie LP"\n')
+
+    sparql = SparqlClient(
+        "https://sparql.example.com/sparql", transport=httpx.MockTransport(handler)
+    )
+    mcp = FastMCP("test", middleware=[TracingMiddleware()])
+    LehrplanTools(sparql, GraphRegistry(), BundeslandRegistry()).register(mcp)
+    result, _ = await mcp._call_tool_mcp(
+        "find_lehrplaene", {"bundesland": "SN", "schulfach": "Biologie"}
+    )
+    await sparql.aclose()
+    assert "Biologie LP" in result[0].text
+
+    spans = {s.name: s for s in exporter.spans}
+    root = spans["tool find_lehrplaene"]
+    assert len({s.trace_id for s in exporter.spans}) == 1
+    assert spans["resolve_schulfach"].parent_id == root.span_id
+    assert spans["resolve_schulfach"].attributes["resolve.source"] == "sparql"
+    assert spans["format_results"].parent_id == root.span_id
+    assert spans["format_results"].attributes["sparql.rows"] == 1
+
+    http = [s for s in exporter.spans if s.name == "sparql.http"]
+    assert headers == [s.traceparent for s in http]
+    decode = [s for s in exporter.spans if s.name == "sparql.decode"]
+    assert decode[-1].attributes["sparql.rows"] == 1
+    assert decode[-1].attributes["sparql.bytes"] > 0
+    build = [s for s in exporter.spans if s.name == "sparql.build"]
+    assert build[-1].attributes["sparql.graph_count"] == 4
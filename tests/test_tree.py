@@ -0,0 +1,147 @@
+"""Unit tests for py_mem_mcp.tree."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from py_mem_mcp.cache import ResultCache
+from py_mem_mcp.results import SparqlBinding, SparqlResults
+from py_mem_mcp.sparql import SparqlClient
+from py_mem_mcp.tree import (
+    TREE_VARS,
+    children_query,
+    fetch_children,
+    fetch_children_grouped,
+    fetch_tree,
+)
+
+# root -> a, b; a -> c; b -> c (shared), d; c -> e
+_EDGES = {
+    "urn:root": ["urn:a", "urn:b"],
+    "urn:a": ["urn:c"],
+    "urn:b": ["urn:c", "urn:d"],
+    "urn:c": ["urn:e"],
+}
+
+
+def _uri(value: str) -> SparqlBinding:
+    return SparqlBinding(type="uri", value=value)
+
+
+class FakeStore:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def fetch(self, parents):
+        self.calls.append(list(parents))
+        rows = [
+            {
+                "parent": _uri(p),
+                "parentLabel": SparqlBinding(type="literal", value=p.upper()),
+                "child": _uri(c),
+            }
+            for p in parents
+            for c in _EDGES.get(p, [])
+        ]
+        return SparqlResults(vars=TREE_VARS, bindings=rows)
+
+
+def _edges(results):
+    return [(row["parent"].value, row["child"].value) for row in results.bindings]
+
+
+class TestFetchTree:
+    @pytest.mark.asyncio
+    async def test_one_query_per_level(self):
+        store = FakeStore()
+        tree = await fetch_tree(store.fetch, "urn:root", depth=3)
+        assert store.calls == [["urn:root"], ["urn:a", "urn:b"], ["urn:c", "urn:d"]]
+        assert _edges(tree.results) == [
+            ("urn:a", "urn:c"),
+            ("urn:b", "urn:c"),
+            ("urn:b", "urn:d"),
+            ("urn:c", "urn:e"),
+            ("urn:root", "urn:a"),
+            ("urn:root", "urn:b"),
+        ]
+        assert not tree.truncated
+
+    @pytest.mark.asyncio
+    async def test_stops_when_no_frontier(self):
+        store = FakeStore()
+        await fetch_tree(store.fetch, "urn:root", depth=10)
+        assert len(store.calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_node_budget(self):
+        store = FakeStore()
+        tree = await fetch_tree(store.fetch, "urn:root", depth=10, node_budget=3)
+        assert tree.truncated
+        assert len(store.calls) == 2
+        assert {c for _, c in _edges(tree.results)} == {"urn:a", "urn:b"}
+
+    @pytest.mark.asyncio
+    async def test_labels_kept(self):
+        store = FakeStore()
+        tree = await fetch_tree(store.fetch, "urn:root", depth=1)
+        assert tree.results.bindings[0]["parentLabel"].value == "URN:ROOT"
+        assert "childLabel" not in tree.results.bindings[0]
+
+
+def test_children_query_binds_parents():
+    query = children_query(["urn:a", "urn:b"], ["https://g.example.com/"])
+    assert "VALUES ?parent { <urn:a> <urn:b> }" in query
+    assert "FROM <https://g.example.com/>" in query
+
+
+@pytest.mark.asyncio
+async def test_fetch_children_batches():
+    sparql = SparqlClient("https://sparql.example.com/sparql")
+    sparql.query = AsyncMock(
+        side_effect=lambda q, **kw: SparqlResults(
+            vars=TREE_VARS, bindings=[{"parent": _uri("urn:p"), "child": _uri(q[-20:])}]
+        )
+    )
+    results = await fetch_children(sparql, [], [f"urn:{i}" for i in range(5)], batch_size=2)
+    assert sparql.query.call_count == 3
+    assert len(results.bindings) == 3
+
+
+class TestFetchChildrenGrouped:
+    @staticmethod
+    def _client(cache=None):
+        store = FakeStore()
+        sparql = SparqlClient("https://sparql.example.com/sparql", cache=cache)
+
+        async def fake_query(query, **kwargs):
+            return await store.fetch([p for p in (*_EDGES, "urn:e") if f"<{p}>" in query])
+
+        sparql.query = AsyncMock(side_effect=fake_query)
+        return sparql
+
+    @pytest.mark.asyncio
+    async def test_groups_by_parent_in_one_query(self):
+        sparql = self._client()
+        grouped = await fetch_children_grouped(sparql, ["urn:g"], ["urn:b", "urn:e", "urn:b"])
+        assert list(grouped) == ["urn:b", "urn:e"]
+        assert grouped["urn:b"].values("child") == ["urn:c", "urn:d"]
+        assert grouped["urn:b"].vars == ["child", "childLabel"]
+        assert not grouped["urn:e"].bindings
+        assert sparql.query.await_count == 1
+        assert sparql.query.call_args.kwargs["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_partial_cache_hits_query_only_missing(self):
+        cache = ResultCache()
+        sparql = self._client(cache)
+        await fetch_children_grouped(sparql, ["urn:g"], ["urn:a", "urn:e"])
+        sparql.query.reset_mock()
+
+        grouped = await fetch_children_grouped(sparql, ["urn:g"], ["urn:a", "urn:b", "urn:e"])
+        assert grouped["urn:a"].values("child") == ["urn:c"]
+        query = sparql.query.call_args.args[0]
+        assert "<urn:b>" in query and "<urn:a>" not in query and "<urn:e>" not in query
+        # Two misses on the first call; two hits and one miss on the second.
+        assert (cache.stats.hits, cache.stats.misses) == (2, 3)
+
+        assert cache.invalidate_graphs({"urn:g"}) == 3